@@ -1,19 +1,46 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import sqlite3
+
+import app_data
+import draw_store
+import player_search
+from mc_engine import boom_bust_thresholds, normal_boom_bust
+from ranking_table import prerender_rows, render_ranking_table
 
 # ============================
 # LOAD DATA
 # ============================
-@st.cache_data
-def load_data():
-    conn = sqlite3.connect("fantasy.db")
-    df = pd.read_sql("SELECT * FROM week11_simulated_all", conn)
-    conn.close()
+TABLE = "week11_simulated_all"
+COLUMNS = ["playerID", "playerName", "team", "position", "opponent",
+           "median", "p10", "p90", "boom_pct", "bust_pct"]
+
+
+@st.cache_data(show_spinner=False, max_entries=app_data.MAX_VERSIONS)
+def load_data(version):
+    # only the displayed columns (+ proj_* for the statline); re-read when
+    # the pipeline rewrites the table and the version changes
+    df = app_data.read(TABLE, COLUMNS, prefixes=("proj_",))
+
+    # Boom/Bust are stored by simulate_week11.py; older tables read them off
+    # the saved draws, or fall back to the closed-form normal approximation.
+    if "boom_pct" not in df.columns or "bust_pct" not in df.columns:
+        store = draw_store.open_store()
+        if store is not None and (store.rows(df["playerID"]) >= 0).all():
+            cut = boom_bust_thresholds(df["position"])
+            df["boom_pct"] = store.prob_over(cut[:, 0], df["playerID"]) * 100
+            df["bust_pct"] = (1.0 - store.prob_over(cut[:, 1], df["playerID"])) * 100
+        else:
+            df["boom_pct"], df["bust_pct"] = normal_boom_bust(
+                df["median"], df["p10"], df["p90"], df["position"]
+            )
+
+    df["Boom%"] = df["boom_pct"].astype(float).round(1)
+    df["Bust%"] = df["bust_pct"].astype(float).round(1)
     return df
 
-df = load_data()
+version = app_data.version(TABLE)
+df = load_data(version)
+index = player_search.index_for(TABLE, version, df, weight="median")
 
 # ============================
 # PAGE SETUP + STYLING
@@ -76,79 +103,21 @@ with col2:
 filtered = df[df["position"].isin(pos_filter)].copy()
 
 if search.strip():
-    filtered = filtered[filtered["playerName"].str.contains(search, case=False)]
+    hit = filtered["playerName"].str.contains(search, case=False, regex=False, na=False)
+    if not hit.any():   # nothing contains the text (typo?) → best fuzzy matches
+        hit = filtered["playerID"].isin(index.search_ids(search, positions=pos_filter))
+    filtered = filtered[hit]
 
 filtered = filtered.sort_values("median", ascending=False)
 filtered.insert(0, "Rank", range(1, len(filtered) + 1))
 
-# ============================
-# BOOM / BUST CALCULATION
-# ============================
-def boom_bust(row):
-    p10 = row["p10"]
-    p90 = row["p90"]
-    projection = row["median"]
-
-    spread = p90 - p10
-    if spread <= 0:
-        std = 1.0
-    else:
-        std = spread / 2.56  # approx 1.28σ each side
-
-    sims = np.random.normal(loc=projection, scale=std, size=5000)
-
-    boom = np.mean(sims > p90) * 100   # chance to beat P90
-    bust = np.mean(sims < p10) * 100   # chance to fall below P10
-
-    return round(boom, 1), round(bust, 1)
-
-boom_list = []
-bust_list = []
-
-for _, r in filtered.iterrows():
-    b1, b2 = boom_bust(r)
-    boom_list.append(b1)
-    bust_list.append(b2)
-
-filtered["Boom%"] = boom_list
-filtered["Bust%"] = bust_list
-
 # ============================
 # RANKING TABLE
 # ============================
 st.markdown("<h3 style='color:#3e2723;'>Overall Rankings</h3>", unsafe_allow_html=True)
 
-table_html = """
-<table class='rank-table' style='width:100%; border-collapse:collapse;'>
-<tr>
-    <th>Rank</th>
-    <th>Name</th>
-    <th>Pos</th>
-    <th>Team</th>
-    <th>Opp</th>
-    <th>Projection</th>
-    <th>Boom%</th>
-    <th>Bust%</th>
-</tr>
-"""
-
-for _, row in filtered.iterrows():
-    table_html += (
-        "<tr>"
-        f"<td>{int(row['Rank'])}</td>"
-        f"<td>{row['playerName']}</td>"
-        f"<td>{row['position']}</td>"
-        f"<td>{row['team']}</td>"
-        f"<td>{row['opponent']}</td>"
-        f"<td>{row['median']:.1f}</td>"
-        f"<td>{row['Boom%']}</td>"
-        f"<td>{row['Bust%']}</td>"
-        "</tr>"
-    )
-
-table_html += "</table>"
-
-st.markdown(table_html, unsafe_allow_html=True)
+rows_html = prerender_rows(version, df)
+render_ranking_table(filtered, rows_html)
 
 # ============================
 # PROJECTED STATLINE SECTION
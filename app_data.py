@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import db
+
+# ---------------- CONFIG ----------------
+VERSION_TTL = 2          # seconds a table-version lookup is reused across reruns
+MAX_VERSIONS = 4         # cached frames kept per (table, columns) — old versions age out
+CATEGORY_RATIO = 0.5     # text columns with fewer distinct values than this share → category
+# ----------------------------------------
+
+# ======================================
+# Data access for the Streamlit apps
+# ======================================
+# Apps ask for the columns they actually display. Frames are cached under
+# db.table_version, so any write to the table (which bumps the version) invalidates
+# the cache on the next rerun, and reruns against unchanged data are a dict
+# lookup. Reads select only the requested columns and shrink them on the way
+# in: REAL → float32, INTEGER → smallest int, repetitive text → category.
+
+
+def table_columns(table, conn=None):
+    """Column names of table ([] if it does not exist)."""
+    if conn is None:
+        with db.get_connection() as c:
+            return table_columns(table, c)
+    return [r[1] for r in conn.execute(f"PRAGMA table_info({table})")]
+
+
+@st.cache_data(ttl=VERSION_TTL, show_spinner=False)
+def version(table):
+    """db.table_version, reused for VERSION_TTL seconds so typing doesn't hit the database."""
+    with db.get_connection() as conn:
+        return db.table_version(conn, table)
+
+
+def compact(df):
+    """Downcast a freshly read frame in place of the pandas defaults."""
+    out = {}
+    for col, s in df.items():
+        if pd.api.types.is_float_dtype(s):
+            out[col] = s.astype(np.float32)
+        elif pd.api.types.is_integer_dtype(s):
+            out[col] = pd.to_numeric(s, downcast="integer")
+        elif len(s) and s.nunique(dropna=True) < CATEGORY_RATIO * len(s):
+            out[col] = s.astype("category")
+        else:
+            out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+def read(table, columns, prefixes=(), where=None, params=None, conn=None):
+    """Only the requested columns of table, compacted.
+
+    columns: wanted columns in display order; ones missing from the table are
+             skipped, so callers can list optional columns.
+    prefixes: also pull every column starting with one of these (e.g. "proj_").
+    where/params: optional SQL filter, e.g. ("week_num = ?", [11]).
+    """
+    if conn is None:
+        with db.get_connection() as c:
+            return read(table, columns, prefixes, where, params, c)
+
+    have = table_columns(table, conn)
+    wanted = [c for c in columns if c in have]
+    wanted += [c for c in have if c not in wanted and any(c.startswith(p) for p in prefixes)]
+
+    select = ", ".join(f'"{c}"' for c in wanted)
+    sql = f"SELECT {select} FROM {table}"
+    if where:
+        sql += f" WHERE {where}"
+    return compact(db.read_sql(sql, conn, params=params))
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_VERSIONS)
+def _cached_read(table, columns, prefixes, where, params, version):
+    return read(table, list(columns), prefixes, where, params)
+
+
+def load(table, columns, prefixes=(), where=None, params=None):
+    """(frame, version) for table, cached until the table's data version changes."""
+    ver = version(table)
+    df = _cached_read(table, tuple(columns), tuple(prefixes), where,
+                      tuple(params) if params is not None else None, ver)
+    return df, ver
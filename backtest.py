@@ -0,0 +1,170 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import db
+import feature_store
+import ols_stats
+import rates
+from mc_engine import pack_residuals, simulate_batch
+from projections import FEATURES, PROJECTORS, RATE_COLUMNS
+
+# ---------------- CONFIG ----------------
+DB_PATH = db.DB_PATH
+POSITIONS = ["WR", "RB", "TE", "QB"]
+MIN_TRAIN_WEEKS = 3     # first backtested week is the 4th week with data
+ROLL_WEEKS = 3          # usage baseline window (same as player_baselines)
+SIMS = 2000
+SEED = 7
+# ----------------------------------------
+
+# ======================================
+# Walk-forward backtest
+# ======================================
+# For every week k: fit on weeks < k, build that week's inputs the way the
+# live pipeline does (rolling-3 usage baselines, player rates from the
+# training rows), project with the production projectors and bootstrap
+# p10/p50/p90 from the training residuals. Then score the projections
+# against what actually happened.
+#
+# The OLS side is one Z'Z block per week: a cumulative sum over weeks
+# gives every window's normal equations at once, so each week's fit is a
+# single small solve rather than a refit.
+
+BASE_COLUMNS = {
+    "rec_tgt": "rec_tgt_base",
+    "rush_att": "rush_att_base",
+    "off_snp": "off_snp_base",
+    "ease_factor": "ease_base",
+}
+
+KEY_COLUMNS = ["playerID", "playerName", "team", "position", "opponent", "week_num", "pts_ppr"]
+
+
+def load_position(position, store_path=feature_store.STORE_DIR):
+    cols = list(dict.fromkeys(KEY_COLUMNS + FEATURES[position] + RATE_COLUMNS))
+    df = feature_store.load(cols, position=position, path=store_path)
+    return df.sort_values(["playerID", "week_num"], kind="stable").reset_index(drop=True)
+
+
+def cumulative_blocks(df, features, weeks):
+    """Z'Z summed over all weeks < k, for each k in weeks (shape (len(weeks), p+2, p+2))."""
+    X = df[features].fillna(0).to_numpy(dtype=np.float64)
+    y = df["pts_ppr"].to_numpy(dtype=np.float64)
+    wk = df["week_num"].to_numpy()
+
+    uniq = np.unique(wk)
+    per_week = np.stack([ols_stats.cross_products(X[wk == w], y[wk == w]) for w in uniq])
+    prefix = np.concatenate([np.zeros((1,) + per_week.shape[1:]), np.cumsum(per_week, axis=0)])
+    return prefix[np.searchsorted(uniq, weeks, side="left")]
+
+
+def week_inputs(history, target_rows):
+    """week11_inputs-style rows for the players playing in the target week."""
+    last = history.groupby("playerID").tail(ROLL_WEEKS)
+    base = last.groupby("playerID")[list(BASE_COLUMNS)].mean().round(1).rename(columns=BASE_COLUMNS)
+    base["last_week"] = history.groupby("playerID")["week_num"].max()
+
+    inputs = target_rows[["playerID", "playerName", "team", "position", "opponent"]]
+    return inputs.merge(base.reset_index(), on="playerID", how="inner")
+
+
+def backtest_position(position, weeks=None, sims=SIMS, seed=SEED, features=None,
+                      store_path=feature_store.STORE_DIR):
+    """Per-player projections vs actuals for every backtested week of one position."""
+    df = load_position(position, store_path)
+    features = features or FEATURES[position]
+    all_weeks = sorted(df["week_num"].unique())
+    weeks = weeks or all_weeks[MIN_TRAIN_WEEKS:]
+    blocks = cumulative_blocks(df, features, weeks)
+
+    out = []
+    for week, ztz in zip(weeks, blocks):
+        if ztz[0, 0] <= len(features) + 1:
+            continue
+        fit = ols_stats.solve(ztz, features)
+
+        train = df[df["week_num"] < week]
+        train = train.assign(resid=train["pts_ppr"] - ols_stats.predict(fit, train[features].fillna(0)))
+        target = df[df["week_num"] == week]
+
+        inputs = week_inputs(train, target)
+        if inputs.empty:
+            continue
+        preds = PROJECTORS[position](fit, rates.compute(train, [position])[position], inputs)
+
+        offsets, values = pack_residuals(preds.assign(position=position),
+                                         train.assign(position=position))
+        q = simulate_batch(preds["mu"].to_numpy(), offsets, values, sims=sims,
+                           seed=None if seed is None else seed + int(week))
+
+        res = preds[["playerID", "playerName", "team", "position", "opponent", "mu"]].assign(
+            week_num=int(week), p10=q[:, 0], median=q[:, 1], p90=q[:, 2])
+        res = res.merge(target[["playerID", "pts_ppr"]], on="playerID", how="left")
+        out.append(res.rename(columns={"pts_ppr": "actual"}))
+
+    return pd.concat(out, ignore_index=True) if out else pd.DataFrame()
+
+
+# ---------- Scoring ----------
+def _summary(g):
+    slates = g.groupby(["position", "week_num"])
+    spearman = slates.apply(lambda w: w["mu"].corr(w["actual"], method="spearman"),
+                            include_groups=False)
+    err = g["mu"] - g["actual"]
+    return {
+        "weeks": g["week_num"].nunique(),
+        "n": len(g),
+        "mae": err.abs().mean(),
+        "bias": err.mean(),
+        "spearman": spearman.mean(),
+        "below_p10": (g["actual"] < g["p10"]).mean(),
+        "above_p90": (g["actual"] > g["p90"]).mean(),
+        "in_p10_p90": g["actual"].between(g["p10"], g["p90"]).mean(),
+    }
+
+
+def score(results):
+    """MAE, weekly Spearman rank correlation and p10/p90 coverage per position.
+
+    A calibrated model has ~10% of actuals below p10 and ~10% above p90.
+    """
+    results = results.dropna(subset=["actual"])
+    rows = [{"position": p, **_summary(g)} for p, g in results.groupby("position")]
+    rows.append({"position": "ALL", **_summary(results)})
+    return pd.DataFrame(rows)
+
+
+def run(positions=POSITIONS, weeks=None, sims=SIMS, seed=SEED, db_path=DB_PATH, save=True):
+    conn = db.connect(db_path)
+    feature_store.ensure_fresh(conn)
+
+    start = time.perf_counter()
+    results = pd.concat([backtest_position(p, weeks, sims, seed) for p in positions],
+                        ignore_index=True)
+    summary = score(results)
+    elapsed = time.perf_counter() - start
+
+    if save:
+        db.write_tables({"backtest_results": results, "backtest_summary": summary}, conn)
+    conn.close()
+
+    print(summary.round(3).to_string(index=False))
+    print(f"\n✅ Backtested {results['week_num'].nunique()} weeks, {len(results)} projections "
+          f"in {elapsed:.1f}s")
+    return results, summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the weekly projections.")
+    parser.add_argument("--positions", nargs="*", default=POSITIONS, choices=list(FEATURES))
+    parser.add_argument("--weeks", type=int, nargs="*", default=None, help="weeks to project (default: all after warm-up)")
+    parser.add_argument("--sims", type=int, default=SIMS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    run(args.positions, args.weeks, args.sims, args.seed, args.db, not args.no_save)
@@ -0,0 +1,228 @@
+import argparse
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+import db
+
+# ---------------- CONFIG ----------------
+DB_PATH = db.DB_PATH
+SOURCE_TABLE = "all_weeks_joined"
+BASELINES_TABLE = "player_baselines"
+INPUTS_TABLE = "week11_inputs"
+STATE_TABLE = "baseline_state"
+WEEKS_TABLE = "baseline_weeks"
+WINDOW = 3          # rolling mean over a player's last 3 games (min 1)
+EWM_ALPHA = 0.5     # exponentially weighted mean, NaN games skipped
+# ----------------------------------------
+
+# ======================================
+# Rolling player baselines
+# ======================================
+# player_baselines  one row per player-game: rolling-3 and EWMA usage
+# week11_inputs     each player's latest baseline renamed *_base — the
+#                   next-week input slate
+#
+# baseline_state keeps, per player, the last WINDOW raw values of every
+# stat (stat_1 = most recent) plus the running EWMA. Appending a week
+# joins that week's rows onto the state, shifts the buffers and updates
+# the EWMA as column arithmetic — O(players) — then inserts only those
+# baseline rows and rewrites the slate. backfill() rebuilds everything
+# with groupby-rolling / groupby-ewm.
+#
+# baseline_weeks keeps a hash of each week's source rows. update() appends
+# weeks newer than the state; if an already-included week changed (or
+# disappeared) it re-runs the backfill from the earliest such week, which
+# rewrites only the baseline rows from that week on.
+
+STATS = {"rec_tgt": "rec_tgt", "rush_att": "rush_att", "off_snp": "off_snp", "ease_factor": "ease"}
+ID_COLUMNS = ["playerID", "playerName", "team", "position", "opponent"]
+
+
+def read_source(conn, weeks=None, source=SOURCE_TABLE):
+    sql = f"SELECT {', '.join(ID_COLUMNS + ['week_num'] + list(STATS))} FROM {source}"
+    params = None
+    if weeks is not None:
+        params = [int(w) for w in weeks]
+        sql += f" WHERE week_num IN ({','.join('?' * len(params))})"
+    return db.read_sql(sql, conn, params=params)
+
+
+def week_hashes(df):
+    """{week_num: hash of that week's source rows}, independent of row order."""
+    cols = ID_COLUMNS + ["week_num"] + list(STATS)
+    df = df.sort_values(["week_num", "playerID"], kind="stable")
+    return {
+        int(week): hashlib.sha1(pd.util.hash_pandas_object(g[cols], index=False).to_numpy().tobytes())
+                          .hexdigest()
+        for week, g in df.groupby("week_num", sort=True)
+    }
+
+
+def _hash_frame(hashes):
+    return pd.DataFrame({"week_num": list(hashes), "rows_hash": list(hashes.values())})
+
+
+def _baseline_row(frame, roll, ewm):
+    """player_baselines columns from ids + {stat: rolling mean} + {stat: ewma}."""
+    out = frame[ID_COLUMNS + ["week_num"]].reset_index(drop=True)
+    for stat, name in STATS.items():
+        out[f"{name}_roll"] = np.round(np.asarray(roll[stat], dtype=np.float64), 1)
+    for stat, name in STATS.items():
+        out[f"{name}_ewm"] = np.round(np.asarray(ewm[stat], dtype=np.float64), 2)
+    return out
+
+
+# ---------- Backfill ----------
+def backfill(conn, source=SOURCE_TABLE, start=None):
+    """Rebuild player_baselines, baseline_state and the slate from every week.
+
+    With start, baseline rows before that week are kept as they are and
+    only weeks >= start are rewritten.
+    """
+    df = read_source(conn, source=source)
+    hashes = week_hashes(df)
+    df = df.sort_values(["playerID", "week_num"], kind="stable").reset_index(drop=True)
+    g = df.groupby("playerID", sort=False)
+
+    roll = {s: g[s].rolling(WINDOW, min_periods=1).mean().reset_index(level=0, drop=True)
+            for s in STATS}
+    ewm = {s: g[s].ewm(alpha=EWM_ALPHA, adjust=False, ignore_na=True).mean()
+                  .reset_index(level=0, drop=True)
+           for s in STATS}
+    baselines = _baseline_row(df, roll, ewm)
+
+    # state = each player's last row + the raw values of their last WINDOW games
+    from_end = g.cumcount(ascending=False).to_numpy()
+    last = from_end == 0
+    state = df.loc[last, ID_COLUMNS].reset_index(drop=True)
+    state["last_week"] = df.loc[last, "week_num"].to_numpy()
+    for s in STATS:
+        for k in range(1, WINDOW + 1):
+            kth = df.loc[from_end == k - 1, ["playerID", s]].set_index("playerID")[s]
+            state[f"{s}_{k}"] = state["playerID"].map(kth).to_numpy(dtype=np.float64)
+        state[f"{s}_ewm"] = ewm[s][last].to_numpy()
+
+    tables = {STATE_TABLE: state, INPUTS_TABLE: slate(state), WEEKS_TABLE: _hash_frame(hashes)}
+    if start is None:
+        db.write_tables({BASELINES_TABLE: baselines, **tables}, conn)
+        print(f"✅ Backfilled {len(baselines)} baseline rows for {len(state)} players")
+        return baselines
+
+    baselines = baselines[baselines["week_num"] >= start]
+    db.write_tables({BASELINES_TABLE: baselines, **tables}, conn, if_exists={BASELINES_TABLE: "append"},
+                    before=[(f"DELETE FROM {BASELINES_TABLE} WHERE week_num >= ?", (int(start),))])
+    print(f"✅ Backfilled {len(baselines)} baseline rows from week {start} for {len(state)} players")
+    return baselines
+
+
+# ---------- Append ----------
+def load_state(conn):
+    if STATE_TABLE not in db.list_tables(conn):
+        return None
+    return db.read_sql(f"SELECT * FROM {STATE_TABLE}", conn)
+
+
+def append_week(conn, week, source=SOURCE_TABLE):
+    """Add one new week: update those players' state, insert their baseline rows."""
+    state = load_state(conn)
+    if state is None:
+        raise RuntimeError(f"No {STATE_TABLE} yet — run with --backfill first")
+
+    rows = read_source(conn, [week], source)
+    if rows.empty:
+        print(f"⚠️  No {source} rows for week {week}")
+        return rows
+    if state.loc[state["playerID"].isin(rows["playerID"]), "last_week"].ge(week).any():
+        raise RuntimeError(f"Week {week} is already in the baselines — use --backfill to redo it")
+
+    cur = rows.merge(state.drop(columns=ID_COLUMNS[1:]), on="playerID", how="left")
+
+    roll, ewm, new_state = {}, {}, cur[ID_COLUMNS].copy()
+    new_state["last_week"] = int(week)
+    for s in STATS:
+        x = cur[s].to_numpy(dtype=np.float64)
+        buf = [x] + [cur[f"{s}_{k}"].to_numpy(dtype=np.float64) for k in range(1, WINDOW)]
+        for k, col in enumerate(buf, start=1):
+            new_state[f"{s}_{k}"] = col
+
+        with np.errstate(invalid="ignore"):
+            stacked = np.vstack(buf)
+            counts = (~np.isnan(stacked)).sum(axis=0)
+            roll[s] = np.where(counts > 0, np.nansum(stacked, axis=0) / np.maximum(counts, 1), np.nan)
+
+        prev = cur[f"{s}_ewm"].to_numpy(dtype=np.float64)
+        upd = np.where(np.isnan(prev), x, EWM_ALPHA * x + (1 - EWM_ALPHA) * prev)
+        ewm[s] = np.where(np.isnan(x), prev, upd)
+        new_state[f"{s}_ewm"] = ewm[s]
+
+    baselines = _baseline_row(rows, roll, ewm)
+    existing = [r[1] for r in conn.execute(f"PRAGMA table_info({BASELINES_TABLE})")]
+
+    state = pd.concat([state[~state["playerID"].isin(new_state["playerID"])], new_state],
+                      ignore_index=True)
+    db.write_tables(
+        {BASELINES_TABLE: baselines[existing], STATE_TABLE: new_state, INPUTS_TABLE: slate(state),
+         WEEKS_TABLE: _hash_frame(week_hashes(rows))},
+        conn, if_exists={BASELINES_TABLE: "append", STATE_TABLE: "append", WEEKS_TABLE: "append"},
+    )
+    print(f"✅ Week {week}: {len(baselines)} baseline rows appended")
+    return baselines
+
+
+# ---------- Slate ----------
+def slate(state):
+    """week11_inputs layout: every player's latest baseline as *_base columns."""
+    out = state[ID_COLUMNS + ["last_week"]].copy()
+    for s, name in STATS.items():
+        buf = np.vstack([state[f"{s}_{k}"].to_numpy(dtype=np.float64) for k in range(1, WINDOW + 1)])
+        with np.errstate(invalid="ignore"):
+            counts = (~np.isnan(buf)).sum(axis=0)
+            mean = np.where(counts > 0, np.nansum(buf, axis=0) / np.maximum(counts, 1), np.nan)
+        out[f"{name}_base"] = np.round(mean, 1)
+    return out
+
+
+def update(conn, source=SOURCE_TABLE):
+    """Bring the baselines in line with the source.
+
+    Weeks newer than the state are appended; if an included week's rows
+    changed, the backfill re-runs from the earliest changed week (a full
+    backfill when there is no state yet).
+    """
+    state = load_state(conn)
+    if state is None or WEEKS_TABLE not in db.list_tables(conn):
+        return backfill(conn, source)
+    done = int(state["last_week"].max())
+
+    hashes = week_hashes(read_source(conn, source=source))
+    stored = dict(conn.execute(f"SELECT week_num, rows_hash FROM {WEEKS_TABLE}").fetchall())
+    changed = sorted(w for w in set(stored) | {w for w in hashes if w <= done}
+                     if stored.get(w) != hashes.get(w))
+    if changed:
+        print(f"🔁 Week(s) {', '.join(map(str, changed))} changed since the last run")
+        return backfill(conn, source, start=changed[0])
+
+    weeks = [w for w in hashes if w > done]
+    for week in weeks:
+        append_week(conn, week, source)
+    if not weeks:
+        print(f"⏭️  Baselines already include week {done}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain player_baselines and the next-week slate.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--week", type=int, help="append just this week")
+    parser.add_argument("--backfill", action="store_true", help="rebuild from every week")
+    args = parser.parse_args()
+
+    conn = db.connect(args.db)
+    if args.backfill:
+        backfill(conn)
+    elif args.week is not None:
+        append_week(conn, args.week)
+    else:
+        update(conn)
+    conn.close()
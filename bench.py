@@ -0,0 +1,218 @@
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import time
+
+import db
+import profiling
+import synthetic
+
+try:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+except ImportError:
+    plt = None
+
+# ---------------- CONFIG ----------------
+SCALES = [(1, 480), (3, 1000), (5, 2000), (10, 4000)]    # (seasons, players)
+OUT_DIR = os.path.join("data", "bench")
+SEED = synthetic.SEED
+APP_TABLE = "week11_simulated_all"
+APP_COLUMNS = ["playerID", "playerName", "team", "position", "opponent",
+               "median", "p10", "p90", "boom_pct", "bust_pct"]
+# ----------------------------------------
+
+# ======================================
+# Scaling benchmark
+# ======================================
+# For every (seasons, players) scale: write a synthetic league
+# (synthetic.py) to OUT_DIR/s<N>_p<M>/fantasy.db, then run each stage in
+# its own process with FANTASY_PROFILE set, so wall/CPU time and the peak
+# RSS come from profiling.py and no stage inherits another's heap:
+#
+#   ingestion    ingest      Sleeper-style JSON payloads → weekly_stats
+#   features     ease        build_ease_table.py --rebuild (joins the _v2 ease)
+#                baselines   baselines.py --backfill
+#                store       feature_store.build
+#   training     season      week11_regression.py
+#                positions   project_all.py
+#   simulation   simulate    simulate_week11.py
+#   app          app_load    app_data.read + player index (no Streamlit cache)
+#
+# Everything is offline. Results go to OUT_DIR/results.json and
+# OUT_DIR/curves.csv (one row per scale × stage: seconds, rows/s, peak MB),
+# plus curves.png when matplotlib is installed. Rows are all_weeks_joined
+# rows at that scale, so rows/s is comparable across stages.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+STAGES = [
+    {"name": "ingest", "group": "ingestion"},
+    {"name": "ease", "group": "features", "script": "build_ease_table.py", "args": ["--rebuild", "--ease-table", "opponent_strength_offadj_v2"]},
+    {"name": "baselines", "group": "features", "script": "baselines.py", "args": ["--backfill"]},
+    {"name": "store", "group": "features"},
+    {"name": "season", "group": "training", "script": "week11_regression.py"},
+    {"name": "positions", "group": "training", "script": "project_all.py"},
+    {"name": "simulate", "group": "simulation", "script": "simulate_week11.py"},
+    {"name": "app_load", "group": "app"},
+]
+
+
+# ---------- In-process stages (run via `bench.py stage NAME`) ----------
+def stage_ingest(conn):
+    import ingest_stats
+    df = db.read_sql("SELECT * FROM all_weeks_joined", conn)
+    payloads = [(s, w, json.dumps(p)) for s, w, p in synthetic.sleeper_payloads(df)]
+    with conn:
+        conn.execute(f"DROP TABLE IF EXISTS {ingest_stats.TABLE}")
+    ingest_stats.ensure_table(conn)
+
+    with profiling.stage("ingest"):
+        for season, week, text in payloads:
+            ingest_stats.insert_rows(conn, ingest_stats.parse_week(season, week, json.loads(text)))
+
+
+def stage_store(conn):
+    import feature_store
+    with profiling.stage("store"):
+        feature_store.build(conn)
+
+
+def stage_app_load(conn):
+    import app_data
+    import player_search
+    with profiling.stage("app_load"):
+        df = app_data.read(APP_TABLE, APP_COLUMNS, prefixes=("proj_",), conn=conn)
+        index = player_search.PlayerIndex(df, weight="median")
+        for q in ("jamarr", "mcaffery", "smith", "kel"):
+            index.search(q)
+
+
+IN_PROCESS = {"ingest": stage_ingest, "store": stage_store, "app_load": stage_app_load}
+
+
+# ---------- Runner ----------
+def _profile_path(stage):
+    # scripts profile as their own root stage; in-process stages nest under bench
+    return os.path.splitext(stage["script"])[0] if "script" in stage else f"bench/{stage['name']}"
+
+
+def run_stage(stage, workdir):
+    db_path = os.path.join(workdir, "fantasy.db")
+    report_path = os.path.join(workdir, "profile", f"{stage['name']}.json")
+    if "script" in stage:
+        cmd = [sys.executable, os.path.join(HERE, stage["script"])] + stage.get("args", [])
+    else:
+        cmd = [sys.executable, os.path.join(HERE, "bench.py"), "stage", stage["name"]]
+    env = dict(os.environ, FANTASY_DB=os.path.abspath(db_path),
+               **{profiling.ENV_VAR: os.path.abspath(report_path)})
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [HERE, env.get("PYTHONPATH")]))
+
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=workdir, env=env, capture_output=True, text=True)
+    process_s = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{stage['name']} failed:\n{proc.stderr.strip()}")
+
+    rep = profiling.load(report_path)
+    s = next(x for x in rep["stages"] if x["path"] == _profile_path(stage))
+    return {"wall_s": s["wall_s"], "cpu_s": s["cpu_s"], "process_s": process_s,
+            "peak_rss_mb": s["peak_rss_mb"], "rows_in": s["rows_in"], "rows_out": s["rows_out"],
+            "sql_s": s["sql_s"]}
+
+
+def run_scale(seasons, players, out_dir=OUT_DIR, seed=SEED, only=None):
+    workdir = os.path.join(out_dir, f"s{seasons}_p{players}")
+    os.makedirs(workdir, exist_ok=True)
+    db_path = os.path.join(workdir, "fantasy.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    start = time.perf_counter()
+    tables = synthetic.write(db_path, seasons, players, seed)
+    rows = len(tables["all_weeks_joined"])
+    print(f"🔄 {seasons} season(s) × {players} players: {rows} rows "
+          f"generated in {time.perf_counter() - start:.1f}s")
+
+    result = {"seasons": seasons, "players": players, "rows": rows,
+              "db_mb": os.path.getsize(db_path) / profiling.MB, "stages": {}}
+    for stage in STAGES:
+        if only and stage["name"] not in only:
+            continue
+        r = run_stage(stage, workdir)
+        r["rows_per_s"] = rows / r["wall_s"] if r["wall_s"] else None
+        result["stages"][stage["name"]] = {"group": stage["group"], **r}
+        print(f"  ✅ {stage['name']:<10} {r['wall_s']:>7.2f}s  {r['rows_per_s'] or 0:>11,.0f} rows/s  "
+              f"peak {r['peak_rss_mb']:>6.0f} MB")
+    return result
+
+
+# ---------- Output ----------
+CSV_FIELDS = ["seasons", "players", "rows", "stage", "group", "wall_s", "cpu_s", "process_s",
+              "rows_per_s", "peak_rss_mb", "sql_s"]
+
+
+def write_results(results, out_dir=OUT_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "results.json"), "w") as f:
+        json.dump({"seed": SEED, "python": sys.version.split()[0], "finished_at": time.time(),
+                   "scales": results}, f, indent=2)
+    with open(os.path.join(out_dir, "curves.csv"), "w", newline="") as f:
+        w = csv.DictWriter(f, CSV_FIELDS, extrasaction="ignore")
+        w.writeheader()
+        for r in results:
+            for name, s in r["stages"].items():
+                w.writerow({"seasons": r["seasons"], "players": r["players"], "rows": r["rows"],
+                            "stage": name, **s})
+    if plt is not None and results:
+        plot(results, os.path.join(out_dir, "curves.png"))
+    print(f"📊 results written to {out_dir}")
+
+
+def plot(results, path):
+    fig, (ax_t, ax_m) = plt.subplots(1, 2, figsize=(12, 4.5))
+    rows = [r["rows"] for r in results]
+    for stage in STAGES:
+        name = stage["name"]
+        if not all(name in r["stages"] for r in results):
+            continue
+        ax_t.plot(rows, [r["stages"][name]["rows_per_s"] for r in results], marker="o", label=name)
+        ax_m.plot(rows, [r["stages"][name]["peak_rss_mb"] for r in results], marker="o", label=name)
+    for ax, label in ((ax_t, "rows / s"), (ax_m, "peak RSS (MB)")):
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel("all_weeks_joined rows")
+        ax.set_ylabel(label)
+        ax.grid(True, alpha=0.3)
+    ax_m.legend(fontsize=8)
+    fig.tight_layout()
+    fig.savefig(path, dpi=120)
+
+
+def _scale(text):
+    # "3x1000" → (3, 1000)
+    seasons, _, players = text.lower().partition("x")
+    return int(seasons), int(players)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline on synthetic leagues of growing size.")
+    sub = parser.add_subparsers(dest="cmd")
+    one = sub.add_parser("stage", help=argparse.SUPPRESS)
+    one.add_argument("name", choices=list(IN_PROCESS))
+    parser.add_argument("--scales", nargs="*", type=_scale, default=SCALES, help="e.g. 1x480 3x1000")
+    parser.add_argument("--only", nargs="*", choices=[s["name"] for s in STAGES])
+    parser.add_argument("--out", default=OUT_DIR)
+    args = parser.parse_args()
+
+    if args.cmd == "stage":
+        conn = db.connect()
+        IN_PROCESS[args.name](conn)
+        conn.close()
+    else:
+        results = [run_scale(s, p, args.out, only=args.only) for s, p in args.scales]
+        write_results(results, args.out)
@@ -0,0 +1,313 @@
+import argparse
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+import db
+
+# ---------------- CONFIG ----------------
+DB_PATH = db.DB_PATH
+SOURCE_TABLE = "all_weeks"
+JOINED_TABLE = "all_weeks_joined"
+BY_POSITION_TABLE = "opponent_strength_by_position_v2"
+OFFADJ_TABLE = "opponent_strength_offadj_v2"
+JOIN_EASE_TABLE = "opponent_strength_offadj"   # ease_factor source for all_weeks_joined
+MAX_ITER = 100
+TOL = 1e-6
+# ----------------------------------------
+
+# ======================================
+# Opponent strength / ease tables
+# ======================================
+# defense_games   one row per (defense_team, position, week) for every week
+#                 the defense played: what it allowed to the position in
+#                 that game (zeros when the position had no rows)
+# defense_totals  running sums of defense_games per (defense_team, position)
+# defense_weeks   hash of each ingested week's game rows
+#
+# Ingesting a week replaces that week's game rows and adjusts the running
+# totals of only the defenses that played, so the raw tables never rescan
+# old weeks. By default only weeks whose hash changed (new weeks and
+# corrections to old ones) are re-ingested. From those:
+#
+# opponent_strength_by_position_v2
+#   avg_pts_pg / avg_yards_pg / avg_td_pg = totals / games the defense played
+#   opponent_strength_index = pts + 0.1·yards + 4·td (unrounded averages),
+#   scaled 0–100 per position
+#
+# opponent_strength_offadj_v2  (offense-adjusted)
+#   pts allowed in a game ≈ offense[team, pos] × ease[defense, pos]
+#   solved by alternating ratio-of-sums updates (vectorized with bincount),
+#   warm-started from the stored ease values, normalized to mean 1.
+#   ease_factor > 1 → defense gives up more than those offenses usually score.
+#
+# The _v2 names keep the hand-built opponent_strength_by_position /
+# opponent_strength_offadj tables intact: games, yards and TDs match them,
+# but some of their points averages (±0.02, mostly QB) and their offense
+# adjustment can't be rebuilt exactly from the current all_weeks.
+#
+# all_weeks_joined is refreshed in the same run from JOIN_EASE_TABLE — the
+# validated original opponent_strength_offadj, which reproduces the live
+# ease_factor exactly — so new all_weeks rows reach the models without
+# them switching to the unvalidated _v2 values (--ease-table picks another
+# table, e.g. _v2 on a synthetic league that has no original).
+
+GAMES_TABLE = "defense_games"
+TOTALS_TABLE = "defense_totals"
+WEEKS_TABLE = "defense_weeks"
+GAME_COLUMNS = ["defense_team", "position", "week_num", "team", "pts", "yards", "td"]
+
+# All yards / TDs the position gained against the defense
+YARDS_SQL = "COALESCE(pass_yd, 0) + COALESCE(rush_yd, 0) + COALESCE(rec_yd, 0)"
+TDS_SQL = "COALESCE(pass_td, 0) + COALESCE(rush_td, 0) + COALESCE(rec_td, 0)"
+
+OSI_WEIGHTS = {"pts": 1.0, "yards": 0.1, "td": 4.0}
+
+
+def ensure_tables(conn):
+    conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS {GAMES_TABLE} (
+            defense_team TEXT    NOT NULL,
+            position     TEXT    NOT NULL,
+            week_num     INTEGER NOT NULL,
+            team         TEXT,
+            pts          REAL    NOT NULL,
+            yards        REAL    NOT NULL,
+            td           REAL    NOT NULL,
+            PRIMARY KEY (defense_team, position, week_num)
+        );
+        CREATE TABLE IF NOT EXISTS {TOTALS_TABLE} (
+            defense_team TEXT    NOT NULL,
+            position     TEXT    NOT NULL,
+            games        INTEGER NOT NULL,
+            pts          REAL    NOT NULL,
+            yards        REAL    NOT NULL,
+            td           REAL    NOT NULL,
+            PRIMARY KEY (defense_team, position)
+        );
+        CREATE TABLE IF NOT EXISTS {WEEKS_TABLE} (
+            week_num  INTEGER PRIMARY KEY,
+            rows_hash TEXT    NOT NULL
+        );
+    """)
+
+
+# ---------- Incremental aggregates ----------
+def source_games(conn, source=SOURCE_TABLE):
+    """defense_games rows for every source week.
+
+    Each defense gets a row per position for every week it played, so a
+    game where the position scored nothing still counts as a game.
+    """
+    return db.read_sql(f"""
+        WITH played AS (
+            SELECT DISTINCT opponent, week_num FROM {source}
+            WHERE opponent IS NOT NULL AND week_num IS NOT NULL
+        ), positions AS (
+            SELECT DISTINCT position FROM {source} WHERE position IS NOT NULL
+        ), allowed AS (
+            SELECT opponent, position, week_num, MAX(team) AS team,
+                   SUM(COALESCE(pts_ppr, 0)) AS pts,
+                   SUM({YARDS_SQL}) AS yards,
+                   SUM({TDS_SQL}) AS td
+            FROM {source}
+            WHERE opponent IS NOT NULL AND week_num IS NOT NULL
+            GROUP BY opponent, position, week_num
+        )
+        SELECT g.opponent AS defense_team, p.position, g.week_num, a.team,
+               COALESCE(a.pts, 0) AS pts, COALESCE(a.yards, 0) AS yards, COALESCE(a.td, 0) AS td
+        FROM played g
+        CROSS JOIN positions p
+        LEFT JOIN allowed a
+          ON a.opponent = g.opponent AND a.position = p.position AND a.week_num = g.week_num
+        ORDER BY g.week_num, g.opponent, p.position
+    """, conn)
+
+
+def _games_hash(games):
+    h = hashlib.sha1()
+    for row in games[GAME_COLUMNS].itertuples(index=False, name=None):
+        h.update(repr(row).encode())
+    return h.hexdigest()
+
+
+def _add_totals(conn, rows, sign):
+    conn.executemany(f"""
+        INSERT INTO {TOTALS_TABLE} (defense_team, position, games, pts, yards, td)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(defense_team, position) DO UPDATE SET
+            games = games + excluded.games,
+            pts   = pts   + excluded.pts,
+            yards = yards + excluded.yards,
+            td    = td    + excluded.td
+    """, [(d, p, sign, sign * pts, sign * yds, sign * td) for d, p, pts, yds, td in rows])
+
+
+def ingest_week(conn, week, new):
+    """Replace one week's game rows with new; returns the (defense_team, position) pairs touched.
+
+    An empty frame removes the week.
+    """
+    with conn:
+        old = conn.execute(
+            f"SELECT defense_team, position, pts, yards, td FROM {GAMES_TABLE} WHERE week_num = ?",
+            (int(week),)).fetchall()
+        _add_totals(conn, old, -1)
+        conn.execute(f"DELETE FROM {GAMES_TABLE} WHERE week_num = ?", (int(week),))
+
+        conn.executemany(f"INSERT INTO {GAMES_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         new[GAME_COLUMNS].itertuples(index=False, name=None))
+        _add_totals(conn, new[["defense_team", "position", "pts", "yards", "td"]]
+                    .itertuples(index=False, name=None), +1)
+        conn.execute(f"DELETE FROM {TOTALS_TABLE} WHERE games <= 0")
+        if len(new):
+            conn.execute(f"INSERT OR REPLACE INTO {WEEKS_TABLE} VALUES (?, ?)",
+                         (int(week), _games_hash(new)))
+        else:
+            conn.execute(f"DELETE FROM {WEEKS_TABLE} WHERE week_num = ?", (int(week),))
+    return {(d, p) for d, p, *_ in old} | set(zip(new["defense_team"], new["position"]))
+
+
+def ingest(conn, weeks=None, source=SOURCE_TABLE):
+    """Ingest the given weeks (default: source weeks that are new, changed or gone)."""
+    ensure_tables(conn)
+    games = source_games(conn, source)
+    by_week = {int(w): g for w, g in games.groupby("week_num", sort=True)}
+    if weeks is None:
+        stored = dict(conn.execute(f"SELECT week_num, rows_hash FROM {WEEKS_TABLE}").fetchall())
+        gone = set(stored) - set(by_week)
+        weeks = sorted(gone | {w for w, g in by_week.items() if stored.get(w) != _games_hash(g)})
+
+    touched = set()
+    empty = games.iloc[:0]
+    for week in weeks:
+        touched |= ingest_week(conn, week, by_week.get(int(week), empty))
+        print(f"✅ week {week} ingested")
+    return touched
+
+
+# ---------- Outputs ----------
+def _scale_0_100(s):
+    lo, hi = s.min(), s.max()
+    return (s - lo) / (hi - lo) * 100 if hi > lo else s * 0 + 50.0
+
+
+def strength_by_position(conn):
+    tot = db.read_sql(f"SELECT * FROM {TOTALS_TABLE}", conn)
+    avg = {k: tot[k] / tot["games"] for k in ("pts", "yards", "td")}
+    osi = sum(OSI_WEIGHTS[k] * avg[k] for k in OSI_WEIGHTS)
+    out = pd.DataFrame({
+        "defense_team": tot["defense_team"],
+        "position": tot["position"],
+        "avg_pts_pg": avg["pts"].round(2),
+        "avg_yards_pg": avg["yards"].round(2),
+        "avg_td_pg": avg["td"].round(2),
+        "games_count": tot["games"],
+        "opponent_strength_index": osi.round(2),
+        "osi_scaled_0_100": osi.groupby(tot["position"]).transform(_scale_0_100).round(1),
+    })
+    return out.sort_values(["position", "osi_scaled_0_100"], ascending=[True, False])
+
+
+def offense_adjusted(games, start=None, max_iter=MAX_ITER, tol=TOL):
+    """Ease factors for one position's games via alternating multiplicative updates.
+
+    games: defense_team, team, pts. start: optional {defense_team: ease} warm start.
+    Returns (ease Series by defense, games counted per defense, iterations).
+    """
+    d_codes, defenses = pd.factorize(games["defense_team"])
+    o_codes, _ = pd.factorize(games["team"])
+    y = games["pts"].to_numpy(dtype=np.float64)
+    n_def, n_off = len(defenses), int(o_codes.max()) + 1
+
+    ease = np.ones(n_def)
+    if start:
+        ease = np.array([start.get(d, 1.0) for d in defenses], dtype=np.float64)
+
+    off_pts = np.bincount(o_codes, y, n_off)
+    def_pts = np.bincount(d_codes, y, n_def)
+    for it in range(1, max_iter + 1):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            offense = off_pts / np.bincount(o_codes, ease[d_codes], n_off)
+            expected = np.bincount(d_codes, offense[o_codes], n_def)
+            new = np.where(expected > 0, def_pts / expected, 1.0)
+        new /= new.mean()
+        done = np.max(np.abs(new - ease)) < tol
+        ease = new
+        if done:
+            break
+
+    counted = np.bincount(d_codes, (offense[o_codes] > 0).astype(np.float64), n_def)
+    return pd.Series(ease, index=defenses), pd.Series(counted.astype(int), index=defenses), it
+
+
+def ease_table(conn, warm=True):
+    games = db.read_sql(f"SELECT defense_team, position, team, pts FROM {GAMES_TABLE} "
+                        f"WHERE team IS NOT NULL", conn)
+    prev = {}
+    if warm and OFFADJ_TABLE in db.list_tables(conn):
+        prev = db.read_sql(f"SELECT position, defense_team, ease_factor FROM {OFFADJ_TABLE}", conn)
+        prev = {p: dict(zip(g["defense_team"], g["ease_factor"])) for p, g in prev.groupby("position")}
+
+    out = []
+    for pos, g in games.groupby("position"):
+        ease, n_games, iters = offense_adjusted(g, prev.get(pos))
+        print(f"   {pos}: converged in {iters} iterations")
+        out.append(pd.DataFrame({
+            "defense_team": ease.index,
+            "position": pos,
+            "ease_factor": ease.to_numpy().round(3),
+            "n_games": n_games.to_numpy(),
+        }))
+    out = pd.concat(out, ignore_index=True)
+    out["ease_0_100"] = out.groupby("position")["ease_factor"].transform(_scale_0_100).round(1)
+    return out.sort_values(["position", "ease_factor"], ascending=[True, False])
+
+
+def join_ease(conn, ease=JOIN_EASE_TABLE, source=SOURCE_TABLE, joined=JOINED_TABLE):
+    """Rebuild all_weeks_joined = all_weeks + the opponent's ease_factor from ease."""
+    df = db.read_sql(f"""
+        SELECT a.*, e.ease_factor
+        FROM {source} a
+        LEFT JOIN {ease} e
+          ON e.defense_team = a.opponent AND e.position = a.position
+    """, conn)
+    db.write_table(df, joined, conn)
+
+
+def build(db_path=DB_PATH, weeks=None, rebuild=False, join=True, ease=JOIN_EASE_TABLE):
+    conn = db.connect(db_path)
+    if rebuild:
+        with conn:
+            for table in (GAMES_TABLE, TOTALS_TABLE, WEEKS_TABLE):
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+    touched = ingest(conn, weeks)
+    print(f"🔄 {len(touched)} defense/position aggregates updated")
+
+    db.write_tables({
+        BY_POSITION_TABLE: strength_by_position(conn),
+        OFFADJ_TABLE: ease_table(conn, warm=not rebuild),
+    }, conn)
+    print(f"✅ {BY_POSITION_TABLE} and {OFFADJ_TABLE} written")
+    if join and ease not in db.list_tables(conn):
+        print(f"⚠️  No {ease} table — {JOINED_TABLE} left as it is")
+    elif join:
+        join_ease(conn, ease)
+        print(f"✅ {JOINED_TABLE} refreshed from {ease}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the opponent strength / ease tables.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--weeks", type=int, nargs="*", default=None,
+                        help="weeks to (re)ingest (default: weeks that are new or changed)")
+    parser.add_argument("--rebuild", action="store_true", help="drop the aggregates and start over")
+    parser.add_argument("--no-join", action="store_true", help=f"don't refresh {JOINED_TABLE}.ease_factor")
+    parser.add_argument("--ease-table", default=JOIN_EASE_TABLE,
+                        help=f"ease_factor source for {JOINED_TABLE} (default: %(default)s)")
+    args = parser.parse_args()
+
+    build(args.db, args.weeks, args.rebuild, not args.no_join, args.ease_table)
@@ -0,0 +1,396 @@
+import argparse
+import hashlib
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+import profiling
+
+# ---------------- CONFIG ----------------
+DB_PATH = os.environ.get("FANTASY_DB", "fantasy.db")
+
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,        # KiB → 64 MB page cache
+    "temp_store": "MEMORY",
+    "busy_timeout": 30_000,          # ms; parallel pipeline stages share one file
+}
+POOL_SIZE = 4
+# ----------------------------------------
+
+# ======================================
+# Schema
+# ======================================
+# Typed columns, primary keys and indexes for the tables the pipeline reads.
+# Tables not listed here (e.g. the wide *_week11_predictions frames) are
+# still written through write_table, just with column types inferred.
+
+_STATS = [
+    ("pts_std", "REAL"), ("pts_ppr", "REAL"), ("pts_half_ppr", "REAL"),
+    ("pass_att", "REAL"), ("pass_cmp", "REAL"), ("pass_yd", "REAL"),
+    ("pass_td", "REAL"), ("pass_int", "REAL"),
+    ("rush_att", "REAL"), ("rush_yd", "REAL"), ("rush_td", "REAL"),
+    ("rec_tgt", "REAL"), ("rec", "REAL"), ("rec_yd", "REAL"), ("rec_td", "REAL"),
+    ("off_snp", "REAL"),
+]
+
+_PLAYER = [("playerID", "TEXT"), ("playerName", "TEXT"), ("team", "TEXT"), ("position", "TEXT")]
+
+_WEEKLY_INDEXES = [("position", "week_num"), ("playerID", "week_num"), ("opponent", "position")]
+
+SCHEMA = {
+    "all_weeks": {
+        "columns": _PLAYER + _STATS + [("opponent", "TEXT"), ("week_num", "INTEGER")],
+        "indexes": _WEEKLY_INDEXES,
+    },
+    "all_weeks_joined": {
+        "columns": _PLAYER + _STATS + [("opponent", "TEXT"), ("week_num", "INTEGER"),
+                                       ("ease_factor", "REAL")],
+        "indexes": _WEEKLY_INDEXES,
+    },
+    "players": {
+        "columns": [("playerID", "TEXT"), ("playerName", "TEXT"),
+                    ("position", "TEXT"), ("team", "TEXT"), ("row_hash", "TEXT")],
+        "primary_key": ["playerID"],
+        "indexes": [("position",), ("team",)],
+    },
+    "nfl_matchups": {
+        "columns": [("week", "INTEGER"), ("team", "TEXT"), ("opponent", "TEXT")],
+        "primary_key": ["week", "team"],
+    },
+    "opponent_strength_offadj": {
+        "columns": [("defense_team", "TEXT"), ("position", "TEXT"), ("ease_factor", "REAL"),
+                    ("n_games", "INTEGER"), ("ease_0_100", "REAL")],
+        "primary_key": ["defense_team", "position"],
+    },
+    "opponent_strength_by_position": {
+        "columns": [("defense_team", "TEXT"), ("position", "TEXT"), ("avg_pts_pg", "REAL"),
+                    ("avg_yards_pg", "REAL"), ("avg_td_pg", "REAL"), ("games_count", "INTEGER"),
+                    ("opponent_strength_index", "REAL"), ("osi_scaled_0_100", "REAL")],
+        "primary_key": ["defense_team", "position"],
+    },
+    "player_baselines": {
+        "columns": _PLAYER + [("opponent", "TEXT"), ("week_num", "INTEGER"),
+                              ("rec_tgt_roll", "REAL"), ("rush_att_roll", "REAL"),
+                              ("off_snp_roll", "REAL"), ("ease_roll", "REAL"),
+                              ("rec_tgt_ewm", "REAL"), ("rush_att_ewm", "REAL"),
+                              ("off_snp_ewm", "REAL"), ("ease_ewm", "REAL")],
+        "indexes": [("playerID", "week_num"), ("position", "week_num")],
+    },
+    "baseline_state": {
+        "primary_key": ["playerID"],
+    },
+    "baseline_weeks": {
+        "columns": [("week_num", "INTEGER"), ("rows_hash", "TEXT")],
+        "primary_key": ["week_num"],
+    },
+    "week11_inputs": {
+        "columns": _PLAYER + [("opponent", "TEXT"), ("last_week", "INTEGER"),
+                              ("rec_tgt_base", "REAL"), ("rush_att_base", "REAL"),
+                              ("off_snp_base", "REAL"), ("ease_base", "REAL")],
+        "indexes": [("position",), ("playerID",)],
+    },
+    "ros_projections": {
+        "columns": [("playerID", "TEXT"), ("playerName", "TEXT"), ("team", "TEXT"),
+                    ("position", "TEXT"), ("week_num", "INTEGER"), ("opponent", "TEXT"),
+                    ("ease_factor", "REAL"), ("mu", "REAL")],
+        "primary_key": ["playerID", "week_num"],
+        "indexes": [("week_num", "position"), ("team", "week_num")],
+    },
+    "week11_simulated_all": {
+        "indexes": [("position",), ("playerID",)],
+    },
+}
+
+for _pos in ("wr", "rb", "te", "qb"):
+    SCHEMA[f"{_pos}_residuals"] = {
+        "columns": [("playerID", "TEXT"), ("week_num", "INTEGER"), ("resid", "REAL")],
+        "indexes": [("playerID", "week_num")],
+    }
+    SCHEMA[f"{_pos}_model_coefs"] = {
+        "columns": [("feature", "TEXT"), ("coef", "REAL")],
+    }
+
+# build_ease_table.py writes its rebuilt tables next to the originals
+for _table in ("opponent_strength_offadj", "opponent_strength_by_position"):
+    SCHEMA[f"{_table}_v2"] = SCHEMA[_table]
+
+VERSIONS_TABLE = "_table_versions"
+
+
+# ======================================
+# Connections
+# ======================================
+def connect(path=None, **kwargs):
+    """New connection with the tuned pragmas applied."""
+    conn = sqlite3.connect(path or DB_PATH, check_same_thread=False, **kwargs)
+    for key, value in PRAGMAS.items():
+        conn.execute(f"PRAGMA {key}={value}")
+    return conn
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _pool(path):
+    with _pools_lock:
+        if path not in _pools:
+            _pools[path] = queue.LifoQueue(maxsize=POOL_SIZE)
+        return _pools[path]
+
+
+@contextmanager
+def get_connection(path=None):
+    """Borrow a pooled connection; it goes back to the pool on exit."""
+    path = path or DB_PATH
+    pool = _pool(path)
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = connect(path)
+
+    try:
+        yield conn
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        try:
+            pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+def close_all():
+    with _pools_lock:
+        for pool in _pools.values():
+            while not pool.empty():
+                pool.get_nowait().close()
+        _pools.clear()
+
+
+# ======================================
+# Reads / writes
+# ======================================
+def read_sql(sql, conn=None, params=None, **kwargs):
+    if conn is None:
+        with get_connection() as c:
+            return read_sql(sql, c, params, **kwargs)
+    start = time.perf_counter()
+    df = pd.read_sql(sql, conn, params=params, **kwargs)
+    profiling.record_read(sql, df, time.perf_counter() - start)
+    return df
+
+
+def _sql_type(series):
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(series):
+        return "REAL"
+    return "TEXT"
+
+
+def _column_defs(df, table):
+    spec = SCHEMA.get(table, {})
+    declared = dict(spec.get("columns", []))
+    return [(c, declared.get(c) or _sql_type(df[c])) for c in df.columns]
+
+
+def create_indexes(conn, table):
+    spec = SCHEMA.get(table, {})
+    existing = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+    for cols in spec.get("indexes", []):
+        if set(cols) <= existing:
+            name = f"idx_{table}_{'_'.join(cols)}"
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(cols)})")
+
+
+def _write(conn, df, table, if_exists):
+    start = time.perf_counter()
+    spec = SCHEMA.get(table, {})
+    cols = _column_defs(df, table)
+    pk = [c for c in spec.get("primary_key", []) if c in df.columns]
+
+    body = ", ".join(f'"{c}" {t}' for c, t in cols)
+    if pk and len(pk) == len(spec.get("primary_key", [])):
+        body += f", PRIMARY KEY ({', '.join(pk)})"
+
+    placeholders = ", ".join("?" * len(cols))
+    verb = "INSERT OR REPLACE" if pk else "INSERT"
+
+    # NaN → NULL, numpy scalars → Python scalars
+    values = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+
+    if if_exists == "replace":
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({body})")
+    conn.executemany(f"{verb} INTO {table} VALUES ({placeholders})", values)
+    create_indexes(conn, table)
+    track_changes(conn, table)
+    bump_version(conn, table)
+    profiling.record_write(table, len(df), time.perf_counter() - start)
+    return len(df)
+
+
+def write_table(df, table, conn=None, if_exists="replace"):
+    """Write a frame using the declared schema (typed columns, keys, indexes).
+
+    Replaces the table by default, like DataFrame.to_sql(..., if_exists="replace").
+    """
+    return write_tables({table: df}, conn, if_exists)
+
+
+def write_tables(frames, conn=None, if_exists="replace", before=()):
+    """Write several {table: frame} in a single transaction (all or nothing).
+
+    if_exists may be a {table: mode} dict; unlisted tables are replaced.
+    before: (sql, params) statements run first in the same transaction,
+    e.g. a DELETE of the rows an append is about to rewrite.
+    """
+    if conn is None:
+        with get_connection() as c:
+            return write_tables(frames, c, if_exists, before)
+
+    modes = if_exists if isinstance(if_exists, dict) else {}
+    default = "replace" if modes else if_exists
+    with conn:
+        for sql, params in before:
+            conn.execute(sql, params)
+        return sum(_write(conn, df, table, modes.get(table, default)) for table, df in frames.items())
+
+
+# ======================================
+# Table versions
+# ======================================
+# Every table carries AFTER INSERT/UPDATE/DELETE triggers that bump its row
+# in _table_versions, so the version moves on any change made through
+# SQLite — write_table, an ad-hoc UPDATE from the sqlite3 shell, an upsert —
+# not just on writes made by this module. write_table installs the triggers
+# after its bulk insert (so the insert itself isn't slowed down row by row);
+# table_version installs them on first sight of a table created elsewhere.
+# The version also carries the last bump time, so a database rebuilt from
+# scratch never repeats an old version string.
+
+_NOW = "((julianday('now') - 2440587.5) * 86400.0)"      # unix time, ms resolution
+
+
+def _ensure_versions_table(conn):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} (
+            name       TEXT PRIMARY KEY,
+            version    INTEGER NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """)
+
+
+def bump_version(conn, table):
+    _ensure_versions_table(conn)
+    conn.execute(f"""
+        INSERT INTO {VERSIONS_TABLE} (name, version, updated_at) VALUES (?, 1, ?)
+        ON CONFLICT(name) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at
+    """, (table, time.time()))
+
+
+def _trigger_names(table):
+    return {op: f"_v_{table}_{op.lower()}" for op in ("INSERT", "UPDATE", "DELETE")}
+
+
+def track_changes(conn, table):
+    """Install the version triggers on table (no-op if they exist). Returns True if installed."""
+    names = _trigger_names(table)
+    have = {r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?", (table,))}
+    if set(names.values()) <= have or table == VERSIONS_TABLE:
+        return False
+    _ensure_versions_table(conn)
+    for op, name in names.items():
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS "{name}" AFTER {op} ON "{table}"
+            BEGIN
+                UPDATE {VERSIONS_TABLE} SET version = version + 1, updated_at = {_NOW}
+                WHERE name = '{table}';
+            END
+        """)
+    # whatever happened before the triggers existed is unknown: treat it as a change
+    bump_version(conn, table)
+    return True
+
+
+def table_version(conn, table):
+    """Version string that changes whenever the table's contents change (None if no table)."""
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                        (table,)).fetchone():
+        return None
+    if track_changes(conn, table):
+        conn.commit()
+    version, updated_at = conn.execute(
+        f"SELECT version, updated_at FROM {VERSIONS_TABLE} WHERE name = ?", (table,)).fetchone()
+    return f"{version}-{updated_at:.3f}"
+
+
+def table_hash(conn, table, chunk_rows=10_000):
+    """Full content hash (slower than table_version, exact)."""
+    h = hashlib.sha1()
+    cur = conn.execute(f"SELECT * FROM {table}")
+    h.update(repr([d[0] for d in cur.description]).encode())
+    while True:
+        rows = cur.fetchmany(chunk_rows)
+        if not rows:
+            break
+        h.update(repr(rows).encode())
+    return h.hexdigest()
+
+
+# ======================================
+# Maintenance
+# ======================================
+def list_tables(conn):
+    return [r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"
+    )]
+
+
+def migrate(conn, tables=None):
+    """Rewrite existing tables into the declared schema and index them."""
+    existing = set(list_tables(conn))
+    for table in tables or SCHEMA:
+        if table not in existing:
+            continue
+        df = read_sql(f"SELECT * FROM {table}", conn)
+        write_table(df, table, conn)
+        print(f"✅ {table}: {len(df)} rows")
+    conn.execute("ANALYZE")
+
+
+def ensure_indexes(conn):
+    existing = set(list_tables(conn))
+    with conn:
+        for table in SCHEMA:
+            if table in existing:
+                create_indexes(conn, table)
+    conn.execute("ANALYZE")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply the fantasy.db schema.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--migrate", action="store_true",
+                        help="rewrite tables with typed columns/keys (default: add indexes only)")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    if args.migrate:
+        migrate(conn)
+    else:
+        ensure_indexes(conn)
+    conn.close()
+    print(f"✅ Schema applied to {args.db}")
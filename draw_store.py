@@ -0,0 +1,159 @@
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# ---------------- CONFIG ----------------
+STORE_DIR = os.path.join("data", "draws")
+DTYPE = "float32"        # "float16" halves the file (~0.03 pt steps near 30 pts; values
+                         # sitting right at a threshold can round across it)
+CHUNK_ROWS = 512         # rows reduced at a time when scanning the matrix
+# ----------------------------------------
+
+# ======================================
+# Persisted simulation draws
+# ======================================
+# simulate_week11.py streams its (players × sims) draw matrix into
+#
+#   draws.npy      players × sims, DTYPE, memory-mapped on read
+#   ids.npy        playerID per row (+ position.npy / team.npy)
+#   manifest.json  rows, sims, dtype, seed, source, written_at
+#
+# Readers map the file and slice rows by playerID, so a quantile, a
+# threshold probability or a lineup's total-points distribution touches
+# only the rows involved. The draws are written under a temporary name;
+# publishing removes the manifest, renames the files into place and writes
+# the manifest last, so a reader never sees a half-written store.
+
+META_COLUMNS = ["position", "team"]
+
+
+# ---------- Write ----------
+class DrawWriter:
+    """Streams blocks of draws into a new store; call close() to publish it."""
+
+    def __init__(self, ids, sims, path=STORE_DIR, dtype=DTYPE, meta=None, **info):
+        os.makedirs(path, exist_ok=True)
+        self.path, self.sims, self.dtype, self.info = path, int(sims), np.dtype(dtype), info
+        self.ids = np.asarray([str(i) for i in ids])
+        self.meta = {c: pd.Series(v).fillna("").astype(str).to_numpy(dtype=str) for c, v in (meta or {}).items()}
+        self._tmp = os.path.join(path, "draws.npy.tmp")
+        self.draws = np.lib.format.open_memmap(self._tmp, mode="w+", dtype=dtype,
+                                               shape=(len(self.ids), self.sims))
+
+    def write(self, row_start, col_start, block):
+        """Store block at draws[row_start:, col_start:] (simulator chunk callback)."""
+        rows, cols = block.shape
+        self.draws[row_start:row_start + rows, col_start:col_start + cols] = block
+
+    def close(self):
+        self.draws.flush()
+        del self.draws
+        manifest_path = os.path.join(self.path, "manifest.json")
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)        # readers see "no store", never a mix
+        os.replace(self._tmp, os.path.join(self.path, "draws.npy"))
+        np.save(os.path.join(self.path, "ids.npy"), self.ids)
+        for c, arr in self.meta.items():
+            np.save(os.path.join(self.path, f"{c}.npy"), arr)
+
+        manifest = {"rows": len(self.ids), "sims": self.sims, "dtype": self.dtype.str,
+                    "meta": list(self.meta), "written_at": time.time(), **self.info}
+        tmp = os.path.join(self.path, "manifest.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, manifest_path)
+        return manifest
+
+
+def save(draws, ids, path=STORE_DIR, dtype=DTYPE, meta=None, **info):
+    """Write an in-memory draw matrix in one go."""
+    writer = DrawWriter(ids, draws.shape[1], path, dtype, meta, **info)
+    writer.write(0, 0, draws)
+    return writer.close()
+
+
+# ---------- Read ----------
+def _manifest(path):
+    try:
+        with open(os.path.join(path, "manifest.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class DrawStore:
+    """Read-only, memory-mapped view of a saved draw matrix."""
+
+    def __init__(self, path=STORE_DIR):
+        self.manifest = _manifest(path)
+        if self.manifest is None:
+            raise FileNotFoundError(f"No draw store at {path}; run simulate_week11.py first")
+        self.draws = np.load(os.path.join(path, "draws.npy"), mmap_mode="r")
+        self.ids = np.load(os.path.join(path, "ids.npy"))
+        self.meta = {c: np.load(os.path.join(path, f"{c}.npy")) for c in self.manifest.get("meta", [])}
+        self.index = {}
+        for i, pid in enumerate(self.ids):
+            self.index.setdefault(str(pid), i)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def sims(self):
+        return self.draws.shape[1]
+
+    def rows(self, ids):
+        """Row numbers for playerIDs (-1 where a player has no draws)."""
+        return np.array([self.index.get(str(i), -1) for i in ids], dtype=np.int64)
+
+    def player(self, player_id):
+        """One player's draws as float32 (None if not stored)."""
+        i = self.index.get(str(player_id))
+        return None if i is None else np.asarray(self.draws[i], dtype=np.float32)
+
+    def _scan(self, ids, reduce):
+        """reduce(float32 block) per CHUNK_ROWS rows of the requested players (NaN rows if missing)."""
+        rows = np.arange(len(self)) if ids is None else self.rows(ids)
+        out = []
+        for start in range(0, len(rows), CHUNK_ROWS):
+            r = rows[start:start + CHUNK_ROWS]
+            block = np.asarray(self.draws[np.maximum(r, 0)], dtype=np.float32)
+            block[r < 0] = np.nan
+            out.append(reduce(block, start))
+        return np.concatenate(out) if out else np.empty(0)
+
+    def quantiles(self, quantiles=(10, 50, 90), ids=None):
+        """(players × quantiles) percentiles; ids=None → every stored row."""
+        return self._scan(ids, lambda b, _: np.percentile(b, quantiles, axis=1).T)
+
+    def prob_over(self, thresholds, ids=None):
+        """P(points > threshold) per player; thresholds is a scalar or one per player."""
+        t = np.asarray(thresholds, dtype=np.float32)
+        per_row = t.ndim > 0
+
+        def reduce(block, start):
+            cut = t[start:start + len(block), None] if per_row else t
+            p = (block > cut).mean(axis=1)
+            p[np.isnan(block[:, 0])] = np.nan
+            return p
+        return self._scan(ids, reduce)
+
+    def totals(self, ids):
+        """Distribution (sims,) of the summed points of a set of players, e.g. a lineup."""
+        rows = self.rows(ids)
+        if (rows < 0).any():
+            missing = [i for i, r in zip(ids, rows) if r < 0]
+            raise KeyError(f"No draws for {missing}")
+        return np.asarray(self.draws[np.sort(rows)], dtype=np.float32).sum(axis=0)
+
+    def head_to_head(self, ids_a, ids_b):
+        """P(Σ a > Σ b) using the same simulated outcomes for both sides."""
+        return float((self.totals(ids_a) > self.totals(ids_b)).mean())
+
+
+def open_store(path=STORE_DIR):
+    """DrawStore, or None if nothing has been saved yet."""
+    return DrawStore(path) if _manifest(path) is not None else None
@@ -1,24 +1,307 @@
-import sqlite3
-import pandas as pd
+import argparse
+import csv
+import fnmatch
+import gzip
+import hashlib
+import json
 import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-# Connect to your database
+import numpy as np
 
-db_path = r"C:\Users\cmice\repo\fantasy\fantasy.db"
-output_dir = "data/csv_exports"
-os.makedirs(output_dir, exist_ok=True)
+import db
 
-conn = sqlite3.connect(db_path)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
 
-# Get all table names
-tables = pd.read_sql_query("SELECT name FROM sqlite_master WHERE type='table';", conn)['name']
+# ---------------- CONFIG ----------------
+DB_PATH = db.DB_PATH
+OUTPUT_DIR = os.path.join("data", "csv_exports")
+FORMAT = "csv"               # csv | csv.gz | parquet (needs pyarrow) | npy
+CHUNK_ROWS = 20_000          # rows held in memory per table while exporting
+MAX_WORKERS = 4
+COMPRESS_LEVEL = 6           # gzip level for csv.gz
+EXCLUDE = ["*backup*", "_*"]  # backups (week1_backup) and bookkeeping tables (_table_versions)
+# ----------------------------------------
 
-# Export each table to CSV
-for table in tables:
-    df = pd.read_sql_query(f"SELECT * FROM {table};", conn)
-    csv_path = os.path.join(output_dir, f"{table}.csv")
-    df.to_csv(csv_path, index=False)
-    print(f"Exported {table} -> {csv_path}")
+# ======================================
+# Database export
+# ======================================
+# Every table is streamed from a cursor CHUNK_ROWS at a time straight into
+# its output file, so memory stays flat however big the table is, and
+# tables are exported in parallel processes (largest first).
+#
+# manifest.json in the output directory records each table's
+# db.table_version, content hash, row count and file. A table is skipped
+# when its version is unchanged — the version is bumped by triggers on
+# every INSERT/UPDATE/DELETE, so no scan is needed — or, if the version
+# moved, when its content hash still matches (e.g. rewritten with the same
+# rows). --verify hashes even when the version matches.
+#
+# Formats: csv / csv.gz (NULL → empty field, like DataFrame.to_csv),
+# parquet (one row group per chunk, column types from the declared SQLite
+# types) and npy (a directory per table with one .npy per column, the same
+# layout as the feature store: text → fixed-width str with "" for NULL,
+# INTEGER → int64, or float64 with NaN when the column has NULLs).
 
-conn.close()
-print("✅ All tables exported successfully.")
+MANIFEST = "manifest.json"
+FORMATS = ["csv", "csv.gz", "parquet", "npy"]
+
+
+# ---------- Table selection ----------
+def select_tables(conn, tables=None, exclude=EXCLUDE):
+    names = db.list_tables(conn)
+    if tables:
+        missing = set(tables) - set(names)
+        if missing:
+            raise SystemExit(f"❌ No such table(s): {', '.join(sorted(missing))}")
+        names = [t for t in names if t in tables]
+    return [t for t in names if not any(fnmatch.fnmatch(t, p) for p in exclude)]
+
+
+def _columns(conn, table):
+    """[(name, declared type)] in table order."""
+    return [(r[1], (r[2] or "").upper()) for r in conn.execute(f'PRAGMA table_info("{table}")')]
+
+
+def _kind(decl):
+    # SQLite type affinity rules, reduced to what the columnar formats need
+    if "INT" in decl:
+        return "int"
+    if any(t in decl for t in ("REAL", "FLOA", "DOUB", "NUMERIC")):
+        return "float"
+    return "text"
+
+
+def _hasher(columns):
+    h = hashlib.sha1()
+    h.update(repr([c for c, _ in columns]).encode())
+    return h
+
+
+def content_hash(conn, table, chunk_rows=CHUNK_ROWS):
+    """Hash of the header + rows, identical to what export_table computes while writing."""
+    cur = conn.execute(f'SELECT * FROM "{table}"')
+    h = _hasher([(d[0], None) for d in cur.description])
+    for rows in iter(lambda: cur.fetchmany(chunk_rows), []):
+        h.update(repr(rows).encode())
+    return h.hexdigest()
+
+
+# ---------- Writers ----------
+def _output_path(out_dir, table, fmt):
+    return os.path.join(out_dir, table if fmt == "npy" else f"{table}.{fmt}")
+
+
+def _write_csv(cur, columns, path, fmt, chunk_rows, h):
+    if fmt == "csv.gz":
+        f = gzip.open(path, "wt", newline="", encoding="utf-8", compresslevel=COMPRESS_LEVEL)
+    else:
+        f = open(path, "w", newline="", encoding="utf-8")
+    n = 0
+    with f:
+        w = csv.writer(f)
+        w.writerow([c for c, _ in columns])
+        for rows in iter(lambda: cur.fetchmany(chunk_rows), []):
+            h.update(repr(rows).encode())
+            w.writerows(rows)
+            n += len(rows)
+    return n
+
+
+_ARROW_TYPES = {"int": "int64", "float": "float64", "text": "string"}
+
+
+def _write_parquet(cur, columns, path, chunk_rows, h):
+    schema = pa.schema([(c, _ARROW_TYPES[_kind(t)]) for c, t in columns])
+    n = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for rows in iter(lambda: cur.fetchmany(chunk_rows), []):
+            h.update(repr(rows).encode())
+            cols = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(v, type=f.type) for v, f in zip(cols, schema)], schema=schema))
+            n += len(rows)
+        if n == 0:
+            writer.write_table(schema.empty_table())
+    return n
+
+
+def _write_npy(conn, cur, table, columns, path, chunk_rows, h):
+    # sizes come first: one aggregate pass gives the row count, the widest
+    # text value and whether each integer column has NULLs
+    aggs = ["COUNT(*)"] + [f'MAX(LENGTH("{c}"))' if _kind(t) == "text" else f'COUNT("{c}")'
+                           for c, t in columns]
+    stats = conn.execute(f'SELECT {", ".join(aggs)} FROM "{table}"').fetchone()
+    n_rows = stats[0]
+
+    os.makedirs(path, exist_ok=True)
+    arrays = {}
+    for (c, t), stat in zip(columns, stats[1:]):
+        kind = _kind(t)
+        if kind == "text":
+            dtype = f"<U{max(stat or 0, 1)}"
+        elif kind == "int" and stat == n_rows:
+            dtype = np.int64
+        else:
+            dtype = np.float64
+        arrays[c] = np.lib.format.open_memmap(os.path.join(path, f"{c}.npy"), mode="w+",
+                                              dtype=dtype, shape=(n_rows,))
+
+    start = 0
+    for rows in iter(lambda: cur.fetchmany(chunk_rows), []):
+        h.update(repr(rows).encode())
+        end = start + len(rows)
+        for (c, _), values in zip(columns, zip(*rows)):
+            arr = arrays[c]
+            if arr.dtype.kind == "U":
+                arr[start:end] = ["" if v is None else str(v) for v in values]
+            elif arr.dtype.kind == "f":
+                arr[start:end] = np.array(values, dtype=object).astype(np.float64)   # None → nan
+            else:
+                arr[start:end] = values
+        start = end
+    for arr in arrays.values():
+        arr.flush()
+    return start
+
+
+def export_table(db_path, table, fmt, out_dir, chunk_rows=CHUNK_ROWS):
+    """Stream one table to out_dir; returns its manifest entry. Runs in a worker process."""
+    start = time.perf_counter()
+    conn = db.connect(db_path)
+    columns = _columns(conn, table)
+    version = db.table_version(conn, table)
+    h = _hasher(columns)
+
+    path = _output_path(out_dir, table, fmt)
+    tmp = f"{path}.tmp"
+    cur = conn.execute(f'SELECT * FROM "{table}"')
+    try:
+        if fmt == "npy":
+            rows = _write_npy(conn, cur, table, columns, tmp, chunk_rows, h)
+        elif fmt == "parquet":
+            rows = _write_parquet(cur, columns, tmp, chunk_rows, h)
+        else:
+            rows = _write_csv(cur, columns, tmp, fmt, chunk_rows, h)
+    except BaseException:
+        _remove(tmp)
+        raise
+    finally:
+        conn.close()
+
+    _remove(path)
+    os.replace(tmp, path)
+    return {"version": version, "hash": h.hexdigest(), "rows": rows, "format": fmt,
+            "file": os.path.basename(path), "bytes": _size(path),
+            "seconds": round(time.perf_counter() - start, 3), "exported_at": time.time()}
+
+
+def _remove(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def _size(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+    return os.path.getsize(path)
+
+
+# ---------- Manifest ----------
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"tables": {}}
+
+
+def save_manifest(out_dir, manifest):
+    tmp = os.path.join(out_dir, f"{MANIFEST}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(out_dir, MANIFEST))
+
+
+def is_current(conn, table, entry, fmt, out_dir, verify=False):
+    """True if the previous export of table is still valid (see the header comment)."""
+    if not entry or entry.get("format") != fmt or not os.path.exists(_output_path(out_dir, table, fmt)):
+        return False
+    if entry.get("version") == db.table_version(conn, table) and not verify:
+        return True
+    if entry.get("hash") == content_hash(conn, table):
+        entry["version"] = db.table_version(conn, table)
+        return True
+    return False
+
+
+# ---------- Runner ----------
+def export(db_path=DB_PATH, out_dir=OUTPUT_DIR, fmt=FORMAT, tables=None, exclude=EXCLUDE,
+           force=False, verify=False, max_workers=MAX_WORKERS, chunk_rows=CHUNK_ROWS):
+    if fmt == "parquet" and pa is None:
+        raise SystemExit("❌ parquet export needs pyarrow (pip install pyarrow)")
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = load_manifest(out_dir)
+    entries = manifest.setdefault("tables", {})
+
+    conn = db.connect(db_path)
+    selected = select_tables(conn, tables, exclude)
+    todo = []
+    for table in selected:
+        if not force and is_current(conn, table, entries.get(table), fmt, out_dir, verify):
+            print(f"⏭️  {table}: unchanged")
+        else:
+            rows = conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+            todo.append((rows, table))
+    conn.close()
+
+    start = time.perf_counter()
+    failed = []
+    todo.sort(reverse=True)      # largest first, so the pool finishes together
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(export_table, db_path, t, fmt, out_dir, chunk_rows): t for _, t in todo}
+        for fut in as_completed(futures):
+            table = futures[fut]
+            try:
+                entries[table] = entry = fut.result()
+            except Exception as e:
+                failed.append(table)
+                print(f"❌ {table}: {e}")
+                continue
+            print(f"✅ {table}: {entry['rows']} rows → {entry['file']} "
+                  f"({entry['bytes'] / 1024:.0f} KB, {entry['seconds']:.2f}s)")
+
+    manifest.update(db=os.path.abspath(db_path), exported_at=time.time())
+    save_manifest(out_dir, manifest)
+
+    total = sum(entries[t]["bytes"] for t in selected if t in entries)
+    print(f"\n✅ {len(todo) - len(failed)} exported, {len(selected) - len(todo)} unchanged "
+          f"in {time.perf_counter() - start:.1f}s; {out_dir} holds {total / (1 << 20):.1f} MB")
+    if failed:
+        raise SystemExit(f"Export failed for: {', '.join(failed)}")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export database tables, skipping unchanged ones.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--out", default=OUTPUT_DIR)
+    parser.add_argument("--format", choices=FORMATS, default=FORMAT)
+    parser.add_argument("--tables", nargs="*", help="export just these tables")
+    parser.add_argument("--exclude", nargs="*", default=EXCLUDE, help="glob patterns to skip")
+    parser.add_argument("--force", action="store_true", help="export even unchanged tables")
+    parser.add_argument("--verify", action="store_true", help="hash tables even when the version matches")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    export(args.db, args.out, args.format, args.tables, args.exclude, args.force, args.verify,
+           args.workers, args.chunk_rows)
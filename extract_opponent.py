@@ -1,11 +1,12 @@
 import requests
 import pandas as pd
-import sqlite3
 import os
 
+import db
+
 # ---------------- CONFIG ----------------
 SEASON = 2025  # Change to 2025 when applicable
-DB_PATH = r"C:\Users\Collin Anderson\fantasy\fantasy.db"
+DB_PATH = db.DB_PATH
 # ----------------------------------------
 
 print(f"📡 Fetching NFL schedule for {SEASON} from ESPN API...")
@@ -65,15 +66,12 @@ matchups = pd.concat([home_side, away_side], ignore_index=True)[["week", "team",
 # ✅ Connect explicitly to SQLite and verify the file exists
 if not os.path.exists(DB_PATH):
     print(f"⚠️ Database file not found at {DB_PATH}. Creating a new one...")
-conn = sqlite3.connect(DB_PATH)
+conn = db.connect(DB_PATH)
 cur = conn.cursor()
 print(f"🔗 Connected to database: {DB_PATH}")
 
-# Optional: drop old table if exists
-cur.execute("DROP TABLE IF EXISTS nfl_matchups;")
-
-# ✅ Write DataFrame into SQLite manually
-matchups.to_sql("nfl_matchups", conn, if_exists="replace", index=False)
+# ✅ Replace nfl_matchups (typed, keyed on week + team)
+db.write_table(matchups, "nfl_matchups", conn)
 
 # ✅ Verify it worked
 cur.execute("SELECT COUNT(*) FROM nfl_matchups;")
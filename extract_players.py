@@ -1,23 +1,25 @@
 import requests
-import json
 import os
 
 # ----- Configuration -----
 save_path = r"C:\Users\Collin Anderson\fantasy\players.json"
 url = "https://api.sleeper.app/v1/players/nfl"
+chunk_size = 1 << 20   # bytes per write
+timeout = 60
 # --------------------------
 
 print("📡 Fetching player data from Sleeper...")
 
-# Fetch JSON data
-response = requests.get(url)
-response.raise_for_status()  # raises error if bad response
-players_data = response.json()
-
-# Save to file
-with open(save_path, "w", encoding="utf-8") as f:
-    json.dump(players_data, f, indent=2)
+# Stream the response straight to disk: the ~20 MB dump is never held in
+# memory or re-serialized. Written to a .part file first so a failed
+# download never leaves a truncated players.json for load_players.py.
+tmp_path = save_path + ".part"
+with requests.get(url, stream=True, timeout=timeout) as response:
+    response.raise_for_status()  # raises error if bad response
+    with open(tmp_path, "wb") as f:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            f.write(chunk)
+os.replace(tmp_path, save_path)
 
 size_mb = os.path.getsize(save_path) / (1024 * 1024)
 print(f"✅ Saved players.json to {save_path} ({size_mb:.2f} MB)")
-
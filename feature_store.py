@@ -0,0 +1,139 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import db
+
+# ---------------- CONFIG ----------------
+STORE_DIR = os.path.join("data", "feature_store")
+SOURCE_TABLE = "all_weeks_joined"
+# ----------------------------------------
+
+# ======================================
+# Shared columnar feature cache
+# ======================================
+# all_weeks_joined plus the derived team/usage features are written once as
+# one .npy file per column, rows grouped by position. Training scripts
+# memory-map just the columns they need and slice their position's row
+# range, so a load touches only those bytes. The store is rebuilt when the
+# source table's db.table_version changes.
+
+KEY_COLUMNS = ["playerID", "playerName", "team", "position", "opponent"]
+
+def safe_div(a, b):
+    # same convention as week11_regression.py: x / 0 → 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(b == 0, 0, a / b)
+
+
+def source_version(conn, table=SOURCE_TABLE):
+    return db.table_version(conn, table)
+
+
+def add_derived_features(df):
+    team_totals = df.groupby(["team", "week_num"]).agg(
+        team_pass_att=("pass_att", "sum"),
+        team_rush_att=("rush_att", "sum"),
+        team_rec_tgt=("rec_tgt", "sum"),
+    ).reset_index()
+    df = df.merge(team_totals, on=["team", "week_num"], how="left")
+
+    df["target_share"] = safe_div(df["rec_tgt"], df["team_rec_tgt"])
+    df["carry_share"] = safe_div(df["rush_att"], df["team_rush_att"])
+    df["ypa"] = safe_div(df["pass_yd"], df["pass_att"])
+    df["cmp_pct"] = safe_div(df["pass_cmp"], df["pass_att"])
+    return df
+
+
+# ---------- Build ----------
+def build(conn, path=STORE_DIR, table=SOURCE_TABLE):
+    df = db.read_sql(f"SELECT * FROM {table}", conn)
+    df = add_derived_features(df)
+    df = df.sort_values(["position", "playerID", "week_num"], kind="stable").reset_index(drop=True)
+
+    os.makedirs(path, exist_ok=True)
+    columns = {}
+    for col in df.columns:
+        if col in KEY_COLUMNS or df[col].dtype == object or pd.api.types.is_string_dtype(df[col]):
+            arr = df[col].fillna("").astype(str).to_numpy(dtype=str)
+        elif pd.api.types.is_integer_dtype(df[col]):
+            arr = df[col].to_numpy(dtype=np.int64)
+        else:
+            arr = df[col].to_numpy(dtype=np.float64)
+        np.save(os.path.join(path, f"{col}.npy"), arr)
+        columns[col] = arr.dtype.str
+
+    pos = df["position"].fillna("").astype(str).to_numpy()
+    bounds = {}
+    for p in pd.unique(pos):
+        idx = np.flatnonzero(pos == p)
+        bounds[p] = [int(idx[0]), int(idx[-1]) + 1]
+
+    manifest = {
+        "source": table,
+        "version": source_version(conn, table),
+        "rows": len(df),
+        "columns": columns,
+        "positions": bounds,
+    }
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _manifest(path):
+    try:
+        with open(os.path.join(path, "manifest.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def store_version(path=STORE_DIR):
+    """Source version the store on disk was built from (None if there is no store)."""
+    manifest = _manifest(path)
+    return manifest and manifest["version"]
+
+
+def ensure_fresh(conn, path=STORE_DIR, table=SOURCE_TABLE):
+    manifest = _manifest(path)
+    if manifest is None or manifest.get("version") != source_version(conn, table):
+        manifest = build(conn, path, table)
+    return manifest
+
+
+# ---------- Load ----------
+def load_arrays(columns=None, position=None, path=STORE_DIR, conn=None):
+    """Memory-mapped column arrays, sliced to one position's rows if given."""
+    manifest = ensure_fresh(conn, path) if conn is not None else _manifest(path)
+    if manifest is None:
+        raise FileNotFoundError(f"No feature store at {path}; call feature_store.build(conn) first")
+
+    columns = list(columns) if columns is not None else list(manifest["columns"])
+    lo, hi = 0, manifest["rows"]
+    if position is not None:
+        lo, hi = manifest["positions"].get(position, [0, 0])
+
+    return {
+        c: np.load(os.path.join(path, f"{c}.npy"), mmap_mode="r")[lo:hi]
+        for c in columns
+    }
+
+
+def load(columns=None, position=None, path=STORE_DIR, conn=None):
+    """DataFrame view over the store (same columns/values as all_weeks_joined + derived)."""
+    arrays = load_arrays(columns, position, path, conn)
+    df = pd.DataFrame({c: np.asarray(a) for c, a in arrays.items()})
+    for c in df.columns:
+        if c in KEY_COLUMNS:
+            df[c] = df[c].replace("", None)
+    return df
+
+
+if __name__ == "__main__":
+    conn = db.connect()
+    m = build(conn)
+    conn.close()
+    print(f"✅ Feature store built: {m['rows']} rows, {len(m['columns'])} columns → {STORE_DIR}")
@@ -0,0 +1,208 @@
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+import requests
+
+import db
+import stat_store
+
+# ---------------- CONFIG ----------------
+DB_PATH = db.DB_PATH
+BASE_URL = "https://api.sleeper.app/v1/stats/nfl"
+SEASON_TYPE = "regular"
+MAX_WORKERS = 8
+RETRIES = 3
+TIMEOUT = 30
+SEASON = 2025                     # the season whose weeks feed weekN / all_weeks
+# ----------------------------------------
+
+TABLE = "weekly_stats"
+ALL_WEEKS = "all_weeks"
+
+SKILL_POSITIONS = ["QB", "RB", "WR", "TE"]
+TEAM_ALIASES = {"WSH": "WAS"}     # ESPN schedule abbreviation → Sleeper
+
+# Stat keys kept from each Sleeper row (same set as the weekN / all_weeks tables)
+STAT_COLUMNS = [
+    "pts_std", "pts_ppr", "pts_half_ppr",
+    "pass_att", "pass_cmp", "pass_yd", "pass_td", "pass_int",
+    "rush_att", "rush_yd", "rush_td",
+    "rec_tgt", "rec", "rec_yd", "rec_td",
+    "off_snp",
+]
+
+_local = threading.local()
+
+
+def _session():
+    # requests.Session is not thread-safe, so each worker keeps its own
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+# ---------- Fetch + parse (runs in worker threads) ----------
+def fetch_week(season, week, base_url=BASE_URL, season_type=SEASON_TYPE, parse=None):
+    parse = parse or parse_week
+    url = f"{base_url}/{season_type}/{season}/{week}"
+
+    for attempt in range(1, RETRIES + 1):
+        try:
+            res = _session().get(url, timeout=TIMEOUT)
+            if res.status_code == 404:
+                return season, week, None
+            res.raise_for_status()
+            return season, week, parse(season, week, res.json())
+        except (requests.RequestException, ValueError):
+            if attempt == RETRIES:
+                raise
+            time.sleep(0.5 * 2 ** attempt)
+
+
+def parse_week(season, week, data):
+    """Sleeper payload {playerID: {stat: value}} → rows for weekly_stats."""
+    if not data:
+        return []
+    return [
+        (season, week, str(pid), *[stats.get(c) for c in STAT_COLUMNS])
+        for pid, stats in data.items()
+        if isinstance(stats, dict)
+    ]
+
+
+# ---------- SQLite ----------
+def ensure_table(conn):
+    cols = ",\n    ".join(f"{c} REAL" for c in STAT_COLUMNS)
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TABLE} (
+            season   INTEGER NOT NULL,
+            week     INTEGER NOT NULL,
+            playerID TEXT    NOT NULL,
+            {cols},
+            PRIMARY KEY (season, week, playerID)
+        ) WITHOUT ROWID
+    """)
+
+
+def insert_rows(conn, rows):
+    placeholders = ", ".join("?" * (3 + len(STAT_COLUMNS)))
+    with conn:
+        conn.executemany(f"INSERT OR REPLACE INTO {TABLE} VALUES ({placeholders})", rows)
+
+
+# ---------- weekN / all_weeks ----------
+# The tables the pipeline reads: one weekN table per week plus all_weeks,
+# their union tagged with week_num. A week keeps the skill-position players
+# (position and team from the players registry) who have a pts_ppr line;
+# opponent comes from nfl_matchups.
+def week_stats(conn, season, week, store="wide"):
+    if store == "long":
+        df = stat_store.pivot_stats(conn, STAT_COLUMNS, seasons=[season], weeks=[week])
+        return df.drop(columns=["season", "week"]).astype({c: float for c in STAT_COLUMNS})
+    return db.read_sql(f"SELECT playerID, {', '.join(STAT_COLUMNS)} FROM {TABLE} "
+                       "WHERE season = ? AND week = ?", conn, params=(season, week))
+
+
+def week_table(conn, season, week, store="wide"):
+    """weekN frame: playerID, playerName, team, position, STAT_COLUMNS, opponent."""
+    players = db.read_sql("SELECT playerID, playerName, team, position FROM players", conn)
+    sched = db.read_sql("SELECT team, opponent FROM nfl_matchups WHERE week = ?", conn, params=(week,))
+    sched = sched.replace({"team": TEAM_ALIASES, "opponent": TEAM_ALIASES})
+
+    df = players.merge(week_stats(conn, season, week, store), on="playerID")
+    df = df[df["position"].isin(SKILL_POSITIONS) & df["pts_ppr"].notna()]
+    df = df.merge(sched, on="team", how="left")
+    return df.sort_values("playerID").reset_index(drop=True)
+
+
+def publish_weeks(conn, season, weeks, store="wide"):
+    """Rewrite weekN for each week with rows and swap those weeks into all_weeks."""
+    frames = {w: week_table(conn, season, w, store) for w in sorted({int(w) for w in weeks})}
+    frames = {w: df for w, df in frames.items() if len(df)}
+    if not frames:
+        print("⚠️  No weeks with player rows, all_weeks unchanged.")
+        return 0
+
+    tables = {f"week{w}": df for w, df in frames.items()}
+    tables[ALL_WEEKS] = pd.concat([df.assign(week_num=w) for w, df in frames.items()], ignore_index=True)
+    marks = ", ".join("?" * len(frames))
+    # all_weeks keeps its other weeks; the DELETE commits with the append
+    before = []
+    if ALL_WEEKS in db.list_tables(conn):
+        before = [(f"DELETE FROM {ALL_WEEKS} WHERE week_num IN ({marks})", tuple(frames))]
+    db.write_tables(tables, conn, if_exists={ALL_WEEKS: "append"}, before=before)
+    print(f"✅ weeks {', '.join(map(str, frames))} written to weekN and {ALL_WEEKS} "
+          f"({len(tables[ALL_WEEKS])} rows)")
+    return len(tables[ALL_WEEKS])
+
+
+# ---------- Runner ----------
+def ingest(seasons, weeks, db_path=DB_PATH, base_url=BASE_URL,
+           season_type=SEASON_TYPE, max_workers=MAX_WORKERS, store="wide", publish=True):
+    """store="wide" keeps STAT_COLUMNS in weekly_stats; "long" keeps every stat in stats_long.
+
+    With publish, the fetched weeks of SEASON are then rebuilt into weekN / all_weeks.
+    """
+    conn = db.connect(db_path)
+    if store == "long":
+        stat_store.ensure_schema(conn)
+        parse, write, table = stat_store.long_rows, stat_store.write_long, "stats_long"
+    else:
+        ensure_table(conn)
+        parse, write, table = parse_week, insert_rows, TABLE
+
+    jobs = [(s, w) for s in seasons for w in weeks]
+    print(f"📡 Fetching {len(jobs)} season/week payloads with {max_workers} workers...")
+
+    total = 0
+    fetched = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(fetch_week, s, w, base_url, season_type, parse) for s, w in jobs]
+
+        # Insert each week as soon as it arrives; SQLite writes stay on this thread
+        for fut in as_completed(futures):
+            season, week, rows = fut.result()
+            if rows is None:
+                print(f"⚠️  {season} week {week} not found, skipping.")
+                continue
+            write(conn, rows)
+            total += len(rows)
+            if season == SEASON:
+                fetched.append(week)
+            print(f"✅ {season} week {week}: {len(rows)} rows")
+
+    print(f"✅ {total} rows written to {table}")
+    if publish:
+        publish_weeks(conn, SEASON, fetched, store)
+    conn.close()
+    return total
+
+
+def _int_range(text):
+    # "1-9" → [1..9], "2024" → [2024], "1,3,5" → [1, 3, 5]
+    out = []
+    for part in text.split(","):
+        lo, _, hi = part.partition("-")
+        out.extend(range(int(lo), int(hi or lo) + 1))
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load Sleeper weekly stats into SQLite.")
+    parser.add_argument("--seasons", type=_int_range, default=[2025], help="e.g. 2023-2025")
+    parser.add_argument("--weeks", type=_int_range, default=list(range(1, 19)), help="e.g. 1-9")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--season-type", default=SEASON_TYPE)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--store", choices=["wide", "long"], default="wide",
+                        help="wide: core columns in weekly_stats; long: every stat in stats_long")
+    parser.add_argument("--no-publish", action="store_true",
+                        help=f"only archive raw stats; leave weekN / {ALL_WEEKS} alone")
+    args = parser.parse_args()
+
+    ingest(args.seasons, args.weeks, args.db, args.base_url, args.season_type,
+           args.workers, args.store, publish=not args.no_publish)
@@ -0,0 +1,391 @@
+import argparse
+from functools import reduce
+from itertools import product
+from math import gcd
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+import db
+import draw_store
+from player_search import normalize
+
+# ---------------- CONFIG ----------------
+DB_PATH = db.DB_PATH
+SOURCE_TABLE = "week11_simulated_all"
+LINEUPS_TABLE = "lineups"
+SALARY_CAP = 50_000
+ROSTER = {"QB": 1, "RB": 2, "WR": 3, "TE": 1}
+FLEX_SLOTS = [("FLEX", ("RB", "WR", "TE"))]    # add ("SFLEX", ("QB", "RB", "WR", "TE")) for superflex
+N_LINEUPS = 20
+MAX_BUDGET_STEPS = 2000    # salary resolution of the bound tables
+WIN_Z = 1.0                # win objective: candidates ranked by median + WIN_Z·σ, ...
+WIN_POOL = 5               # ... N × WIN_POOL of them rescored by P(total > target)
+# ----------------------------------------
+
+# ======================================
+# DFS / season-long lineup optimizer
+# ======================================
+# Flex slots are expanded into roster variants (RB/WR/TE count vectors),
+# so every variant is a sequence of position groups with a fixed number of
+# picks and no player can appear in two groups.
+#
+# Search is depth-first branch-and-bound over each group's players (best
+# first, take-before-skip). The bound is exact for the relaxed problem:
+#   H[g][i, r, b] = best score choosing r players from group g's items i..,
+#                   then filling every later group, with ≤ b salary units
+# a cardinality-constrained knapsack table per group (vectorized over b,
+# salaries floored to the bound's step so it never underestimates). A node
+# is pruned once cur + H ≤ the best lineup found so far, so the search only
+# walks branches that can still beat it.
+#
+# The N best lineups are found one at a time ("best lineup not yet
+# returned"), which makes exposure limits a matter of dropping capped
+# players between rounds. Players dominated by ≥ picks + N − 1 cheaper,
+# better players at their position can never make the top N and are
+# dropped before the search when no exposure limit is set. Dominance is
+# counted among the searchable players only (after exclusions, without the
+# locked ones, which are pre-placed).
+#
+# Objectives: median → Σ median, ceiling → Σ p90, win → P(Σ > target),
+# read off the saved simulation draws (draw_store) when every player has
+# them, else a normal fit (σ from p10/p90, players independent). The win
+# objective isn't additive, so a pool of lineups is generated on
+# median + WIN_Z·σ and rescored.
+
+OBJECTIVES = ("median", "ceiling", "win")
+POOL_COLUMNS = ["playerID", "playerName", "team", "position", "opponent", "median", "p10", "p90"]
+
+
+# ---------- Player pool ----------
+def load_pool(conn, salaries=None, table=SOURCE_TABLE):
+    """Simulated players (+ salary). Without salaries every salary is 0 (season-long)."""
+    pool = db.read_sql(f"SELECT {', '.join(POOL_COLUMNS)} FROM {table}", conn)
+    pool["playerID"] = pool["playerID"].astype(str)
+    pool["sigma"] = np.maximum((pool["p90"] - pool["p10"]) / 2.56, 0.0)
+    if salaries is None:
+        pool["salary"] = 0
+        return pool
+    return attach_salaries(pool, salaries)
+
+
+def attach_salaries(pool, salaries):
+    """Inner-join salaries (CSV path or frame) by playerID, else by name (+ team)."""
+    sal = pd.read_csv(salaries) if isinstance(salaries, str) else salaries.copy()
+    sal.columns = [c.strip() for c in sal.columns]
+    sal = sal.rename(columns={"Salary": "salary", "Name": "playerName", "TeamAbbrev": "team"})
+
+    if "playerID" in sal.columns:
+        sal["playerID"] = sal["playerID"].astype(str)
+        out = pool.merge(sal[["playerID", "salary"]], on="playerID", how="inner")
+    else:
+        keys = ["_name"] + (["team"] if "team" in sal.columns else [])
+        sal["_name"] = sal["playerName"].map(normalize)
+        left = pool.assign(_name=pool["playerName"].map(normalize))
+        out = left.merge(sal[keys + ["salary"]], on=keys, how="inner").drop(columns="_name")
+
+    missing = len(sal) - len(out)
+    if missing > 0:
+        print(f"⚠️  {missing} salary rows matched no simulated player")
+    out["salary"] = out["salary"].astype(np.int64)
+    return out.drop_duplicates("playerID").reset_index(drop=True)
+
+
+def objective_scores(pool, objective):
+    if objective == "median":
+        return pool["median"].to_numpy(dtype=np.float64)
+    if objective == "ceiling":
+        return pool["p90"].to_numpy(dtype=np.float64)
+    if objective == "win":
+        return (pool["median"] + WIN_Z * pool["sigma"]).to_numpy(dtype=np.float64)
+    raise ValueError(f"objective must be one of {OBJECTIVES}")
+
+
+def roster_variants(roster=ROSTER, flex_slots=FLEX_SLOTS):
+    """Distinct {position: count} rosters once every flex slot is assigned."""
+    variants = []
+    for picks in product(*[eligible for _, eligible in flex_slots]):
+        counts = dict(roster)
+        for pos in picks:
+            counts[pos] = counts.get(pos, 0) + 1
+        if counts not in variants:
+            variants.append(counts)
+    return variants
+
+
+def undominated(pool, score, depth, candidates=None):
+    """Mask of players with fewer than depth[position] cheaper-and-better rivals.
+
+    Only candidates (a boolean mask; default every player) are kept or count
+    as rivals, so excluded or locked players never prune anyone.
+    """
+    idx = np.arange(len(pool)) if candidates is None else np.flatnonzero(candidates)
+    mask = np.zeros(len(pool), dtype=bool)
+    salary = pool["salary"].to_numpy()
+    for pos, rows in pool.iloc[idx].groupby("position").indices.items():
+        rows = idx[rows]
+        s, v = salary[rows], score[rows]
+        order = np.arange(len(rows))
+        beats = ((s[None, :] <= s[:, None]) & (v[None, :] >= v[:, None])
+                 & ((s[None, :] < s[:, None]) | (v[None, :] > v[:, None]) | (order[None, :] < order[:, None])))
+        mask[rows] = beats.sum(axis=1) < depth.get(pos, 0)
+    return mask
+
+
+# ---------- Branch and bound ----------
+def _bound_table(items, need, score, units, budget, after):
+    """H[i, r, b] for one group; `after` is the best-fill table of the later groups."""
+    m = len(items)
+    H = np.full((m + 1, need + 1, budget + 1), -np.inf)
+    H[m, 0] = after
+    for i in range(m - 1, -1, -1):
+        H[i] = H[i + 1]
+        c = units[items[i]]
+        if c <= budget and need:
+            H[i, 1:, c:] = np.maximum(H[i + 1, 1:, c:], score[items[i]] + H[i + 1, :need, :budget + 1 - c])
+    return H
+
+
+class _Variant:
+    """One roster variant with locked players pre-placed."""
+
+    def __init__(self, counts, positions, active, locked, score, salary, units, cap, step):
+        self.groups = []
+        self.base = list(locked)
+        self.base_score = float(score[locked].sum()) if len(locked) else 0.0
+        self.base_salary = int(salary[locked].sum()) if len(locked) else 0
+        self.feasible = self.base_salary <= cap
+
+        for pos, need in counts.items():
+            n_locked = int((positions[locked] == pos).sum()) if len(locked) else 0
+            items = np.flatnonzero(active & (positions == pos))
+            items = items[np.argsort(-score[items], kind="stable")]
+            if n_locked > need or len(items) < need - n_locked:
+                self.feasible = False
+            self.groups.append((items, need - n_locked))
+        if not self.feasible:
+            return
+
+        self.budget = (cap - self.base_salary) // step
+        after = np.zeros(self.budget + 1)
+        self.tables = [None] * len(self.groups)
+        for g in range(len(self.groups) - 1, -1, -1):
+            items, need = self.groups[g]
+            self.tables[g] = _bound_table(items, need, score, units, self.budget, after)
+            after = self.tables[g][0, need]
+
+
+def _next_best(variants, score, salary, units, cap, seen):
+    """Highest-scoring lineup (tuple of rows) over all variants that is not in seen."""
+    best = [-np.inf, None]
+
+    for v in variants:
+        if not v.feasible:
+            continue
+        chosen = list(v.base)
+        groups, tables = v.groups, v.tables
+
+        def visit(g, i, r, sal, left, cur):
+            if r == 0:
+                g, i = g + 1, 0
+                if g == len(groups):
+                    if cur > best[0] and frozenset(chosen) not in seen:
+                        best[0], best[1] = cur, tuple(chosen)
+                    return
+                r = groups[g][1]
+                if r == 0:
+                    return visit(g, 0, 0, sal, left, cur)
+            if cur + tables[g][i, r, left] <= best[0]:
+                return
+            items = groups[g][0]
+            if len(items) - i < r:
+                return
+            p = items[i]
+            if sal + salary[p] <= cap:
+                chosen.append(p)
+                visit(g, i + 1, r - 1, sal + salary[p], left - units[p], cur + score[p])
+                chosen.pop()
+            visit(g, i + 1, r, sal, left, cur)
+
+        visit(0, 0, groups[0][1], v.base_salary, v.budget, v.base_score)
+    return best[1]
+
+
+def _ids_to_rows(pool, ids, label):
+    rows = np.flatnonzero(pool["playerID"].isin([str(i) for i in ids]).to_numpy())
+    if len(rows) < len(set(ids)):
+        print(f"⚠️  some {label} players are not in the pool")
+    return rows
+
+
+def search(pool, n=N_LINEUPS, score=None, cap=SALARY_CAP, roster=ROSTER, flex_slots=FLEX_SLOTS,
+           lock=(), exclude=(), max_exposure=None):
+    """Top n distinct lineups (tuples of pool rows) by Σ score, best first."""
+    score = objective_scores(pool, "median") if score is None else score
+    salary = pool["salary"].to_numpy(dtype=np.int64)
+    positions = pool["position"].to_numpy()
+    variants_counts = roster_variants(roster, flex_slots)
+
+    locked = _ids_to_rows(pool, lock, "locked")
+    active = np.ones(len(pool), dtype=bool)
+    active[_ids_to_rows(pool, exclude, "excluded")] = False
+    active[locked] = False
+
+    if max_exposure is None:
+        depth = {p: max(c.get(p, 0) for c in variants_counts) + n - 1 for p in set(positions)}
+        active &= undominated(pool, score, depth, active)
+    limit = None if max_exposure is None else max(1, int(np.floor(max_exposure * n + 1e-9)))
+
+    step = reduce(gcd, [int(cap)] + [int(s) for s in salary if s > 0]) or 1
+    if cap // step > MAX_BUDGET_STEPS:
+        step = -(-int(cap) // MAX_BUDGET_STEPS)
+    units = salary // step
+
+    lineups, seen = [], set()
+    exposure = np.zeros(len(pool), dtype=np.int64)
+    variants = None
+    while len(lineups) < n:
+        if variants is None:
+            variants = [_Variant(c, positions, active, locked, score, salary, units, cap, step)
+                        for c in variants_counts]
+        found = _next_best(variants, score, salary, units, cap, seen)
+        if found is None:
+            break
+        lineups.append(found)
+        seen.add(frozenset(found))
+
+        if limit is not None:
+            exposure[list(found)] += 1
+            capped = (exposure >= limit) & active
+            if capped.any():
+                active &= ~capped
+                variants = None     # rebuild bounds without the capped players
+    return lineups
+
+
+# ---------- Objectives / output ----------
+def win_probability(pool, lineups, target, draws=None):
+    ids = pool["playerID"].to_numpy()
+    if draws is not None and (draws.rows(ids) >= 0).all():
+        return np.array([(draws.totals(ids[list(l)]) > target).mean() for l in lineups])
+    mean = np.array([pool["median"].to_numpy()[list(l)].sum() for l in lineups])
+    sd = np.array([np.sqrt((pool["sigma"].to_numpy()[list(l)] ** 2).sum()) for l in lineups])
+    return 1.0 - ndtr((target - mean) / np.where(sd > 0, sd, 1.0))
+
+
+def lineup_frame(pool, lineups, roster=ROSTER, flex_slots=FLEX_SLOTS, win_prob=None):
+    """One row per (lineup, slot), with lineup totals repeated on every row."""
+    rows = []
+    for k, lineup in enumerate(lineups, start=1):
+        players = pool.iloc[list(lineup)].sort_values("median", ascending=False)
+        flex = [name for name, _ in flex_slots]
+        used = {}
+        for _, p in players.iterrows():
+            pos = p["position"]
+            used[pos] = used.get(pos, 0) + 1
+            slot = f"{pos}{used[pos]}" if used[pos] <= roster.get(pos, 0) else flex.pop(0)
+            rows.append({"lineup": k, "slot": slot, **p[POOL_COLUMNS + ["salary"]].to_dict()})
+    out = pd.DataFrame(rows)
+    if out.empty:
+        return out
+    totals = out.groupby("lineup").agg(total_salary=("salary", "sum"), proj=("median", "sum"),
+                                       ceiling=("p90", "sum"))
+    out = out.merge(totals, left_on="lineup", right_index=True)
+    if win_prob is not None:
+        out["win_prob"] = out["lineup"].map(dict(enumerate(win_prob, start=1)))
+    return out
+
+
+def optimize(pool, n=N_LINEUPS, objective="median", cap=SALARY_CAP, roster=ROSTER,
+             flex_slots=FLEX_SLOTS, lock=(), exclude=(), max_exposure=None, target=None,
+             draws=None):
+    """Top n lineups for the objective as a lineup_frame (draws: a draw_store.DrawStore)."""
+    kw = dict(cap=cap, roster=roster, flex_slots=flex_slots, lock=lock, exclude=exclude)
+    if objective != "win":
+        lineups = search(pool, n, objective_scores(pool, objective), max_exposure=max_exposure, **kw)
+        return lineup_frame(pool, lineups, roster, flex_slots)
+
+    # each player capped at the final n's exposure limit across the whole pool,
+    # so any n of the candidates respect it
+    pool_exposure = None if max_exposure is None else max_exposure / WIN_POOL
+    candidates = search(pool, n * WIN_POOL, objective_scores(pool, "win"),
+                        max_exposure=pool_exposure, **kw)
+    if target is None:      # default line: the best projected (median) lineup in the pool
+        target = max(pool["median"].to_numpy()[list(l)].sum() for l in candidates)
+    p = win_probability(pool, candidates, target, draws)
+    order = np.argsort(-p, kind="stable")[:n]
+    return lineup_frame(pool, [candidates[i] for i in order], roster, flex_slots, p[order])
+
+
+def check_exclusions(n=3):
+    """Regression check: excluding players must match removing them from the pool.
+
+    Nine cheap 30-point WRs dominate every other WR; with them excluded the
+    rest must still be searchable. True if both ways give the same lineups.
+    """
+    rows = [("Q", "QB", 20, 6000), ("Q2", "QB", 15, 5000),
+            ("R", "RB", 18, 6000), ("R2", "RB", 16, 5500), ("R3", "RB", 12, 4000),
+            ("T", "TE", 10, 4000), ("T2", "TE", 8, 3500)]
+    rows += [(f"S{i}", "WR", 30, 3000) for i in range(9)]
+    rows += [(f"W{i}", "WR", 14 - i, 4000 + 100 * i) for i in range(6)]
+    pool = pd.DataFrame(rows, columns=["playerID", "position", "median", "salary"])
+    stars = [f"S{i}" for i in range(9)]
+
+    rest = pool[~pool["playerID"].isin(stars)].reset_index(drop=True)
+
+    def ids(p, lineups):
+        return sorted(sorted(p["playerID"].to_numpy()[list(l)]) for l in lineups)
+
+    excluded, removed = search(pool, n, exclude=stars), search(rest, n)
+    return len(excluded) == len(removed) == n and ids(pool, excluded) == ids(rest, removed)
+
+
+def exposure_table(lineups):
+    n = lineups["lineup"].nunique()
+    return (lineups.groupby(["playerID", "playerName", "position"]).size()
+            .rename("lineups").reset_index()
+            .assign(exposure=lambda d: (d["lineups"] / n * 100).round(1))
+            .sort_values("lineups", ascending=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the top N lineups from the simulated slate.")
+    parser.add_argument("--salaries", help="CSV with playerID or playerName (+ team) and salary")
+    parser.add_argument("--n", type=int, default=N_LINEUPS)
+    parser.add_argument("--objective", choices=OBJECTIVES, default="median")
+    parser.add_argument("--cap", type=int, default=SALARY_CAP)
+    parser.add_argument("--target", type=float, help="win objective: points to beat")
+    parser.add_argument("--lock", nargs="*", default=[], help="playerIDs in every lineup")
+    parser.add_argument("--exclude", nargs="*", default=[], help="playerIDs never used")
+    parser.add_argument("--max-exposure", type=float, help="max share of lineups per player (0–1)")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--check", action="store_true", help="run the exclusion regression check and exit")
+    args = parser.parse_args()
+
+    if args.check:
+        if not check_exclusions():
+            raise SystemExit("❌ excluding players changed the search space")
+        print("✅ exclusion check passed")
+        raise SystemExit(0)
+
+    conn = db.connect(args.db)
+    pool = load_pool(conn, args.salaries)
+    cap = args.cap if args.salaries else 0
+
+    lineups = optimize(pool, args.n, args.objective, cap, lock=args.lock, exclude=args.exclude,
+                       max_exposure=args.max_exposure, target=args.target,
+                       draws=draw_store.open_store() if args.objective == "win" else None)
+    if lineups.empty:
+        print("❌ No feasible lineup")
+    else:
+        cols = ["proj", "ceiling", "total_salary"] + (["win_prob"] if "win_prob" in lineups else [])
+        summary = lineups.groupby("lineup").agg(
+            players=("playerName", ", ".join), **{c: (c, "first") for c in cols})
+        print(summary.round(3).to_string())
+        print("\n", exposure_table(lineups).head(15).to_string(index=False))
+        if not args.no_save:
+            db.write_table(lineups, LINEUPS_TABLE, conn)
+            print(f"\n✅ {lineups['lineup'].nunique()} lineups → {LINEUPS_TABLE}")
+    conn.close()
@@ -1,26 +1,172 @@
-import pandas as pd
-import sqlite3
+import argparse
+import hashlib
 import json
+import time
+
+import pandas as pd
+
+import db
+import profiling
 
+# ---------------- CONFIG ----------------
+DB_PATH = db.DB_PATH
 base_path = r'C:\Users\Collin Anderson\fantasy'
-json_file = fr'{base_path}\players.json'
-db_file = fr'{base_path}\fantasy.db'
+JSON_FILE = fr'{base_path}\players.json'
+CHUNK_SIZE = 1 << 20        # characters read from the dump at a time
+# ----------------------------------------
+
+# ======================================
+# Sleeper player registry → players
+# ======================================
+# The dump is one {player_id: {~40 fields}} object. Records are decoded one
+# at a time with JSONDecoder.raw_decode over a rolling buffer, so only the
+# current record is ever materialized, and only the four kept fields leave
+# the parser. Each kept row is hashed; rows whose hash matches the stored
+# row_hash are skipped, changed/new rows are upserted and players missing
+# from the dump are deleted — a daily refresh touches a handful of rows.
+
+TABLE = "players"
+FIELDS = {"player_id": "playerID", "full_name": "playerName", "position": "position", "team": "team"}
+
+
+# ---------- Streaming parse ----------
+class _Reader:
+    """Rolling text buffer over a file for raw_decode."""
+
+    def __init__(self, f, chunk_size):
+        self.f, self.chunk_size = f, chunk_size
+        self.buf, self.pos, self.eof = "", 0, False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        chunk = self.f.read(self.chunk_size)
+        self.eof = not chunk
+        self.buf, self.pos = self.buf[self.pos:] + chunk, 0
+
+    def peek(self):
+        """Next non-whitespace character ('' at end of file)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self._fill()
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} at offset {self.pos} of the buffer")
+        self.pos += 1
+
+    def value(self):
+        """Decode one JSON value, reading more of the file until it is complete."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+                if end < len(self.buf) or self.eof:    # a number could still be cut off
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+def iter_records(path, chunk_size=CHUNK_SIZE):
+    """Yield (key, record) pairs of a top-level JSON object, one at a time."""
+    with open(path, encoding="utf-8") as f:
+        r = _Reader(f, chunk_size)
+        r.expect("{")
+        if r.peek() == "}":
+            return
+        while True:
+            key = r.value()
+            r.expect(":")
+            yield key, r.value()
+            if r.peek() == ",":
+                r.pos += 1
+                continue
+            r.expect("}")
+            return
+
+
+def iter_players(path, chunk_size=CHUNK_SIZE):
+    """(playerID, playerName, position, team) for every player in the dump."""
+    for key, rec in iter_records(path, chunk_size):
+        if not isinstance(rec, dict):
+            continue
+        row = tuple(rec.get(f) for f in FIELDS)
+        yield (str(row[0] if row[0] is not None else key),) + row[1:]
+
+
+def row_hash(row):
+    return hashlib.sha1(repr(row).encode()).hexdigest()[:16]
+
+
+# ---------- Upsert ----------
+def stored_hashes(conn):
+    """{playerID: row_hash}, or None if players has no row_hash column yet."""
+    cols = [r[1] for r in conn.execute(f"PRAGMA table_info({TABLE})")]
+    if "row_hash" not in cols:
+        return None
+    return dict(conn.execute(f"SELECT playerID, row_hash FROM {TABLE}").fetchall())
+
+
+@profiling.profiled()
+def full_load(conn, path):
+    rows = [row + (row_hash(row),) for row in iter_players(path)]
+    df = pd.DataFrame(rows, columns=list(FIELDS.values()) + ["row_hash"])
+    df = df.drop_duplicates("playerID", keep="last")
+    db.write_table(df, TABLE, conn)
+    return len(df), 0, 0
+
+
+@profiling.profiled()
+def upsert(conn, path, old):
+    changed, seen = [], set()
+    for row in iter_players(path):
+        seen.add(row[0])
+        h = row_hash(row)
+        if old.get(row[0]) != h:
+            changed.append(row + (h,))
+            old[row[0]] = h
+    removed = [(pid,) for pid in old.keys() - seen]
+
+    if changed or removed:
+        start = time.perf_counter()
+        cols = list(FIELDS.values()) + ["row_hash"]
+        updates = ", ".join(f"{c} = excluded.{c}" for c in cols[1:])
+        with conn:
+            conn.executemany(f"""
+                INSERT INTO {TABLE} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})
+                ON CONFLICT(playerID) DO UPDATE SET {updates}
+            """, changed)
+            conn.executemany(f"DELETE FROM {TABLE} WHERE playerID = ?", removed)
+        profiling.record_write(TABLE, len(changed) + len(removed), time.perf_counter() - start)
+    return len(seen), len(changed), len(removed)
 
-# Load Sleeper player data
-with open(json_file) as f:
-    data = json.load(f)
 
-# Convert to DataFrame
-df = pd.DataFrame.from_dict(data, orient='index')
+def load(path=JSON_FILE, db_path=DB_PATH, full=False):
+    conn = db.connect(db_path)
+    old = None if full else stored_hashes(conn)
+    if old is None:
+        n, changed, removed = full_load(conn, path)
+        print(f"✅ {TABLE}: {n} players written (full load)")
+    else:
+        n, changed, removed = upsert(conn, path, old)
+        if changed or removed:
+            print(f"✅ {TABLE}: {n} players, {changed} upserted, {removed} removed")
+        else:
+            print(f"⏭️  {TABLE}: {n} players, nothing changed")
+    conn.close()
+    return changed, removed
 
-# Clean up to essential columns
-keep = ['player_id', 'full_name', 'position', 'team']
-df = df[keep]
-df = df.rename(columns={'player_id': 'playerID', 'full_name': 'playerName'})
 
-# Write to fantasy.db
-conn = sqlite3.connect(db_file)
-df.to_sql('players', conn, if_exists='replace', index=False)
-conn.close()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load the Sleeper players dump into the players table.")
+    parser.add_argument("--file", default=JSON_FILE)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--full", action="store_true", help="rewrite the whole table")
+    args = parser.parse_args()
 
-print("✅ Sleeper player table loaded into fantasy.db")
+    load(args.file, args.db, args.full)
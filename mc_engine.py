@@ -0,0 +1,344 @@
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+# ======================================
+# Batched Monte Carlo engine
+# ======================================
+# Every player's residual pool lives in one ragged structure:
+#   values[offsets[i]:offsets[i + 1]] are the residuals for row i.
+# All rows are bootstrapped together as one (players x sims) matrix and
+# every quantile is read off a single partition pass per row.
+
+DEFAULT_QUANTILES = (10, 50, 90)
+FALLBACK_SCALE = 4.0     # players with no residual history → normal(mu, 4.0)
+CHUNK_ROWS = 2048        # rows per block, keeps the draw matrix bounded
+
+# Fantasy-point cutoffs for Boom% / Bust% by position
+BOOM_PTS = {"QB": 25.0, "RB": 20.0, "WR": 20.0, "TE": 15.0}
+BUST_PTS = {"QB": 12.0, "RB": 6.0, "WR": 6.0, "TE": 5.0}
+
+
+# ---------- Residual packing ----------
+def pack_residuals(rows: pd.DataFrame, resid: pd.DataFrame, keys=("position", "playerID")):
+    """Pack residuals into (offsets, values) aligned with the rows of `rows`."""
+    keys = list(keys)
+    left = rows[keys].reset_index(drop=True)
+    left["_row"] = np.arange(len(left))
+
+    merged = left.merge(resid[keys + ["resid"]].dropna(subset=["resid"]), on=keys, how="inner")
+    merged = merged.sort_values("_row", kind="stable")
+
+    counts = np.bincount(merged["_row"].to_numpy(), minlength=len(left))
+    offsets = np.zeros(len(left) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    values = merged["resid"].to_numpy(dtype=np.float64)
+    return offsets, values
+
+
+# ---------- Draws ----------
+def draw_block(rng, mu, offsets, values, sims, fallback_scale=FALLBACK_SCALE):
+    """Bootstrap draws for a block of rows; offsets has len(mu) + 1 entries."""
+    mu = np.asarray(mu, dtype=np.float64)
+    starts = offsets[:-1]
+    lengths = offsets[1:] - starts
+    has_pool = lengths > 0
+
+    draws = np.empty((len(mu), sims), dtype=np.float64)
+
+    if has_pool.any():
+        u = rng.random((int(has_pool.sum()), sims))
+        idx = starts[has_pool, None] + (u * lengths[has_pool, None]).astype(np.int64)
+        draws[has_pool] = values[idx]
+
+    if (~has_pool).any():
+        draws[~has_pool] = rng.normal(0.0, fallback_scale, size=(int((~has_pool).sum()), sims))
+
+    draws += mu[:, None]
+    return draws
+
+
+# ---------- Quantiles ----------
+def row_quantiles(draws, quantiles=DEFAULT_QUANTILES):
+    """Per-row percentiles (numpy 'linear' method) from one partition pass."""
+    n = draws.shape[1]
+    pos = np.asarray(quantiles, dtype=np.float64) / 100.0 * (n - 1)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, n - 1)
+
+    part = np.partition(draws, np.unique(np.concatenate([lo, hi])), axis=1)
+    frac = pos - lo
+    return part[:, lo] + frac * (part[:, hi] - part[:, lo])
+
+
+# ---------- Threshold probabilities ----------
+def row_exceedance(draws, thresholds):
+    """P(draw > t) per row for a (rows x k) block of thresholds."""
+    thresholds = np.asarray(thresholds, dtype=np.float64).reshape(len(draws), -1)
+    return (draws[:, None, :] > thresholds[:, :, None]).mean(axis=2)
+
+
+def boom_bust_thresholds(positions):
+    """(rows x 2) cutoffs: column 0 is the boom line, column 1 the bust line."""
+    positions = pd.Series(positions)
+    boom = positions.map(BOOM_PTS).to_numpy(dtype=np.float64)
+    bust = positions.map(BUST_PTS).to_numpy(dtype=np.float64)
+    return np.column_stack([boom, bust])
+
+
+def normal_boom_bust(median, p10, p90, positions):
+    """Closed-form Boom%/Bust% from (median, p10, p90) under a normal fit."""
+    median = np.asarray(median, dtype=np.float64)
+    spread = np.asarray(p90, dtype=np.float64) - np.asarray(p10, dtype=np.float64)
+    std = np.where(spread > 0, spread / 2.56, 1.0)   # approx 1.28σ each side
+
+    cut = boom_bust_thresholds(positions)
+    boom = 1.0 - ndtr((cut[:, 0] - median) / std)
+    bust = ndtr((cut[:, 1] - median) / std)
+    return boom * 100, bust * 100
+
+
+# ---------- Full slate ----------
+def simulate_batch(mu, offsets, values, sims=5000, seed=None,
+                   quantiles=DEFAULT_QUANTILES, thresholds=None,
+                   chunk_rows=CHUNK_ROWS, fallback_scale=FALLBACK_SCALE, on_draws=None):
+    """Simulate every row in one vectorized call; returns (rows x quantiles).
+
+    With `thresholds` (rows x k cutoffs) also returns P(draw > cutoff) per row.
+    on_draws(row_start, col_start, block) receives every draw block before it
+    is discarded (e.g. draw_store.DrawWriter.write).
+    """
+    rng = np.random.default_rng(seed)
+    mu = np.asarray(mu, dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+
+    out = np.empty((len(mu), len(quantiles)), dtype=np.float64)
+    if thresholds is not None:
+        thresholds = np.asarray(thresholds, dtype=np.float64).reshape(len(mu), -1)
+        probs = np.empty(thresholds.shape, dtype=np.float64)
+
+    for start in range(0, len(mu), chunk_rows):
+        stop = min(start + chunk_rows, len(mu))
+        draws = draw_block(rng, mu[start:stop], offsets[start:stop + 1], values,
+                           sims, fallback_scale)
+        if on_draws is not None:
+            on_draws(start, 0, draws)
+        if thresholds is not None:
+            probs[start:stop] = row_exceedance(draws, thresholds[start:stop])
+        out[start:stop] = row_quantiles(draws, quantiles)
+
+    if thresholds is not None:
+        return out, probs
+    return out
+
+
+# ======================================
+# Correlated (game-script) simulation
+# ======================================
+# Each player's draw is split into an idiosyncratic part (bootstrapped
+# residual) and shared shocks for his team and his game:
+#
+#   x = mu + a * (r - r_bar) + r_bar + s * (b_t * z_team + b_g * z_game)
+#
+# with a = sqrt(1 - rho_team - rho_game), b = sqrt(rho), s = residual std.
+# Marginal variance stays ≈ s², teammates correlate at ≈ rho_team + rho_game
+# and opponents at ≈ rho_game. Sims run in float32 chunks sized to fit
+# `mem_budget_mb`; quantiles come from per-player histograms and the game
+# summary from running sums, so memory does not grow with `sims`.
+
+HIST_BINS = 1024
+HIST_WIDTH = 8.0         # histogram covers mu ± 8 residual std
+
+
+def _pool_moments(offsets, values, fallback_scale):
+    lengths = np.diff(offsets)
+    row_ids = np.repeat(np.arange(len(lengths)), lengths)
+    n = np.maximum(lengths, 1)
+    mean = np.bincount(row_ids, values, minlength=len(lengths)) / n
+    sq = np.bincount(row_ids, values ** 2, minlength=len(lengths)) / n
+    std = np.sqrt(np.maximum(sq - mean ** 2, 0.0))
+
+    no_spread = (lengths < 2) | (std <= 0)
+    std[no_spread] = fallback_scale
+    mean[lengths == 0] = 0.0
+    return mean, std
+
+
+def _game_keys(team, opponent):
+    team = pd.Series(team, dtype=object).reset_index(drop=True)
+    opponent = pd.Series(opponent, dtype=object).reset_index(drop=True)
+    valid = team.notna() & opponent.notna()
+
+    pair = pd.Series(np.where(team.astype(str) < opponent.astype(str),
+                              team.astype(str) + "-" + opponent.astype(str),
+                              opponent.astype(str) + "-" + team.astype(str)))
+    pair[~valid] = None
+
+    team_idx, teams = pd.factorize(team.where(valid))
+    game_idx, games = pd.factorize(pair)
+    return team_idx, np.asarray(teams), game_idx, np.asarray(games)
+
+
+def _hist_quantiles(counts, lo, width, quantiles):
+    cum = counts.cumsum(axis=1)
+    total = cum[:, -1].astype(np.float64)
+    out = np.empty((len(counts), len(quantiles)), dtype=np.float64)
+    rows = np.arange(len(counts))
+
+    for j, q in enumerate(quantiles):
+        target = total * q / 100.0
+        idx = np.minimum((cum < target[:, None]).sum(axis=1), counts.shape[1] - 1)
+        prev = np.where(idx > 0, cum[rows, np.maximum(idx - 1, 0)], 0)
+        in_bin = np.maximum(counts[rows, idx], 1)
+        frac = np.clip((target - prev) / in_bin, 0.0, 1.0)
+        out[:, j] = lo + (idx + frac) * width
+    return out
+
+
+def simulate_joint(mu, offsets, values, team, opponent, sims=100_000, seed=None,
+                   quantiles=DEFAULT_QUANTILES, thresholds=None,
+                   rho_team=0.15, rho_game=0.05, mem_budget_mb=256,
+                   fallback_scale=FALLBACK_SCALE, bins=HIST_BINS, on_draws=None):
+    """Jointly simulate the slate with shared team/game shocks.
+
+    Returns (quantiles, probs, game_summary); probs is None without thresholds.
+    on_draws(row_start, col_start, block) receives each chunk of sims.
+    """
+    rng = np.random.default_rng(seed)
+    mu = np.asarray(mu, dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    n = len(mu)
+
+    pool_mean, scale = _pool_moments(offsets, values, fallback_scale)
+    thin = np.diff(offsets) < 2     # 0/1 residuals: normal noise around the pool mean
+    team_idx, teams, game_idx, games = _game_keys(team, opponent)
+    in_game = team_idx >= 0
+
+    a = np.where(in_game, np.sqrt(1.0 - rho_team - rho_game), 1.0).astype(np.float32)
+    b_team = (np.where(in_game, np.sqrt(rho_team), 0.0) * scale).astype(np.float32)
+    b_game = (np.where(in_game, np.sqrt(rho_game), 0.0) * scale).astype(np.float32)
+    center = (mu + pool_mean).astype(np.float32)
+
+    lo = mu - HIST_WIDTH * scale
+    width = 2 * HIST_WIDTH * scale / bins
+    counts = np.zeros(n * bins, dtype=np.int64)
+    bin_base = (np.arange(n, dtype=np.int64) * bins)[:, None]
+
+    if thresholds is not None:
+        thresholds = np.asarray(thresholds, dtype=np.float32).reshape(n, -1)
+        over = np.zeros(thresholds.shape, dtype=np.int64)
+
+    # Rows grouped by team so team totals are one reduceat per chunk
+    order = np.argsort(np.where(in_game, team_idx, len(teams)), kind="stable")
+    order = order[in_game[order]]
+    team_starts = np.searchsorted(team_idx[order], np.arange(len(teams)))
+    sides = pd.DataFrame({"team": team_idx[in_game], "game": game_idx[in_game]}) \
+        .drop_duplicates().sort_values(["game", "team"]).groupby("game")["team"]
+    home = sides.first().to_numpy(dtype=np.int64)
+    away = sides.last().to_numpy(dtype=np.int64)   # == home if one side has no players
+
+    player_sum = np.zeros(n)
+    player_sq = np.zeros(n)
+    team_sum = np.zeros(len(teams))
+    team_sq = np.zeros(len(teams))
+    cross = np.zeros(len(games))
+
+    # ~48 bytes of float64/int64/float32 temporaries per (row, sim) cell
+    chunk = int(max(1, min(sims, mem_budget_mb * 2 ** 20 // (max(n, 1) * 48))))
+    lo32 = lo.astype(np.float32)[:, None]
+    inv_width32 = (1.0 / width).astype(np.float32)[:, None]
+
+    done = 0
+    while done < sims:
+        m = min(chunk, sims - done)
+
+        resid = draw_block(rng, np.zeros(n), offsets, values, m, fallback_scale)
+        if thin.any():
+            resid[thin] = pool_mean[thin, None] + rng.normal(0.0, fallback_scale, (int(thin.sum()), m))
+        x = (resid.astype(np.float32) - pool_mean.astype(np.float32)[:, None]) * a[:, None]
+        del resid
+        x += center[:, None]
+
+        if len(teams):
+            z_team = rng.standard_normal((len(teams), m), dtype=np.float32)
+            z_game = rng.standard_normal((len(games), m), dtype=np.float32)
+            x[in_game] += (b_team[in_game, None] * z_team[team_idx[in_game]]
+                           + b_game[in_game, None] * z_game[game_idx[in_game]])
+        if on_draws is not None:
+            on_draws(0, done, x)
+
+        # Histograms for quantiles
+        b = np.clip((x - lo32) * inv_width32, 0, bins - 1).astype(np.int64)
+        b += bin_base
+        counts += np.bincount(b.ravel(), minlength=n * bins)
+        del b
+
+        if thresholds is not None:
+            for k in range(thresholds.shape[1]):
+                over[:, k] += (x > thresholds[:, k, None]).sum(axis=1)
+
+        # Running sums for the game correlation summary
+        player_sum += x.sum(axis=1, dtype=np.float64)
+        player_sq += np.einsum("ij,ij->i", x, x, dtype=np.float64)
+        if len(teams):
+            totals = np.add.reduceat(x[order], team_starts, axis=0).astype(np.float64)
+            team_sum += totals.sum(axis=1)
+            team_sq += (totals ** 2).sum(axis=1)
+            two_sided = away != home
+            cross[two_sided] += (totals[home[two_sided]] * totals[away[two_sided]]).sum(axis=1)
+        del x
+
+        done += m
+
+    out = _hist_quantiles(counts.reshape(n, bins), lo, width, quantiles)
+    probs = over / sims if thresholds is not None else None
+    summary = _game_summary(sims, games, teams, home, away, team_idx, in_game,
+                            player_sum, player_sq, team_sum, team_sq, cross)
+    return out, probs, summary
+
+
+def _game_summary(sims, games, teams, home, away, team_idx, in_game,
+                  player_sum, player_sq, team_sum, team_sq, cross):
+    p_mean = player_sum / sims
+    p_var = np.maximum(player_sq / sims - p_mean ** 2, 0.0)
+    p_sd = np.sqrt(p_var)
+
+    t_mean = team_sum / sims
+    t_var = np.maximum(team_sq / sims - t_mean ** 2, 0.0)
+
+    # Average pairwise teammate correlation from Var(total) = Σvar + Σcov
+    idx = team_idx[in_game]
+    sum_var = np.bincount(idx, p_var[in_game], minlength=len(teams))
+    sum_sd = np.bincount(idx, p_sd[in_game], minlength=len(teams))
+    sum_sd_sq = np.bincount(idx, p_sd[in_game] ** 2, minlength=len(teams))
+    n_players = np.bincount(idx, minlength=len(teams))
+    pair_norm = sum_sd ** 2 - sum_sd_sq
+    with np.errstate(divide="ignore", invalid="ignore"):
+        teammate_corr = np.where(pair_norm > 0, (t_var - sum_var) / pair_norm, np.nan)
+
+    rows = []
+    for g, key in enumerate(games):
+        h, w = home[g], away[g]
+        two_sided = w != h
+        cov = cross[g] / sims - t_mean[h] * t_mean[w] if two_sided else np.nan
+        denom = np.sqrt(t_var[h] * t_var[w]) if two_sided else 0.0
+        total_var = t_var[h] + (t_var[w] + 2 * cov if two_sided else 0.0)
+        rows.append({
+            "game": key,
+            "team": teams[h],
+            "opponent": teams[w] if two_sided else None,
+            "team_players": int(n_players[h]),
+            "opp_players": int(n_players[w]) if two_sided else 0,
+            "team_mean": t_mean[h],
+            "opp_mean": t_mean[w] if two_sided else np.nan,
+            "team_sd": np.sqrt(t_var[h]),
+            "opp_sd": np.sqrt(t_var[w]) if two_sided else np.nan,
+            "team_opp_corr": cov / denom if denom > 0 else np.nan,
+            "team_teammate_corr": teammate_corr[h],
+            "opp_teammate_corr": teammate_corr[w] if two_sided else np.nan,
+            "game_total_mean": t_mean[h] + (t_mean[w] if two_sided else 0.0),
+            "game_total_sd": np.sqrt(max(total_var, 0.0)),
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,167 @@
+import hashlib
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# ======================================
+# Incremental OLS from sufficient statistics
+# ======================================
+# For each (model, position, week) we keep the cross-product of the
+# augmented design Z = [1, X, y]:
+#
+#         | n     Σx     Σy   |
+#   ZᵀZ = | Σx    XᵀX    Xᵀy  |
+#         | Σy    yᵀX    Σy²  |
+#
+# Summing the weekly blocks for a training window gives everything OLS
+# needs, so adding a week costs one (p+2)² accumulation and the re-solve
+# is O(p³) on a ≤ 11×11 system regardless of how many rows came before.
+# Blocks are stored in ols_stats with a hash of the week's rows, so a sync
+# only recomputes weeks whose data actually changed.
+
+STATS_TABLE = "ols_stats"
+
+Fit = namedtuple("Fit", ["features", "intercept", "coef", "r2", "n"])
+
+
+def ensure_table(conn):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {STATS_TABLE} (
+            model     TEXT    NOT NULL,
+            position  TEXT    NOT NULL,
+            week_num  INTEGER NOT NULL,
+            features  TEXT    NOT NULL,
+            n         INTEGER NOT NULL,
+            rows_hash TEXT    NOT NULL,
+            ztz       BLOB    NOT NULL,
+            PRIMARY KEY (model, position, week_num)
+        )
+    """)
+
+
+# ---------- Accumulate ----------
+def cross_products(X, y):
+    """ZᵀZ for Z = [1, X, y] (float64, shape (p+2, p+2))."""
+    X = np.asarray(X, dtype=np.float64)
+    Z = np.column_stack([np.ones(len(X)), X.reshape(len(X), -1), np.asarray(y, dtype=np.float64)])
+    return Z.T @ Z
+
+
+def _rows_hash(X, y):
+    h = hashlib.sha1(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(y, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def add_week(conn, model, position, week, X, y, features):
+    """Store (or replace) one week's block. O(rows in that week · p²)."""
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ztz = cross_products(X, y)
+    conn.execute(
+        f"INSERT OR REPLACE INTO {STATS_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (model, position, int(week), ",".join(features), len(y), _rows_hash(X, y), ztz.tobytes()),
+    )
+
+
+def sync(conn, model, position, df, features, target="pts_ppr", week_col="week_num"):
+    """Bring the stored blocks in line with df; returns the weeks recomputed.
+
+    Rows must already be cleaned (no NaN in features/target). Weeks whose
+    rows are unchanged are skipped; weeks no longer in df are dropped.
+    """
+    ensure_table(conn)
+    key = ",".join(features)
+    stored = {
+        w: (f, h) for w, f, h in conn.execute(
+            f"SELECT week_num, features, rows_hash FROM {STATS_TABLE} WHERE model = ? AND position = ?",
+            (model, position))
+    }
+
+    changed = []
+    with conn:
+        for week, g in df.groupby(week_col, sort=True):
+            X = g[features].to_numpy(dtype=np.float64)
+            y = g[target].to_numpy(dtype=np.float64)
+            if stored.get(int(week)) == (key, _rows_hash(X, y)):
+                continue
+            add_week(conn, model, position, week, X, y, features)
+            changed.append(int(week))
+
+        gone = set(stored) - {int(w) for w in df[week_col].unique()}
+        conn.executemany(
+            f"DELETE FROM {STATS_TABLE} WHERE model = ? AND position = ? AND week_num = ?",
+            [(model, position, w) for w in gone])
+    return changed
+
+
+def load_stats(conn, model, position, weeks=None):
+    """Summed ZᵀZ over the requested weeks (all stored weeks if None)."""
+    sql = f"SELECT features, ztz FROM {STATS_TABLE} WHERE model = ? AND position = ?"
+    params = [model, position]
+    if weeks is not None:
+        weeks = [int(w) for w in weeks]
+        sql += f" AND week_num IN ({','.join('?' * len(weeks)) or 'NULL'})"
+        params += weeks
+
+    rows = conn.execute(sql, params).fetchall()
+    if not rows:
+        return None, None
+    features = rows[0][0].split(",")
+    k = len(features) + 2
+    total = np.zeros((k, k))
+    for _, blob in rows:
+        total += np.frombuffer(blob, dtype=np.float64).reshape(k, k)
+    return features, total
+
+
+# ---------- Solve ----------
+def solve(ztz, features):
+    """OLS with intercept from a summed ZᵀZ block."""
+    p = len(features)
+    A = ztz[:p + 1, :p + 1]          # [1 X]ᵀ[1 X]
+    b = ztz[:p + 1, p + 1]           # [1 X]ᵀy
+    n, sum_y, sum_yy = ztz[0, 0], ztz[0, p + 1], ztz[p + 1, p + 1]
+
+    if np.linalg.cond(A) < 1e12:
+        beta = np.linalg.solve(A, b)
+    else:
+        # rank-deficient (e.g. an all-zero feature): minimum-norm solution,
+        # same as LinearRegression / lstsq on the raw rows
+        beta = np.linalg.lstsq(A, b, rcond=None)[0]
+
+    sse = sum_yy - beta @ b
+    sst = sum_yy - sum_y ** 2 / n
+    r2 = 1.0 - sse / sst if sst > 0 else 0.0
+    return Fit(list(features), float(beta[0]), beta[1:], float(r2), int(n))
+
+
+def fit(conn, model, position, weeks=None):
+    features, ztz = load_stats(conn, model, position, weeks)
+    if ztz is None:
+        return None
+    return solve(ztz, features)
+
+
+def fit_frame(df, features, target="pts_ppr"):
+    """Direct fit from rows (no storage); same solve as the stored path."""
+    return solve(cross_products(df[features].to_numpy(dtype=np.float64),
+                                df[target].to_numpy(dtype=np.float64)), features)
+
+
+def predict(fit_, X):
+    return np.asarray(X, dtype=np.float64) @ fit_.coef + fit_.intercept
+
+
+def coef_frame(fit_):
+    """Coefficient table as stored in {pos}_model_coefs (intercept row first)."""
+    return pd.DataFrame({"feature": ["intercept"] + fit_.features,
+                         "coef": np.r_[fit_.intercept, fit_.coef]})
+
+
+def check_refit(df, fit_, target="pts_ppr"):
+    """Max abs difference between fit_ and a full lstsq refit on df's rows."""
+    X = np.column_stack([np.ones(len(df)), df[fit_.features].to_numpy(dtype=np.float64)])
+    beta = np.linalg.lstsq(X, df[target].to_numpy(dtype=np.float64), rcond=None)[0]
+    return float(np.max(np.abs(beta - np.r_[fit_.intercept, fit_.coef])))
@@ -1,10 +1,10 @@
-import sqlite3
-import pandas as pd
 from sklearn.linear_model import LinearRegression
 from scipy.stats import pearsonr
 
+import db
+
 # --- Connect to DB ---
-conn = sqlite3.connect("C:/Users/cmice/repo/fantasy/fantasy.db")
+conn = db.connect()
 print("✅ Connected to DB...")
 
 # --- Query ---
@@ -21,7 +21,7 @@ WHERE a.pts_ppr IS NOT NULL
   AND e.ease_factor IS NOT NULL;
 """
 
-df = pd.read_sql(query, conn)
+df = db.read_sql(query, conn)
 print(f"✅ Retrieved {len(df)} rows")
 print(df.head())
 # ✅ Close connection AFTER pulling data
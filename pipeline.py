@@ -0,0 +1,270 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import db
+import feature_store
+import profiling
+
+# ======================================
+# Incremental pipeline runner
+# ======================================
+# Each stage declares the tables it reads and writes. A stage's key is the
+# hash of its script and every local module it imports (transitively:
+# projections, ols_stats, rates, predictor, ...) plus the content hashes of
+# its input tables; it reruns only when that key differs from the last
+# successful run (or an output is missing). Stages in the same dependency
+# level run in parallel.
+#
+# all_weeks is the root input. The external ingest stage fetches Sleeper
+# stats into weekly_stats and rebuilds the weekN tables and all_weeks from
+# them; the ease stage derives all_weeks_joined from all_weeks and the
+# original opponent_strength_offadj, and every model stage reads that.
+#
+# Content hashes are cached against db.table_version, so an unchanged table
+# is never rehashed, and a table rewritten with identical rows does not
+# trigger anything downstream.
+#
+# --profile DIR runs every stage with FANTASY_PROFILE=DIR/<stage>.json and
+# merges the per-stage reports (plus each subprocess's wall time) into
+# DIR/run.json; compare two runs with `python profiling.py compare`.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MAX_WORKERS = 4
+
+STATE_TABLE = "_pipeline_state"
+HASH_TABLE = "_table_hashes"
+
+PREDICTION_TABLES = [f"{p}_week11_predictions" for p in ("wr", "rb", "te", "qb")]
+RESIDUAL_TABLES = [f"{p}_residuals" for p in ("wr", "rb", "te", "qb")]
+
+# external=True stages pull from the network; they only run when named
+# with --only/--force (their inputs live outside the database).
+STAGES = [
+    {"name": "players", "script": "load_players.py", "external": True,
+     "inputs": [], "outputs": ["players"]},
+    {"name": "matchups", "script": "extract_opponent.py", "external": True,
+     "inputs": [], "outputs": ["nfl_matchups"]},
+    {"name": "ingest", "script": "ingest_stats.py", "external": True,
+     "inputs": ["players", "nfl_matchups"], "outputs": ["weekly_stats", "all_weeks"]},
+    {"name": "ease", "script": "build_ease_table.py",
+     "inputs": ["all_weeks", "opponent_strength_offadj"],
+     "outputs": ["opponent_strength_by_position_v2", "opponent_strength_offadj_v2", "all_weeks_joined"]},
+    {"name": "baselines", "script": "baselines.py",
+     "inputs": ["all_weeks_joined"], "outputs": ["player_baselines", "week11_inputs"]},
+    {"name": "season_model", "script": "week11_regression.py",
+     "inputs": ["all_weeks_joined"], "outputs": ["week11_projections"]},
+    {"name": "position_models", "script": "project_all.py",
+     "inputs": ["all_weeks_joined", "week11_inputs"],
+     "outputs": [f"{p}_{t}" for p in ("wr", "rb", "te", "qb")
+                 for t in ("model_coefs", "residuals", "week11_predictions")]},
+    {"name": "ros", "script": "ros_projections.py",
+     "inputs": ["all_weeks_joined", "player_baselines", "nfl_matchups", "opponent_strength_offadj"],
+     "outputs": ["ros_projections"]},
+    {"name": "simulate", "script": "simulate_week11.py",
+     "inputs": PREDICTION_TABLES + RESIDUAL_TABLES + ["nfl_matchups"],
+     "outputs": ["week11_simulated_all"]},
+]
+
+
+# ---------- State ----------
+def _ensure_state(conn):
+    conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+            stage    TEXT PRIMARY KEY,
+            key      TEXT NOT NULL,
+            ran_at   REAL NOT NULL,
+            seconds  REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS {HASH_TABLE} (
+            name     TEXT PRIMARY KEY,
+            version  TEXT NOT NULL,
+            hash     TEXT NOT NULL
+        );
+    """)
+
+
+def content_hash(conn, table):
+    """Content hash of a table, recomputed only when its version changed."""
+    version = db.table_version(conn, table)
+    if version is None:
+        return None
+
+    row = conn.execute(f"SELECT version, hash FROM {HASH_TABLE} WHERE name = ?", (table,)).fetchone()
+    if row and row[0] == version:
+        return row[1]
+
+    h = db.table_hash(conn, table)
+    with conn:
+        conn.execute(f"INSERT OR REPLACE INTO {HASH_TABLE} VALUES (?, ?, ?)", (table, version, h))
+    return h
+
+
+def _file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def local_modules(script):
+    """script plus every module from this directory it imports, transitively."""
+    seen, todo = set(), [script]
+    while todo:
+        name = todo.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        with open(os.path.join(HERE, name)) as f:
+            tree = ast.parse(f.read(), name)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules = [a.name for a in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                modules = [node.module]
+            else:
+                continue
+            for m in modules:
+                path = m.split(".")[0] + ".py"
+                if os.path.exists(os.path.join(HERE, path)):
+                    todo.append(path)
+    return sorted(seen)
+
+
+def stage_key(conn, stage):
+    parts = [f"{m}={_file_hash(os.path.join(HERE, m))}" for m in local_modules(stage["script"])]
+    parts += [f"{t}={content_hash(conn, t)}" for t in stage["inputs"]]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+def is_stale(conn, stage):
+    key = stage_key(conn, stage)
+    row = conn.execute(f"SELECT key FROM {STATE_TABLE} WHERE stage = ?", (stage["name"],)).fetchone()
+    missing = [t for t in stage["outputs"] if db.table_version(conn, t) is None]
+    return (row is None or row[0] != key or bool(missing)), key
+
+
+# ---------- Graph ----------
+def levels(stages):
+    """Group stages into dependency levels (each level only reads earlier outputs)."""
+    produced_by = {t: s["name"] for s in stages for t in s["outputs"]}
+    deps = {s["name"]: {produced_by[t] for t in s["inputs"] if t in produced_by} - {s["name"]}
+            for s in stages}
+
+    done, out = set(), []
+    remaining = {s["name"]: s for s in stages}
+    while remaining:
+        ready = [s for n, s in remaining.items() if deps[n] <= done]
+        if not ready:
+            raise RuntimeError(f"Dependency cycle among stages: {sorted(remaining)}")
+        out.append(ready)
+        for s in ready:
+            done.add(s["name"])
+            del remaining[s["name"]]
+    return out
+
+
+# ---------- Run ----------
+def run_stage(stage, db_path, profile_dir=None):
+    env = dict(os.environ, FANTASY_DB=os.path.abspath(db_path))
+    if profile_dir:
+        env[profiling.ENV_VAR] = os.path.join(os.path.abspath(profile_dir), f"{stage['name']}.json")
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, os.path.join(HERE, stage["script"])],
+                          env=env, capture_output=True, text=True)
+    return proc, time.perf_counter() - start
+
+
+def save_profile(profile_dir, wall):
+    reports = {}
+    for name in wall:
+        path = os.path.join(profile_dir, f"{name}.json")
+        if os.path.exists(path):
+            reports[name] = profiling.load(path)
+    out = os.path.join(profile_dir, "run.json")
+    with open(out, "w") as f:
+        json.dump(profiling.merge(reports, "pipeline", wall), f, indent=2)
+    print(f"📊 profile written to {out}")
+
+
+def run(db_path=db.DB_PATH, only=None, force=(), dry_run=False, max_workers=MAX_WORKERS,
+        profile_dir=None):
+    conn = db.connect(db_path)
+    _ensure_state(conn)
+    wall = {}
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+
+    selected = [s for s in STAGES
+                if (only and s["name"] in only) or (not only and not s.get("external"))
+                or s["name"] in force]
+
+    for level in levels(selected):
+        todo = []
+        for stage in level:
+            stale, key = is_stale(conn, stage)
+            if stale or stage["name"] in force:
+                todo.append((stage, key))
+            else:
+                print(f"⏭️  {stage['name']}: up to date")
+
+        if not todo:
+            continue
+        if dry_run:
+            for stage, _ in todo:
+                print(f"🔁 {stage['name']}: would run {stage['script']}")
+            continue
+
+        # Refresh the shared feature store once here rather than letting
+        # parallel model stages race to rebuild it
+        if any(feature_store.SOURCE_TABLE in s["inputs"] for s, _ in todo):
+            feature_store.ensure_fresh(conn)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(lambda sk: (sk, run_stage(sk[0], db_path, profile_dir)), todo))
+
+        failed = []
+        for (stage, key), (proc, seconds) in results:
+            wall[stage["name"]] = seconds
+            if proc.returncode != 0:
+                failed.append(stage["name"])
+                print(f"❌ {stage['name']} failed after {seconds:.1f}s\n{proc.stderr.strip()}")
+                continue
+            with conn:
+                conn.execute(f"INSERT OR REPLACE INTO {STATE_TABLE} VALUES (?, ?, ?, ?)",
+                             (stage["name"], key, time.time(), seconds))
+            print(f"✅ {stage['name']} ({seconds:.1f}s)")
+
+        if failed:
+            conn.close()
+            if profile_dir:
+                save_profile(profile_dir, wall)
+            raise SystemExit(f"Pipeline stopped: {', '.join(failed)} failed")
+
+    conn.close()
+    if profile_dir and wall:
+        save_profile(profile_dir, wall)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the projection pipeline incrementally.")
+    parser.add_argument("--db", default=db.DB_PATH)
+    parser.add_argument("--only", nargs="*", help="run just these stages (if stale)")
+    parser.add_argument("--force", nargs="*", default=[], help="rerun these stages regardless")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--list", action="store_true", help="show stages and exit")
+    parser.add_argument("--profile", metavar="DIR", help="write per-stage profiling reports to DIR")
+    args = parser.parse_args()
+
+    if args.list:
+        for i, level in enumerate(levels(STAGES)):
+            for s in level:
+                print(f"[{i}] {s['name']:<16} {s['script']:<24} "
+                      f"in={','.join(s['inputs']) or '-'} out={','.join(s['outputs'])}")
+    else:
+        run(args.db, args.only, set(args.force), args.dry_run, args.workers, args.profile)
@@ -0,0 +1,176 @@
+import re
+import unicodedata
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import app_data
+
+# ---------------- CONFIG ----------------
+PLAYERS_TABLE = "players"
+MIN_SIMILARITY = 0.3     # share of query trigrams a fuzzy (typo) match must contain
+MAX_FUZZY = 5            # fuzzy matches returned when nothing matches exactly / by prefix
+MAX_INDEXES = 4          # cached indexes kept across data versions
+# ----------------------------------------
+
+# ======================================
+# Player name index
+# ======================================
+# Names are normalized once (accents, case, punctuation, Jr./III suffixes)
+# and indexed two ways:
+#   tokens    sorted array of every name token → bisect gives all names with
+#             a token starting with the query token ("chr", "mcc")
+#   trigrams  {trigram: rows} postings → np.bincount over the query's
+#             postings gives shared-trigram counts for every name at once;
+#             similarity = share of the query's trigrams found in the name,
+#             which absorbs typos ("mcaffery") and partial names
+#
+# Ranking tiers: exact name > every query token is a prefix of a name token
+# > fuzzy. Exact/prefix hits are ordered by the weight column (e.g. the
+# projection). The fuzzy tier is only used when there are no exact/prefix
+# hits, and then only its MAX_FUZZY best (by similarity, then weight).
+
+SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+_PUNCT = re.compile(r"[.'’`]")
+_SEPARATORS = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(name):
+    """'Ja'Marr Chase' → 'jamarr chase', 'Kenneth Walker III' → 'kenneth walker'."""
+    if not isinstance(name, str):
+        return ""
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    name = _PUNCT.sub("", name.lower())
+    tokens = [t for t in _SEPARATORS.split(name) if t]
+    while len(tokens) > 1 and tokens[-1] in SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PlayerIndex:
+    """Search / lookup structure over a frame with playerID, playerName, team, position."""
+
+    def __init__(self, df, weight=None):
+        self.frame = df.reset_index(drop=True)
+        self.ids = self.frame["playerID"].astype(str).to_numpy()
+        self.names = self.frame["playerName"].astype(object).to_numpy()
+        self.norm = np.array([normalize(n) for n in self.names], dtype=object)
+        self.weight = (self.frame[weight].to_numpy(dtype=np.float64) if weight
+                       else np.zeros(len(self.frame)))
+        self.weight = np.nan_to_num(self.weight, nan=-np.inf)
+
+        # token prefix index
+        tok, rows = [], []
+        for i, name in enumerate(self.norm):
+            for t in set(name.split()):
+                tok.append(t)
+                rows.append(i)
+        order = sorted(range(len(tok)), key=tok.__getitem__)
+        self._tokens = [tok[i] for i in order]
+        self._token_rows = np.asarray(rows, dtype=np.int32)[order]
+
+        # trigram postings
+        postings = {}
+        for i, name in enumerate(self.norm):
+            for g in trigrams(name) if name else ():
+                postings.setdefault(g, []).append(i)
+        self._postings = {g: np.asarray(r, dtype=np.int32) for g, r in postings.items()}
+
+        # exact name / id / team / position lookups
+        self._exact = {}
+        for i, name in enumerate(self.norm):
+            self._exact.setdefault(name, []).append(i)
+        self._by_id = {pid: i for i, pid in enumerate(self.ids)}
+        teams = self.frame["team"].astype(object).fillna("").to_numpy()
+        self._by_team = {t: np.flatnonzero(teams == t) for t in pd.unique(teams) if t}
+        self._positions = self.frame["position"].astype(object).to_numpy()
+        codes, uniques = pd.factorize(self._positions)
+        self._position_rows = codes
+        self._position_codes = {p: c for c, p in enumerate(uniques)}
+        self.sorted_names = sorted(set(n for n in self.names if isinstance(n, str)))
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ---------- Search ----------
+    def _prefix_rows(self, token):
+        lo = bisect_left(self._tokens, token)
+        hi = bisect_left(self._tokens, token + "\uffff", lo)
+        return self._token_rows[lo:hi]
+
+    def search(self, query, limit=10, positions=None):
+        """Row positions of the best matches for query, best first."""
+        q = normalize(query)
+        if not q:
+            return np.empty(0, dtype=np.int64)
+        n = len(self.ids)
+
+        tier = np.zeros(n, dtype=np.int8)
+        sim = np.zeros(n)
+        hits = None
+        for t in q.split():
+            rows = self._prefix_rows(t)
+            hits = rows if hits is None else np.intersect1d(hits, rows)
+        tier[hits] = 2
+        tier[self._exact.get(q, [])] = 3
+
+        grams = trigrams(q)
+        lists = [self._postings[g] for g in grams if g in self._postings]
+        if lists:
+            shared = np.bincount(np.concatenate(lists), minlength=n)
+            touched = np.flatnonzero(shared)
+            sim[touched] = shared[touched] / len(grams)
+            fuzzy = touched[(tier[touched] == 0) & (sim[touched] >= MIN_SIMILARITY)]
+            tier[fuzzy] = 1
+
+        cand = np.flatnonzero(tier)
+        if positions is not None:
+            codes = [self._position_codes[p] for p in positions if p in self._position_codes]
+            cand = cand[np.isin(self._position_rows[cand], codes)]
+
+        if (tier[cand] > 1).any():
+            cand = cand[tier[cand] > 1]
+            order = np.lexsort((-self.weight[cand], -tier[cand]))
+        else:
+            order = np.lexsort((-self.weight[cand], -sim[cand]))[:MAX_FUZZY]
+        return cand[order[:limit] if limit else order]
+
+    def search_ids(self, query, limit=10, positions=None):
+        return self.ids[self.search(query, limit, positions)]
+
+    def matches(self, query, limit=10, positions=None):
+        """Matching rows of the indexed frame, best first."""
+        return self.frame.iloc[self.search(query, limit, positions)]
+
+    # ---------- Lookups ----------
+    def by_id(self, player_id):
+        """Indexed row for playerID as a Series, or None."""
+        i = self._by_id.get(str(player_id))
+        return None if i is None else self.frame.iloc[i]
+
+    def by_team(self, team, positions=None):
+        rows = self._by_team.get(str(team).upper(), np.empty(0, dtype=np.int64))
+        if positions is not None:
+            rows = rows[np.isin(self._positions[rows], list(positions))]
+        return self.frame.iloc[rows]
+
+
+# ---------- Cached per data version ----------
+@st.cache_resource(show_spinner=False, max_entries=MAX_INDEXES)
+def index_for(table, version, _df, weight=None):
+    """Index over an already-loaded app frame; rebuilt only when the version changes."""
+    return PlayerIndex(_df, weight)
+
+
+def load_index(table=PLAYERS_TABLE, weight=None):
+    """Index over table's id columns (default: the full Sleeper registry)."""
+    columns = ["playerID", "playerName", "team", "position"] + ([weight] if weight else [])
+    df, version = app_data.load(table, columns)
+    return index_for(table, version, df, weight)
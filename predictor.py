@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+import db
+import ols_stats
+
+# ======================================
+# Vectorized scoring across positions
+# ======================================
+# A model set is {position: ols_stats.Fit}. score() splits the rows by
+# position once, gathers each group's features into one contiguous float64
+# block and does a single matmul per position — no per-row Python.
+
+POSITIONS = ["WR", "RB", "TE", "QB"]
+
+
+def load_models(conn=None, positions=POSITIONS):
+    """Fits rebuilt from the {pos}_model_coefs tables (intercept row + features).
+
+    Raises ValueError for a table without exactly one intercept row — e.g.
+    the legacy layout that stored only feature coefficients — rather than
+    scoring it with an intercept of 0.
+    """
+    if conn is None:
+        with db.get_connection() as c:
+            return load_models(c, positions)
+
+    existing = set(db.list_tables(conn))
+    models = {}
+    for pos in positions:
+        table = f"{pos.lower()}_model_coefs"
+        if table not in existing:
+            continue
+        coefs = db.read_sql(f"SELECT feature, coef FROM {table}", conn)
+
+        is_int = coefs["feature"] == "intercept"
+        if is_int.sum() != 1:
+            raise ValueError(f"{table} has {int(is_int.sum())} intercept rows, expected 1 "
+                             f"(legacy layout? rerun project_all.py to refit)")
+        intercept = float(coefs.loc[is_int, "coef"].iloc[0])
+        coefs = coefs[~is_int]
+        models[pos] = ols_stats.Fit(coefs["feature"].tolist(), intercept,
+                                    coefs["coef"].to_numpy(dtype=np.float64), np.nan, 0)
+    return models
+
+
+def score(df, models, position_col="position", fillna=None):
+    """Predicted points for every row of df; NaN where the position has no model.
+
+    fillna=None leaves missing feature values as NaN (→ NaN prediction);
+    pass 0 to treat them as zero, as the weekly projectors do.
+    """
+    out = np.full(len(df), np.nan)
+    positions = df[position_col].to_numpy()
+
+    for pos, fit in models.items():
+        idx = np.flatnonzero(positions == pos)
+        if not len(idx):
+            continue
+        X = df[fit.features].to_numpy(dtype=np.float64)[idx]
+        if fillna is not None:
+            X = np.where(np.isnan(X), fillna, X)
+        out[idx] = np.ascontiguousarray(X) @ fit.coef + fit.intercept
+    return out
+
+
+def rescore(df, conn=None, position_col="position", fillna=0):
+    """Score df with the stored coefficient tables (e.g. after editing inputs in the app)."""
+    return pd.Series(score(df, load_models(conn), position_col, fillna), index=df.index)
@@ -0,0 +1,331 @@
+import argparse
+import atexit
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+try:
+    import resource
+except ImportError:      # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# ---------------- CONFIG ----------------
+ENV_VAR = "FANTASY_PROFILE"     # report path (or directory) — set it to profile any script
+REGRESSION = 0.10               # compare: flag metrics that grew by more than 10% ...
+MIN_DELTA = {"wall_s": 0.05, "cpu_s": 0.05, "sql_s": 0.02, "peak_rss_mb": 5.0,
+             "sql_bytes_in": 1 << 20}   # ... and by more than this absolute amount
+TOP_SQL = 15
+# ----------------------------------------
+
+# ======================================
+# Stage / SQL instrumentation
+# ======================================
+# with profiling.stage("simulate"): ...   (or @profiling.profiled(), or
+# profiling.section("load") / section("train") between blocks of a flat script)
+#
+# Each stage records wall time, CPU time, RSS at entry/exit and the process
+# peak RSS at exit, plus everything db.read_sql / db.write_tables did while
+# it was open: rows in/out, bytes materialized from SQLite, statement count
+# and time. Stages nest ("simulate/draws"); SQL is attributed to every open
+# stage, so a parent includes its children.
+#
+# Setting FANTASY_PROFILE makes any script that imports db profile itself:
+# a root stage named after the script spans the whole run and the JSON
+# report is written at exit. pipeline.py --profile DIR does this for every
+# stage and merges the results; `python profiling.py compare a.json b.json`
+# diffs two reports.
+#
+# Memory is read with psutil when installed, else /proc (Linux) or
+# resource (macOS). peak_rss_mb is the process high-water mark, which only
+# rises; peak_delta_mb is how much a stage raised it.
+
+MB = 1024 * 1024
+METRICS = ["wall_s", "cpu_s", "peak_rss_mb", "peak_delta_mb", "rows_in", "rows_out",
+           "sql_bytes_in", "sql_reads", "sql_writes", "sql_s"]
+
+_stack = []          # open stage records, innermost last
+_stages = []         # finished stage records
+_sql = {}            # (kind, statement/table) → [count, seconds, rows, bytes]
+_pid = os.getpid()
+
+
+# ---------- Memory ----------
+def rss_mb():
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / MB
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / MB
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_mb():
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        if hasattr(info, "peak_wset"):                        # Windows
+            return info.peak_wset / MB
+    try:
+        # VmHWM is per address space; ru_maxrss survives fork+exec, so a
+        # subprocess would report its parent's peak
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / MB if sys.platform == "darwin" else peak / 1024   # bytes vs KiB
+    return rss_mb()
+
+
+# ---------- Stages ----------
+@contextmanager
+def stage(name):
+    """Time and measure the enclosed block as one stage."""
+    parent = _stack[-1]["path"] if _stack else None
+    rec = {
+        "name": name,
+        "path": f"{parent}/{name}" if parent else name,
+        "started_at": time.time(),
+        "rows_in": 0, "rows_out": 0, "sql_bytes_in": 0,
+        "sql_reads": 0, "sql_writes": 0, "sql_s": 0.0,
+        "rss_start_mb": rss_mb(),
+        "_peak0": peak_rss_mb(),
+        "_wall0": time.perf_counter(),
+        "_cpu0": time.process_time(),
+    }
+    _stack.append(rec)
+    try:
+        yield rec
+    finally:
+        _close(rec)
+
+
+def _close(rec):
+    if "_wall0" not in rec:          # already closed by report()
+        return
+    rec["wall_s"] = time.perf_counter() - rec.pop("_wall0")
+    rec["cpu_s"] = time.process_time() - rec.pop("_cpu0")
+    rec["rss_end_mb"] = rss_mb()
+    rec["peak_rss_mb"] = peak_rss_mb()
+    peak0 = rec.pop("_peak0")
+    rec["peak_delta_mb"] = (rec["peak_rss_mb"] - peak0) if peak0 is not None else None
+    if rec in _stack:
+        _stack.remove(rec)
+    _stages.append(rec)
+
+
+_section = []        # record opened by section(), if any
+_root = []           # FANTASY_PROFILE whole-run stage
+
+
+def section(name):
+    """Flat-script form of stage(): ends the previous section() and starts a new one."""
+    end_section()
+    cm = stage(name)
+    _section.append((cm, cm.__enter__()))
+
+
+def end_section():
+    if _section:
+        cm, _ = _section.pop()
+        cm.__exit__(None, None, None)
+
+
+def profiled(name=None):
+    """Decorator form of stage()."""
+    def wrap(fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            with stage(name or fn.__name__):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+# ---------- SQL hooks (called from db.py) ----------
+def _sql_key(text):
+    return " ".join(str(text).split())[:200]
+
+
+def record_read(sql, df, seconds):
+    if not _stack or not hasattr(df, "memory_usage"):      # chunksize= returns an iterator
+        return
+    nbytes = int(df.memory_usage(index=False, deep=True).sum())
+    for rec in _stack:
+        rec["rows_in"] += len(df)
+        rec["sql_bytes_in"] += nbytes
+        rec["sql_reads"] += 1
+        rec["sql_s"] += seconds
+    entry = _sql.setdefault(("read", _sql_key(sql)), [0, 0.0, 0, 0])
+    entry[0] += 1
+    entry[1] += seconds
+    entry[2] += len(df)
+    entry[3] += nbytes
+
+
+def record_write(table, rows, seconds):
+    if not _stack:
+        return
+    for rec in _stack:
+        rec["rows_out"] += rows
+        rec["sql_writes"] += 1
+        rec["sql_s"] += seconds
+    entry = _sql.setdefault(("write", table), [0, 0.0, 0, 0])
+    entry[0] += 1
+    entry[1] += seconds
+    entry[2] += rows
+
+
+# ---------- Report ----------
+def report(label=None):
+    """Machine-readable summary of every finished stage (open stages are closed first)."""
+    for rec in list(reversed(_stack)):
+        _close(rec)
+
+    stages = {}
+    for rec in _stages:
+        agg = stages.setdefault(rec["path"], {"path": rec["path"], "name": rec["name"], "calls": 0,
+                                               **{m: 0 for m in METRICS}})
+        agg["calls"] += 1
+        for m in METRICS:
+            if m in ("peak_rss_mb",):
+                agg[m] = max(agg[m], rec[m] or 0)
+            else:
+                agg[m] += rec[m] or 0
+        agg["rss_end_mb"] = rec["rss_end_mb"]
+
+    sql = sorted(({"kind": k, "target": t, "count": c, "seconds": s, "rows": r, "bytes": b}
+                  for (k, t), (c, s, r, b) in _sql.items()), key=lambda e: -e["seconds"])
+    return {
+        "run": {
+            "label": label or os.path.basename(sys.argv[0] or "python"),
+            "argv": sys.argv,
+            "finished_at": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "stages": sorted(stages.values(), key=lambda s: s["path"]),
+        "sql": sql[:TOP_SQL],
+    }
+
+
+def save(path, label=None):
+    out = report(label)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(out, f, indent=2)
+    return out
+
+
+def merge(reports, label="pipeline", wall=None):
+    """One report from several child reports ({name: report}); wall adds {name: seconds}."""
+    stages = [s for rep in reports.values() for s in rep["stages"]]
+    for name, seconds in (wall or {}).items():
+        stages.append({"path": f"{label}/{name}", "name": name, "calls": 1,
+                       **{m: 0 for m in METRICS}, "wall_s": seconds})
+    sql = sorted((e for rep in reports.values() for e in rep.get("sql", [])),
+                 key=lambda e: -e["seconds"])
+    run = {"label": label, "argv": sys.argv, "finished_at": time.time(), "children": sorted(reports),
+           "python": platform.python_version(), "platform": platform.platform()}
+    return {"run": run,
+            "stages": sorted(stages, key=lambda s: s["path"]), "sql": sql[:TOP_SQL]}
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _report_path(target, label):
+    if target.endswith(os.sep) or target.endswith("/") or os.path.isdir(target):
+        return os.path.join(target, f"{label}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    return target
+
+
+def _auto_profile():
+    """FANTASY_PROFILE set: profile this whole process as one root stage."""
+    target = os.environ.get(ENV_VAR)
+    if not target or __name__ == "__main__":
+        return
+    label = os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0] or "python"
+    root = stage(label)
+    _root.append(root)           # keep the generator alive; report() closes the record
+    root.__enter__()
+
+    def finish():
+        if os.getpid() == _pid:      # not in forked workers
+            save(_report_path(target, label), label)
+    atexit.register(finish)
+
+
+_auto_profile()
+
+
+# ---------- Compare ----------
+def compare(old, new, threshold=REGRESSION):
+    """Rows of (path, metric, old, new, change, regressed) for stages in both reports."""
+    old_stages = {s["path"]: s for s in old["stages"]}
+    rows = []
+    for s in new["stages"]:
+        o = old_stages.get(s["path"])
+        if o is None:
+            continue
+        for m in METRICS:
+            a, b = o.get(m) or 0, s.get(m) or 0
+            change = (b - a) / a if a else (float("inf") if b else 0.0)
+            regressed = m in MIN_DELTA and b - a > MIN_DELTA[m] and change > threshold
+            rows.append((s["path"], m, a, b, change, regressed))
+    return rows
+
+
+def print_report(rep):
+    print(f"📊 {rep['run']['label']}")
+    print(f"{'stage':<40} {'calls':>5} {'wall s':>8} {'cpu s':>8} {'peak MB':>8} "
+          f"{'rows in':>9} {'rows out':>9} {'MB in':>7} {'sql s':>7}")
+    for s in rep["stages"]:
+        print(f"{s['path']:<40} {s['calls']:>5} {s['wall_s']:>8.3f} {s['cpu_s']:>8.3f} "
+              f"{s['peak_rss_mb']:>8.1f} {s['rows_in']:>9} {s['rows_out']:>9} "
+              f"{s['sql_bytes_in'] / MB:>7.1f} {s['sql_s']:>7.3f}")
+    if rep.get("sql"):
+        print("\nslowest SQL:")
+        for e in rep["sql"][:10]:
+            print(f"  {e['seconds']:>7.3f}s  {e['count']:>4}×  {e['kind']:<5} {e['target'][:90]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show or compare profiling run reports.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    show = sub.add_parser("show")
+    show.add_argument("report")
+    cmp_ = sub.add_parser("compare")
+    cmp_.add_argument("old")
+    cmp_.add_argument("new")
+    cmp_.add_argument("--threshold", type=float, default=REGRESSION)
+    cmp_.add_argument("--all", action="store_true", help="list every metric, not just changes")
+    cmp_.add_argument("--fail", action="store_true", help="exit 1 if anything regressed")
+    args = parser.parse_args()
+
+    if args.cmd == "show":
+        print_report(load(args.report))
+    else:
+        rows = compare(load(args.old), load(args.new), args.threshold)
+        bad = [r for r in rows if r[5]]
+        for path, m, a, b, change, regressed in rows:
+            if args.all or regressed or (m in MIN_DELTA and abs(b - a) > MIN_DELTA[m]):
+                flag = "❌" if regressed else ("✅" if b < a else "  ")
+                print(f"{flag} {path:<40} {m:<14} {a:>12.3f} → {b:>12.3f} ({change:+.1%})")
+        print(f"\n{'⚠️ ' if bad else '✅'} {len(bad)} regression(s) over {args.threshold:.0%}")
+        if bad and args.fail:
+            raise SystemExit(1)
@@ -0,0 +1,70 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import db
+import feature_store
+import profiling
+import rates
+from projections import FEATURES, TRAIN_END, TRAIN_START, run_position
+
+# ---------------- CONFIG ----------------
+DB_PATH = db.DB_PATH
+POSITIONS = ["WR", "RB", "TE", "QB"]
+# ----------------------------------------
+
+# ======================================
+# Train + project every position at once
+# ======================================
+# Each position is trained and projected in its own process, reading only
+# its slice of the feature store and of week11_inputs. Coefficients,
+# residuals and predictions for all positions are then written in a single
+# transaction, so a refresh takes about as long as the slowest position.
+
+
+def project_all(positions=POSITIONS, db_path=DB_PATH, max_workers=None, show=10):
+    conn = db.connect(db_path)
+    # build/refresh once here so the workers only ever read the store
+    with profiling.stage("features"):
+        feature_store.ensure_fresh(conn)
+
+    start = time.perf_counter()
+    # every position's player rates from one aggregation pass
+    with profiling.stage("rates"):
+        window_rates = rates.for_window(TRAIN_START, TRAIN_END)
+
+    # worker processes' own SQL is not attributed here, only their wall time
+    n = len(positions)
+    with profiling.stage("train_project"), ProcessPoolExecutor(max_workers=max_workers or n) as pool:
+        results = list(pool.map(run_position, positions, [db_path] * n,
+                                [feature_store.STORE_DIR] * n, [window_rates[p] for p in positions]))
+
+    frames = {}
+    for tables, summary in results:
+        frames.update(tables)
+        p = summary["position"]
+        print(f"\n--- {p} MODEL ---")
+        print("Intercept:", round(summary["intercept"], 4))
+        print(tables[f"{p.lower()}_model_coefs"].iloc[1:])
+        print("R²:", round(summary["r2"], 4))
+
+        preds = tables[f"{p.lower()}_week11_predictions"]
+        print(f"\nTop {p} Week 11 Projections:")
+        print(preds[["playerName","team","opponent","mu"]].sort_values("mu", ascending=False).head(show))
+
+    with profiling.stage("save"):
+        db.write_tables(frames, conn)
+    conn.close()
+    print(f"\n✅ {', '.join(positions)} projected in {time.perf_counter() - start:.1f}s "
+          f"({len(frames)} tables written)")
+    return frames
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train and project all positions in parallel.")
+    parser.add_argument("--positions", nargs="*", default=POSITIONS, choices=list(FEATURES))
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    project_all(args.positions, args.db, args.workers)
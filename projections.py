@@ -0,0 +1,147 @@
+import db
+import feature_store
+import ols_stats
+import rates
+
+# ---------------- CONFIG ----------------
+TRAIN_START = 1
+TRAIN_END = 9          # weeks 1–9 train the models
+INPUTS_TABLE = "week11_inputs"
+MODEL_KEY = "weekly"   # ols_stats model name
+# ----------------------------------------
+
+# ======================================
+# Per-position models
+# ======================================
+# Each position's projector takes its fitted model, its player rates
+# (rates.py) and its week-11 inputs and returns a frame.
+#
+# The only database write here is the position's weekly OLS blocks
+# (ols_stats.sync), which each worker commits in its own transaction before
+# fitting. project_all.py runs the positions concurrently and then writes
+# the output tables (coefs, residuals, predictions) in one transaction.
+
+FEATURES = {
+    "WR": ["rec_tgt","rec","rec_yd","rec_td","off_snp","ease_factor"],
+    "RB": ["rush_att","rush_yd","rush_td","rec_tgt","rec","rec_yd","rec_td","off_snp","ease_factor"],
+    "TE": ["rec_tgt","rec","rec_yd","rec_td","off_snp","ease_factor"],
+    "QB": ["pass_att","pass_cmp","pass_yd","pass_td","pass_int","rush_att","rush_yd","rush_td","off_snp","ease_factor"],
+}
+
+# Columns the rate engine reads from the training rows
+RATE_COLUMNS = rates.SUM_COLUMNS
+
+INPUT_RENAMES = {
+    "rec_tgt_base": "rec_tgt",
+    "rush_att_base": "rush_att",
+    "off_snp_base": "off_snp",
+    "ease_base": "ease_factor",
+}
+
+
+# ---------- Training ----------
+def load_training(position, store_path=feature_store.STORE_DIR):
+    """This position's rows (weeks ≤ TRAIN_END) from the shared feature store."""
+    cols = list(dict.fromkeys(["playerID","week_num","pts_ppr"] + FEATURES[position] + RATE_COLUMNS))
+    df = feature_store.load(cols, position=position, path=store_path)
+    return df[df["week_num"].between(TRAIN_START, TRAIN_END)].reset_index(drop=True)
+
+
+def train(conn, position, train_df, features):
+    """Sync this position's weekly OLS blocks and solve over the training weeks."""
+    rows = train_df.assign(**{f: train_df[f].fillna(0) for f in features})
+    ols_stats.sync(conn, MODEL_KEY, position, rows, features)
+    model = ols_stats.fit(conn, MODEL_KEY, position, weeks=range(TRAIN_START, TRAIN_END + 1))
+    train_df = train_df.assign(resid=rows["pts_ppr"] - ols_stats.predict(model, rows[features]))
+    return model, train_df
+
+
+# ---------- WR ----------
+def project_wr(model, pos_rates, inputs):
+    wr = rates.attach(inputs.rename(columns=INPUT_RENAMES), pos_rates)
+
+    wr["rec"] = wr["rec_tgt"] * wr["catch_rate"]
+    wr["rec_yd"] = wr["rec_tgt"] * wr["ypt"]
+    wr["rec_td"] = wr["rec_tgt"] * wr["td_rate"]
+
+    wr["mu"] = ols_stats.predict(model, wr[FEATURES["WR"]].fillna(0))
+    return wr
+
+
+# ---------- RB ----------
+def project_rb(model, pos_rates, inputs):
+    rb = rates.attach(inputs.rename(columns=INPUT_RENAMES), pos_rates)
+
+    rb["rush_yd"] = rb["rush_att"].fillna(0) * rb["ypc"]
+    rb["rush_td"] = rb["rush_att"].fillna(0) * rb["rush_tdr"]
+    rb["rec"]     = rb["rec_tgt"].fillna(0) * rb["catch_rate"]
+    rb["rec_yd"]  = rb["rec_tgt"].fillna(0) * rb["ypt"]
+    rb["rec_td"]  = rb["rec_tgt"].fillna(0) * rb["rec_tdr"]
+
+    rb["mu"] = ols_stats.predict(model, rb[FEATURES["RB"]].fillna(0))
+    return rb
+
+
+# ---------- TE ----------
+def project_te(model, pos_rates, inputs):
+    te = inputs.rename(columns={k: v for k, v in INPUT_RENAMES.items() if k != "rush_att_base"})
+    te = rates.attach(te, pos_rates)
+
+    te["rec"]    = te["rec_tgt"].fillna(0) * te["catch_rate"]
+    te["rec_yd"] = te["rec_tgt"].fillna(0) * te["ypt"]
+    te["rec_td"] = te["rec_tgt"].fillna(0) * te["td_rate"]
+
+    te["mu"] = ols_stats.predict(model, te[FEATURES["TE"]].fillna(0))
+    return te
+
+
+# ---------- QB ----------
+def project_qb(model, pos_rates, inputs):
+    qb = inputs.rename(columns={k: v for k, v in INPUT_RENAMES.items() if k != "rec_tgt_base"})
+    qb = rates.attach(qb, pos_rates)
+
+    # --- Safe baseline pass attempts ---
+    if "pass_att_base" in qb.columns:
+        qb["pass_att"] = qb["pass_att_base"].fillna(30)
+    elif "pass_att" in qb.columns:
+        qb["pass_att"] = qb["pass_att"].fillna(30)
+    else:
+        qb["pass_att"] = 30
+
+    qb["pass_cmp"] = qb["pass_att"] * qb["cmp_rate"]
+    qb["pass_yd"]  = qb["pass_att"] * qb["ypa"]
+    qb["pass_td"]  = qb["pass_att"] * qb["td_per_att"]
+    qb["pass_int"] = qb["pass_att"] * qb["int_per_att"]
+
+    qb["rush_yd"]  = qb["rush_att"].fillna(0) * qb["rypc"]
+    qb["rush_td"]  = qb["rush_att"].fillna(0) * qb["rtd_rate"]
+
+    qb["mu"] = ols_stats.predict(model, qb[FEATURES["QB"]].fillna(0))
+    return qb
+
+
+PROJECTORS = {"WR": project_wr, "RB": project_rb, "TE": project_te, "QB": project_qb}
+
+
+# ---------- One position end to end ----------
+def run_position(position, db_path=None, store_path=feature_store.STORE_DIR, pos_rates=None):
+    """Train + project one position; returns ({table: frame}, summary)."""
+    if pos_rates is None:
+        pos_rates = rates.for_window(TRAIN_START, TRAIN_END, store_path=store_path)[position]
+    train_df = load_training(position, store_path)
+    features = FEATURES[position]
+
+    conn = db.connect(db_path)
+    model, train_df = train(conn, position, train_df, features)
+    inputs = db.read_sql(f"SELECT * FROM {INPUTS_TABLE} WHERE position = ?", conn, params=(position,))
+    conn.close()
+    preds = PROJECTORS[position](model, pos_rates, inputs)
+
+    p = position.lower()
+    tables = {
+        f"{p}_model_coefs": ols_stats.coef_frame(model),
+        f"{p}_residuals": train_df[["playerID","week_num","resid"]],
+        f"{p}_week11_predictions": preds,
+    }
+    summary = {"position": position, "intercept": model.intercept, "r2": model.r2, "n": model.n}
+    return tables, summary
@@ -0,0 +1,83 @@
+import html
+
+import pandas as pd
+import streamlit as st
+
+# ============================
+# RANKING TABLE COMPONENT
+# ============================
+# Each player's <td> cells are rendered once per data version and cached;
+# a rerun only joins the pre-rendered rows that are on the visible page.
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+SORT_OPTIONS = {
+    "Projection": ("median", False),
+    "Boom%":      ("Boom%", False),
+    "Bust%":      ("Bust%", True),
+    "Name":       ("playerName", True),
+}
+
+TABLE_HEAD = """
+<table class='rank-table' style='width:100%; border-collapse:collapse;'>
+<tr>
+    <th>Rank</th>
+    <th>Name</th>
+    <th>Pos</th>
+    <th>Team</th>
+    <th>Opp</th>
+    <th>Projection</th>
+    <th>Boom%</th>
+    <th>Bust%</th>
+</tr>
+"""
+
+
+def _cell(s: pd.Series) -> pd.Series:
+    return "<td>" + s.astype(object).map(lambda v: html.escape(str(v))) + "</td>"
+
+
+@st.cache_data(show_spinner=False)
+def prerender_rows(version: str, _df: pd.DataFrame) -> pd.Series:
+    """Row HTML (everything after the Rank cell), indexed like the source frame."""
+    return (
+        _cell(_df["playerName"])
+        + _cell(_df["position"])
+        + _cell(_df["team"])
+        + _cell(_df["opponent"])
+        + _cell(_df["median"].map("{:.1f}".format))
+        + _cell(_df["Boom%"])
+        + _cell(_df["Bust%"])
+        + "</tr>"
+    )
+
+
+def render_ranking_table(filtered: pd.DataFrame, rows_html: pd.Series, key="rankings"):
+    """Draw sort/pagination controls and the visible slice of the table."""
+    c1, c2, c3 = st.columns([2, 1, 1])
+    with c1:
+        sort_by = st.selectbox("Sort by:", list(SORT_OPTIONS), key=f"{key}_sort")
+    with c2:
+        page_size = st.selectbox("Rows per page:", PAGE_SIZES, key=f"{key}_size")
+
+    n_pages = max(1, -(-len(filtered) // page_size))
+    # a narrower filter can leave the stored page past the new last page
+    page_key = f"{key}_page"
+    st.session_state[page_key] = min(int(st.session_state.get(page_key, 1)), n_pages)
+    with c3:
+        page = st.number_input("Page", min_value=1, max_value=n_pages, step=1, key=page_key)
+
+    col, ascending = SORT_OPTIONS[sort_by]
+    ordered = filtered.sort_values(col, ascending=ascending, kind="stable")
+
+    start = (int(page) - 1) * page_size
+    visible = ordered.iloc[start:start + page_size]
+
+    body = (
+        "<tr><td>" + visible["Rank"].astype(int).astype(str) + "</td>"
+        + rows_html.reindex(visible.index)
+    )
+
+    st.markdown(TABLE_HEAD + "".join(body) + "</table>", unsafe_allow_html=True)
+    st.caption(f"Showing {start + 1 if len(visible) else 0}–{start + len(visible)} "
+               f"of {len(filtered)} players (page {int(page)} of {n_pages})")
@@ -0,0 +1,120 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import feature_store
+
+# ======================================
+# Per-player efficiency rates
+# ======================================
+# Every rate is numerator / denominator over a player's training rows,
+# e.g. catch_rate = rec / rec_tgt. One groupby(position, playerID).sum()
+# over all positions produces every sum any rate needs, and the rates
+# themselves are column arithmetic on that small aggregate.
+#
+# For each rate:
+#   fallback = position-wide sum(num) / sum(den)  (or `default` if den is 0)
+#   rate     = (num + k·fallback) / (den + k)      k = shrinkage strength
+#   missing / inf → fallback, then clipped to [lo, hi]
+# k = 0 (the default) is the plain per-player ratio. k > 0 is
+# empirical-Bayes style shrinkage: a player with few targets stays close to
+# the position rate, a high-volume player barely moves.
+
+Rate = namedtuple("Rate", ["name", "num", "den", "lo", "hi", "default"])
+
+RATES = {
+    "WR": [
+        Rate("catch_rate", "rec",    "rec_tgt", 0.3, 0.9,  None),
+        Rate("ypt",        "rec_yd", "rec_tgt", 4.0, 14.0, None),
+        Rate("td_rate",    "rec_td", "rec_tgt", 0.0, 0.20, None),
+    ],
+    "RB": [
+        Rate("ypc",        "rush_yd", "rush_att", 3.0,  6.5,  4.3),
+        Rate("rush_tdr",   "rush_td", "rush_att", 0.00, 0.08, 0.03),
+        Rate("catch_rate", "rec",     "rec_tgt",  0.45, 0.9,  0.67),
+        Rate("ypt",        "rec_yd",  "rec_tgt",  3.5,  10.0, 6.5),
+        Rate("rec_tdr",    "rec_td",  "rec_tgt",  0.00, 0.12, 0.03),
+    ],
+    "TE": [
+        Rate("catch_rate", "rec",    "rec_tgt", 0.4, 0.9,  0.66),
+        Rate("ypt",        "rec_yd", "rec_tgt", 4.0, 12.0, 7.2),
+        Rate("td_rate",    "rec_td", "rec_tgt", 0.0, 0.15, 0.05),
+    ],
+    "QB": [
+        Rate("cmp_rate",    "pass_cmp", "pass_att", 0.5,  0.75, 0.64),
+        Rate("ypa",         "pass_yd",  "pass_att", 5.5,  9.5,  7.2),
+        Rate("td_per_att",  "pass_td",  "pass_att", 0.01, 0.08, 0.045),
+        Rate("int_per_att", "pass_int", "pass_att", 0.00, 0.06, 0.025),
+        Rate("rypc",        "rush_yd",  "rush_att", 2.5,  7.5,  4.5),
+        Rate("rtd_rate",    "rush_td",  "rush_att", 0.00, 0.12, 0.05),
+    ],
+}
+
+# Shrinkage strength per rate name, in denominator units (0 = off)
+SHRINK = {}
+
+SUM_COLUMNS = sorted({c for specs in RATES.values() for r in specs for c in (r.num, r.den)})
+
+PositionRates = namedtuple("PositionRates", ["players", "fallback", "specs"])
+
+
+# ---------- Compute ----------
+def aggregate(df):
+    """Per-(position, playerID) sums of every rate input — the single scan."""
+    cols = [c for c in SUM_COLUMNS if c in df.columns]
+    return df.groupby(["position", "playerID"], sort=False)[cols].sum().reset_index()
+
+
+def _position_rates(sums, specs, shrink):
+    players = sums[["playerID"]].reset_index(drop=True)
+    fallback = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for r in specs:
+            num = sums[r.num].to_numpy(dtype=np.float64)
+            den = sums[r.den].to_numpy(dtype=np.float64)
+            tot_den = den.sum()
+            pos = num.sum() / tot_den if tot_den else (r.default if r.default is not None else np.nan)
+
+            k = shrink.get(r.name, 0.0)
+            rate = (num + k * pos) / (den + k) if k else num / den
+            rate = np.where(np.isfinite(rate), rate, pos)
+            players[r.name] = np.clip(rate, r.lo, r.hi)
+            fallback[r.name] = pos
+    return PositionRates(players, fallback, specs)
+
+
+def compute(df, positions=None, shrink=None, rates=RATES):
+    """{position: PositionRates} for the training rows in df (one aggregation)."""
+    shrink = SHRINK if shrink is None else shrink
+    sums = aggregate(df)
+    out = {}
+    for pos in positions or rates:
+        out[pos] = _position_rates(sums[sums["position"] == pos], rates[pos], shrink)
+    return out
+
+
+def attach(frame, pos_rates):
+    """Left-join player rates onto frame; players without history get the fallback."""
+    frame = frame.merge(pos_rates.players, on="playerID", how="left")
+    for r in pos_rates.specs:
+        frame[r.name] = frame[r.name].fillna(pos_rates.fallback[r.name]).clip(r.lo, r.hi)
+    return frame
+
+
+# ---------- Cache ----------
+_cache = {}
+
+
+def for_window(start, end, shrink=None, store_path=feature_store.STORE_DIR):
+    """Rates for training weeks start..end, cached per (store version, window, shrinkage)."""
+    shrink = SHRINK if shrink is None else shrink
+    key = (feature_store.store_version(store_path), start, end, tuple(sorted(shrink.items())))
+    if key not in _cache:
+        arrays = feature_store.load_arrays(["position", "playerID", "week_num"] + SUM_COLUMNS,
+                                           path=store_path)
+        wk = np.asarray(arrays["week_num"])
+        keep = (wk >= start) & (wk <= end)
+        df = pd.DataFrame({c: np.asarray(a)[keep] for c, a in arrays.items()})
+        _cache[key] = compute(df, shrink=shrink)
+    return _cache[key]
@@ -1,7 +1,6 @@
-import sqlite3
+import db
 
-db_path = r"C:\Users\Collin Anderson\fantasy\fantasy.db"
-conn = sqlite3.connect(db_path)
+conn = db.connect()
 cur = conn.cursor()
 
 # find all tables that start with 'week'
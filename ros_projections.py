@@ -0,0 +1,114 @@
+import argparse
+
+import pandas as pd
+
+import build_ease_table
+import db
+import feature_store
+import predictor
+import rates
+from projections import FEATURES, PROJECTORS, TRAIN_END, TRAIN_START, load_training, train
+
+# ---------------- CONFIG ----------------
+DB_PATH = db.DB_PATH
+POSITIONS = ["WR", "RB", "TE", "QB"]
+TEAM_ALIASES = {"WSH": "WAS"}   # ESPN → Sleeper abbreviations
+TABLE = "ros_projections"
+# ----------------------------------------
+
+# ======================================
+# Rest-of-season projections
+# ======================================
+# Usage baselines and player rates don't change from week to week, only
+# the opponent does. So each position is projected once per player (same
+# projectors as the weekly run) and then expanded against every remaining
+# week in nfl_matchups, with ease_factor swapped for that opponent's
+# opponent_strength_offadj value. The whole (player × week) block is then
+# a single X @ coef per position.
+
+ROLL_TO_BASE = {
+    "rec_tgt_roll": "rec_tgt_base",
+    "rush_att_roll": "rush_att_base",
+    "off_snp_roll": "off_snp_base",
+    "ease_roll": "ease_base",
+}
+
+
+def latest_baselines(conn):
+    """Most recent player_baselines row per player, in week11_inputs layout."""
+    df = db.read_sql("""
+        SELECT b.* FROM player_baselines b
+        JOIN (SELECT playerID, MAX(week_num) AS wk FROM player_baselines GROUP BY playerID) m
+          ON m.playerID = b.playerID AND m.wk = b.week_num
+    """, conn)
+    return df.rename(columns={**ROLL_TO_BASE, "week_num": "last_week"})
+
+
+def schedule(conn, weeks):
+    sched = db.read_sql(
+        f"SELECT week, team, opponent FROM nfl_matchups WHERE week IN ({','.join('?' * len(weeks))})",
+        conn, params=[int(w) for w in weeks])
+    return sched.replace({"team": TEAM_ALIASES, "opponent": TEAM_ALIASES})
+
+
+def project_position(conn, position, inputs, sched, ease):
+    features = FEATURES[position]
+    model, train_df = train(conn, position, load_training(position), features)
+    pos_rates = rates.for_window(TRAIN_START, TRAIN_END)[position]
+    players = PROJECTORS[position](model, pos_rates, inputs)
+
+    # one row per (player, remaining game); byes simply have no row
+    grid = players.drop(columns=["opponent"]).merge(sched, on="team", how="inner")
+    grid = grid.merge(ease[ease["position"] == position].drop(columns="position"),
+                      left_on="opponent", right_on="defense_team", how="left")
+    grid["ease_factor"] = grid["opp_ease"].fillna(grid["ease_factor"])
+
+    grid["mu"] = predictor.score(grid, {position: model}, fillna=0)
+    return grid[["playerID", "playerName", "team", "position", "week", "opponent",
+                 "ease_factor", "mu"]]
+
+
+def project_ros(weeks=None, positions=POSITIONS, db_path=DB_PATH, save=True):
+    conn = db.connect(db_path)
+    feature_store.ensure_fresh(conn)
+
+    inputs = latest_baselines(conn)
+    if weeks is None:
+        last = int(inputs["last_week"].max())
+        weeks = [w for (w,) in conn.execute(
+            "SELECT DISTINCT week FROM nfl_matchups WHERE week > ? ORDER BY week", (last,))]
+    sched = schedule(conn, weeks)
+    ease = db.read_sql("SELECT defense_team, position, ease_factor AS opp_ease "
+                       f"FROM {build_ease_table.JOIN_EASE_TABLE}", conn)
+
+    ros = pd.concat([
+        project_position(conn, p, inputs[inputs["position"] == p].reset_index(drop=True), sched, ease)
+        for p in positions
+    ], ignore_index=True).rename(columns={"week": "week_num"})
+
+    if save:
+        db.write_table(ros, TABLE, conn)
+    conn.close()
+    return ros
+
+
+def ros_matrix(ros, value="mu"):
+    """Wide (player × week) view of a ros_projections frame."""
+    return ros.pivot_table(index=["playerID", "playerName", "position", "team"],
+                           columns="week_num", values=value, aggfunc="first")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Project every remaining week in one pass.")
+    parser.add_argument("--weeks", type=int, nargs="*", default=None,
+                        help="weeks to project (default: every scheduled week after the last played)")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+
+    ros = project_ros(args.weeks, db_path=args.db)
+    matrix = ros_matrix(ros)
+    matrix["ros_total"] = matrix.sum(axis=1)
+
+    print(matrix.sort_values("ros_total", ascending=False).head(20).round(1))
+    print(f"\n✅ {len(ros)} player-weeks ({ros['playerID'].nunique()} players × "
+          f"{ros['week_num'].nunique()} weeks) → {TABLE}")
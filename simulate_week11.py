@@ -1,32 +1,51 @@
-import sqlite3
 import pandas as pd
 import numpy as np
 
+import db
+import draw_store
+import profiling
+from mc_engine import boom_bust_thresholds, pack_residuals, simulate_batch, simulate_joint
+
+# ---- CONFIG ----
+SIMS = 5000
+SEED = None      # set an int for reproducible runs
+POINT_LINES = (10, 15, 20)   # stored as p_over_<pts> alongside Boom%/Bust%
+
+JOINT = False            # True → correlated team/game-script simulation
+JOINT_SIMS = 100_000
+PRED_WEEK = 11
+RHO_TEAM = 0.15          # shared team shock (teammates)
+RHO_GAME = 0.05          # shared game shock (both sides of a matchup)
+MEM_BUDGET_MB = 256
+TEAM_ALIASES = {"WSH": "WAS"}   # ESPN → Sleeper abbreviations
+SAVE_DRAWS = True        # persist the draw matrix to draw_store.STORE_DIR
+# ----------------
+
 # ======================================
 # Load Week 11 Projections for All Positions
 # ======================================
-conn = sqlite3.connect("fantasy.db")
+conn = db.connect()
+profiling.section("load")
 
-wr = pd.read_sql("SELECT * FROM wr_week11_predictions", conn)
-rb = pd.read_sql("SELECT * FROM rb_week11_predictions", conn)
-te = pd.read_sql("SELECT * FROM te_week11_predictions", conn)
-qb = pd.read_sql("SELECT * FROM qb_week11_predictions", conn)
+wr = db.read_sql("SELECT * FROM wr_week11_predictions", conn)
+rb = db.read_sql("SELECT * FROM rb_week11_predictions", conn)
+te = db.read_sql("SELECT * FROM te_week11_predictions", conn)
+qb = db.read_sql("SELECT * FROM qb_week11_predictions", conn)
 
 # ======================================
 # Load residuals (for Monte Carlo)
 # ======================================
-wr_resid = pd.read_sql("SELECT playerID, resid FROM wr_residuals", conn)
-rb_resid = pd.read_sql("SELECT playerID, resid FROM rb_residuals", conn)
-te_resid = pd.read_sql("SELECT playerID, resid FROM te_residuals", conn)
-qb_resid = pd.read_sql("SELECT playerID, resid FROM qb_residuals", conn)
-
-# Build lookup maps
-residual_lookup = {
-    "WR": wr_resid.groupby("playerID")["resid"].apply(list).to_dict(),
-    "RB": rb_resid.groupby("playerID")["resid"].apply(list).to_dict(),
-    "TE": te_resid.groupby("playerID")["resid"].apply(list).to_dict(),
-    "QB": qb_resid.groupby("playerID")["resid"].apply(list).to_dict(),
-}
+wr_resid = db.read_sql("SELECT playerID, resid FROM wr_residuals", conn)
+rb_resid = db.read_sql("SELECT playerID, resid FROM rb_residuals", conn)
+te_resid = db.read_sql("SELECT playerID, resid FROM te_residuals", conn)
+qb_resid = db.read_sql("SELECT playerID, resid FROM qb_residuals", conn)
+
+residuals = pd.concat([
+    wr_resid.assign(position="WR"),
+    rb_resid.assign(position="RB"),
+    te_resid.assign(position="TE"),
+    qb_resid.assign(position="QB"),
+], ignore_index=True)
 
 # ======================================
 # Add Standardized Projected Stat Columns
@@ -78,45 +97,65 @@ combined = pd.concat([wr, rb, te, qb], ignore_index=True)
 # ======================================
 # Monte Carlo Simulation
 # ======================================
-def simulate_player(mu, residuals, sims=5000):
-    # if player has no residuals → fallback low variance
-    if residuals is None or len(residuals) == 0:
-        draws = np.random.normal(loc=mu, scale=4.0, size=sims)
-    else:
-        draws = mu + np.random.choice(residuals, size=sims, replace=True)
-
-    p10 = np.percentile(draws, 10)
-    median = np.percentile(draws, 50)
-    p90 = np.percentile(draws, 90)
-
-    return median, p10, p90
-
-
-medians = []
-p10s = []
-p90s = []
-
-for _, row in combined.iterrows():
-    pos = row["position"]
-    pid = row["playerID"]
-    mu  = row["mu"]
+profiling.section("simulate")
+# Pack every player's residual pool once, then draw the whole slate together
+offsets, values = pack_residuals(combined, residuals)
+
+# Threshold probabilities are computed here, once, from the same draws
+cutoffs = np.column_stack([
+    boom_bust_thresholds(combined["position"]),
+    np.tile(np.asarray(POINT_LINES, dtype=float), (len(combined), 1)),
+])
+
+# Every draw block is streamed to disk as it is produced (draw_store.py)
+n_sims = JOINT_SIMS if JOINT else SIMS
+writer = None
+if SAVE_DRAWS:
+    writer = draw_store.DrawWriter(combined["playerID"], n_sims,
+                                   meta={c: combined[c] for c in draw_store.META_COLUMNS},
+                                   source="week11_simulated_all", seed=SEED, joint=JOINT)
+on_draws = writer.write if writer else None
+
+if JOINT:
+    # Games come from nfl_matchups so every player in a game shares its shocks
+    matchups = db.read_sql("SELECT team, opponent FROM nfl_matchups WHERE week = ?",
+                           conn, params=(PRED_WEEK,))
+    matchups = matchups.replace({"team": TEAM_ALIASES, "opponent": TEAM_ALIASES})
+    game_opp = combined["team"].map(matchups.set_index("team")["opponent"])
+
+    quantiles, probs, game_summary = simulate_joint(
+        combined["mu"].to_numpy(), offsets, values,
+        combined["team"], game_opp,
+        sims=JOINT_SIMS, seed=SEED, thresholds=cutoffs,
+        rho_team=RHO_TEAM, rho_game=RHO_GAME, mem_budget_mb=MEM_BUDGET_MB,
+        on_draws=on_draws,
+    )
+    db.write_table(game_summary, f"week{PRED_WEEK}_game_correlation", conn)
+else:
+    quantiles, probs = simulate_batch(
+        combined["mu"].to_numpy(), offsets, values,
+        sims=SIMS, seed=SEED, thresholds=cutoffs, on_draws=on_draws,
+    )
 
-    residuals = residual_lookup.get(pos, {}).get(pid, [])
+if writer:
+    writer.close()
 
-    median, p10, p90 = simulate_player(mu, residuals)
-    medians.append(median)
-    p10s.append(p10)
-    p90s.append(p90)
+combined["median"] = quantiles[:, 1]
+combined["p10"] = quantiles[:, 0]
+combined["p90"] = quantiles[:, 2]
 
-combined["median"] = medians
-combined["p10"] = p10s
-combined["p90"] = p90s
+combined["boom_pct"] = probs[:, 0] * 100
+combined["bust_pct"] = (1.0 - probs[:, 1]) * 100
+for i, pts in enumerate(POINT_LINES):
+    combined[f"p_over_{pts}"] = probs[:, 2 + i] * 100
 
 # ======================================
 # Save Combined Table
 # ======================================
-combined.to_sql("week11_simulated_all", conn, if_exists="replace", index=False)
+profiling.section("save")
+db.write_table(combined, "week11_simulated_all", conn)
 
 conn.close()
+profiling.end_section()
 
 print("✔ week11_simulated_all generated successfully!")
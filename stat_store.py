@@ -0,0 +1,217 @@
+import argparse
+import glob
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+import db
+
+# ---------------- CONFIG ----------------
+DB_PATH = db.DB_PATH
+SEASON = 2025
+# ----------------------------------------
+
+# ======================================
+# Long-format stat store
+# ======================================
+# Sleeper rows carry ~230 possible stat keys but only ~15 are set per player,
+# so stats are kept one value per row:
+#
+#   stat_ids   (stat_id, stat)                        stat dictionary
+#   player_ids (pid, playerID)                        Sleeper id dictionary
+#   stats_long (stat_id, season, week, pid, value)    clustered on the key
+#
+# Rows are clustered by stat first, so "all pts_ppr for weeks 1–9" is a
+# single index range and a pivot reads only the stats a model asks for.
+# `value` has NUMERIC affinity, so integral stats (yards, attempts, snaps)
+# are stored as 1–2 byte integers.
+
+# Columns that identify a row in the wide tables rather than hold a stat
+ID_COLUMNS = {"playerID", "playerName", "team", "position", "opponent", "week_num",
+              "season", "week"}
+
+
+def ensure_schema(conn):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS stat_ids (
+            stat_id INTEGER PRIMARY KEY,
+            stat    TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS player_ids (
+            pid      INTEGER PRIMARY KEY,
+            playerID TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS stats_long (
+            stat_id INTEGER NOT NULL,
+            season  INTEGER NOT NULL,
+            week    INTEGER NOT NULL,
+            pid     INTEGER NOT NULL,
+            value   NUMERIC NOT NULL,
+            PRIMARY KEY (stat_id, season, week, pid)
+        ) WITHOUT ROWID;
+    """)
+
+
+def stat_id_map(conn, stats):
+    """stat name → id, registering names not seen before."""
+    conn.executemany("INSERT OR IGNORE INTO stat_ids (stat) VALUES (?)",
+                     [(s,) for s in sorted(set(stats))])
+    return dict(conn.execute("SELECT stat, stat_id FROM stat_ids").fetchall())
+
+
+def player_id_map(conn, players):
+    """Sleeper playerID → compact integer pid, registering new players."""
+    conn.executemany("INSERT OR IGNORE INTO player_ids (playerID) VALUES (?)",
+                     [(p,) for p in sorted(set(players))])
+    return dict(conn.execute("SELECT playerID, pid FROM player_ids").fetchall())
+
+
+# ---------- Parsing ----------
+def long_rows(season, week, data):
+    """Sleeper payload {playerID: {stat: value}} → (season, week, playerID, stat, value)."""
+    if not data:
+        return []
+    return [
+        (season, week, str(pid), stat, value)
+        for pid, stats in data.items() if isinstance(stats, dict)
+        for stat, value in stats.items()
+        if value is not None and value == value and value != 0
+    ]
+
+
+def wide_to_long(df, season, week=None):
+    """Melt a wide weekN frame (one column per stat) into long rows."""
+    if week is None:
+        week = df["week_num"] if "week_num" in df.columns else None
+    stat_cols = [c for c in df.columns if c not in ID_COLUMNS]
+
+    values = df[stat_cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    r, c = np.nonzero(~np.isnan(values) & (values != 0))
+    weeks = np.broadcast_to(np.asarray(week), len(df))[r]
+
+    return list(zip(
+        np.full(len(r), season).tolist(),
+        np.asarray(weeks).astype(int).tolist(),
+        df["playerID"].astype(str).to_numpy()[r].tolist(),
+        np.asarray(stat_cols, dtype=object)[c].tolist(),
+        values[r, c].tolist(),
+    ))
+
+
+# ---------- Writing ----------
+def write_long(conn, rows):
+    """Insert (season, week, playerID, stat, value) rows in one transaction."""
+    if not rows:
+        return 0
+    stat_ids = stat_id_map(conn, (r[3] for r in rows))
+    pids = player_id_map(conn, (r[2] for r in rows))
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO stats_long VALUES (?, ?, ?, ?, ?)",
+            ((stat_ids[stat], s, w, pids[p], v) for s, w, p, stat, v in rows),
+        )
+    return len(rows)
+
+
+def load_json_file(conn, path, season, week):
+    with open(path) as f:
+        return write_long(conn, long_rows(season, week, json.load(f)))
+
+
+def load_wide_csv(conn, path, season, week):
+    with open(path) as f:
+        has_header = "playerID" in f.readline()
+
+    # week1_raw.csv style: no header, playerID plus a JSON blob of that player's stats
+    if not has_header:
+        raw = pd.read_csv(path, header=None, names=["playerID", "stats"], dtype=str)
+        data = {pid: json.loads(s) for pid, s in zip(raw["playerID"], raw["stats"]) if isinstance(s, str)}
+        return write_long(conn, long_rows(season, week, data))
+
+    df = pd.read_csv(path, dtype={"playerID": str})
+    return write_long(conn, wide_to_long(df, season, week))
+
+
+def load_wide_table(conn, table, season, week=None):
+    df = db.read_sql(f"SELECT * FROM {table}", conn, dtype={"playerID": str})
+    return write_long(conn, wide_to_long(df, season, week))
+
+
+# ---------- Reading ----------
+def read_long(conn, stats=None, seasons=None, weeks=None, players=None):
+    """Compact long frame (int16/int8 keys, float32 values) for the requested slice."""
+    where, params = [], []
+    if stats is not None:
+        ids = dict(conn.execute("SELECT stat, stat_id FROM stat_ids").fetchall())
+        wanted = [ids[s] for s in stats if s in ids]
+        where.append(f"l.stat_id IN ({','.join('?' * len(wanted)) or 'NULL'})")
+        params += wanted
+    for col, vals in (("l.season", seasons), ("l.week", weeks), ("p.playerID", players)):
+        if vals is not None:
+            vals = list(vals)
+            where.append(f"{col} IN ({','.join('?' * len(vals))})")
+            params += vals
+
+    sql = """
+        SELECT l.season, l.week, p.playerID, s.stat, l.value
+        FROM stats_long l
+        JOIN stat_ids s   ON s.stat_id = l.stat_id
+        JOIN player_ids p ON p.pid = l.pid
+    """
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+
+    df = db.read_sql(sql, conn, params=params)
+    return df.astype({
+        "season": np.int16, "week": np.int8, "playerID": "category",
+        "stat": "category", "value": np.float32,
+    })
+
+
+def pivot_stats(conn, stats, seasons=None, weeks=None, players=None, fill_value=np.nan):
+    """Wide frame with only `stats` as columns, one row per (season, week, playerID)."""
+    long = read_long(conn, stats, seasons, weeks, players)
+    wide = long.pivot_table(index=["season", "week", "playerID"], columns="stat",
+                            values="value", aggfunc="first", observed=True)
+    wide = wide.reindex(columns=list(stats)).astype(np.float32)
+    if fill_value == fill_value:
+        wide = wide.fillna(fill_value)
+    wide.columns.name = None
+    return wide.reset_index()
+
+
+def _week_from_name(path):
+    m = re.search(r"week(\d+)", os.path.basename(path))
+    return int(m.group(1)) if m else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load raw weekly stats into the long stat store.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--season", type=int, default=SEASON)
+    parser.add_argument("--json", nargs="*", default=[], help="Sleeper payloads, e.g. week_data/week*.json")
+    parser.add_argument("--csv", nargs="*", default=[], help="wide CSVs, e.g. week1_new.csv")
+    parser.add_argument("--tables", nargs="*", default=[], help="wide SQLite tables, e.g. week1 week2")
+    args = parser.parse_args()
+
+    conn = db.connect(args.db)
+    ensure_schema(conn)
+
+    total = 0
+    for pattern in args.json:
+        for path in sorted(glob.glob(pattern)):
+            total += load_json_file(conn, path, args.season, _week_from_name(path))
+            print(f"✅ {path}")
+    for pattern in args.csv:
+        for path in sorted(glob.glob(pattern)):
+            total += load_wide_csv(conn, path, args.season, _week_from_name(path))
+            print(f"✅ {path}")
+    for table in args.tables:
+        total += load_wide_table(conn, table, args.season, _week_from_name(table))
+        print(f"✅ {table}")
+
+    conn.close()
+    print(f"✅ {total} stat values written to stats_long")
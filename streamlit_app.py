@@ -1,9 +1,10 @@
 import streamlit as st
-import pandas as pd
-import sqlite3
 
-DB_PATH = "fantasy.db"
+import app_data
+import player_search
+
 TABLE = "week11_projections"
+COLUMNS = ["rank", "playerName", "team", "position", "proj"]
 
 st.set_page_config(page_title="Week 11 Fantasy Projections", layout="wide")
 
@@ -12,18 +13,9 @@ st.title("📊 Week 11 Fantasy Projections")
 # ---------------------------
 # LOAD DATA
 # ---------------------------
-@st.cache_data
-def load_data():
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql(f"SELECT * FROM {TABLE}", conn)
-    conn.close()
-    return df
-
-df = load_data()
-
-# Basic cleaning
-df["proj"] = df["proj"].astype(float)
-df["rank"] = df["rank"].astype(float)
+# only the displayed columns, cached until the pipeline rewrites the table
+df, version = app_data.load(TABLE, COLUMNS + ["playerID"])
+index = player_search.index_for(TABLE, version, df, weight="proj")
 
 # ---------------------------
 # SIDEBAR FILTERS
@@ -43,8 +35,11 @@ df_filtered = df.copy()
 if selected_pos != "ALL":
     df_filtered = df_filtered[df_filtered["position"] == selected_pos]
 
-# Auto-complete search using selectbox
-all_players = ["(None)"] + sorted(df["playerName"].unique())
+# Auto-complete search using selectbox; typing narrows it to ranked index matches
+if search_name.strip():
+    all_players = ["(None)"] + list(dict.fromkeys(index.matches(search_name, limit=25)["playerName"]))
+else:
+    all_players = ["(None)"] + index.sorted_names
 selected_player = st.sidebar.selectbox("Search Player", all_players)
 
 if selected_player != "(None)":
@@ -0,0 +1,266 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import db
+from ingest_stats import STAT_COLUMNS
+from load_players import row_hash
+
+# ---------------- CONFIG ----------------
+SEED = 2025
+SEASONS = 1
+PLAYERS = 480              # ≈ the real slate (474 players in all_weeks_joined)
+CURRENT_SEASON = 2025
+CURRENT_WEEKS = 9          # weeks played so far this season (the real 1–9 window)
+PAST_WEEKS = 17            # weeks in every earlier season
+SCHEDULE_WEEKS = 18        # nfl_matchups covers the whole current season
+PRED_WEEK = 11
+PLAY_RATE = 0.9            # chance a player appears in a given week
+# ----------------------------------------
+
+# ======================================
+# Synthetic league generator
+# ======================================
+# Builds schema-compatible all_weeks, all_weeks_joined, week11_inputs,
+# <pos>_residuals, nfl_matchups and players for N seasons × M players, so
+# the pipeline can be run (and benchmarked, see bench.py) far beyond the
+# one real season. Output is a pure function of (seed, seasons, players).
+#
+# Each player gets fixed latent usage / efficiency rates; every week draws
+# counts (Poisson around usage × the opponent's ease), yards (count × rate
+# × lognormal noise) and TDs (binomial), then scores them like Sleeper.
+#
+# The pipeline is single-season (weeks 1–9 train, week 11 is projected), so
+# earlier seasons are laid out before week 1: season N-2 occupies weeks
+# -16..0, season N-3 weeks -33..-17, and so on. Every stage that scans the
+# whole table sees all seasons; the training window still picks the
+# current one. A `season` column records the real season.
+
+POSITION_SHARE = {"WR": 0.36, "RB": 0.27, "TE": 0.21, "QB": 0.16}
+TEAMS = ["ARI", "ATL", "BAL", "BUF", "CAR", "CHI", "CIN", "CLE", "DAL", "DEN", "DET", "GB",
+         "HOU", "IND", "JAX", "KC", "LAC", "LAR", "LV", "MIA", "MIN", "NE", "NO", "NYG",
+         "NYJ", "PHI", "PIT", "SEA", "SF", "TB", "TEN", "WAS"]
+FIRST = ["Aaron", "Andre", "Bijan", "Brock", "Caleb", "Chris", "Cole", "Dak", "Dalton", "Davante",
+         "De'Von", "Derrick", "Drake", "Garrett", "George", "Isiah", "Jahmyr", "Jalen", "Jamarr",
+         "Jared", "Javonte", "Jayden", "Jonathan", "Jordan", "Josh", "Justin", "Kenneth", "Kyren",
+         "Malik", "Mark", "Nico", "Puka", "Rashee", "Sam", "Saquon", "Tee", "Terry", "Travis",
+         "Trey", "Zay"]
+LAST = ["Adams", "Allen", "Andrews", "Brown", "Burrow", "Chase", "Collins", "Cook", "Davis",
+        "Diggs", "Evans", "Ferguson", "Gibbs", "Godwin", "Hall", "Harrison", "Henry", "Higgins",
+        "Hill", "Hockenson", "Hurts", "Jackson", "Jacobs", "Jefferson", "Johnson", "Jones", "Kelce",
+        "Kincaid", "Kittle", "Lamb", "LaPorta", "London", "McBride", "McLaurin", "Metcalf",
+        "Mixon", "Moore", "Nabers", "Olave", "Pitts", "Purdy", "Ridley", "Robinson", "Samuel",
+        "Smith", "St. Brown", "Stroud", "Sutton", "Swift", "Taylor", "Thomas", "Waddle", "Walker",
+        "Warren", "Williams", "Wilson", "Worthy", "Wright", "Young", "Zimmerman"]
+
+# (low, high) of each player's weekly mean usage, drawn uniformly
+USAGE = {
+    "WR": {"rec_tgt": (1.5, 10.0), "off_snp": (20, 65)},
+    "TE": {"rec_tgt": (0.8, 7.5), "off_snp": (15, 60)},
+    "RB": {"rush_att": (2.0, 19.0), "rec_tgt": (0.5, 5.5), "off_snp": (12, 55)},
+    "QB": {"pass_att": (24.0, 38.0), "rush_att": (1.5, 7.0), "off_snp": (55, 70)},
+}
+# (mean, sd) of each player's efficiency rates, drawn normally
+EFFICIENCY = {
+    "catch_rate": (0.66, 0.07), "yds_per_rec": (11.0, 2.0), "rec_td_rate": (0.06, 0.02),
+    "ypc": (4.3, 0.5), "rush_td_rate": (0.03, 0.01),
+    "cmp_rate": (0.64, 0.03), "ypa": (7.0, 0.6), "pass_td_rate": (0.045, 0.01),
+    "int_rate": (0.024, 0.006),
+}
+
+
+def _season_layout(seasons):
+    """[(season year, [week_num, ...]), ...] oldest first; the current season is weeks 1..CURRENT_WEEKS."""
+    layout, start = [], 1
+    for k in range(seasons):
+        n = CURRENT_WEEKS if k == 0 else PAST_WEEKS
+        start -= 0 if k == 0 else n
+        layout.append((CURRENT_SEASON - k, list(range(start, start + n))))
+    return layout[::-1]
+
+
+def _schedule(rng, n_weeks):
+    """(n_weeks, 32) opponent index per team: a random pairing every week."""
+    opp = np.empty((n_weeks, len(TEAMS)), dtype=np.int64)
+    for w in range(n_weeks):
+        perm = rng.permutation(len(TEAMS))
+        a, b = perm[::2], perm[1::2]
+        opp[w, a], opp[w, b] = b, a
+    return opp
+
+
+# ---------- Players ----------
+def make_players(rng, n):
+    counts = {p: int(round(n * s)) for p, s in POSITION_SHARE.items()}
+    counts["WR"] += n - sum(counts.values())
+    position = np.concatenate([np.full(c, p, dtype=object) for p, c in counts.items()])
+    team = np.concatenate([np.arange(c) % len(TEAMS) for c in counts.values()])
+    names = [f"{FIRST[i]} {LAST[j]}" for i, j in zip(rng.integers(len(FIRST), size=n),
+                                                      rng.integers(len(LAST), size=n))]
+    players = pd.DataFrame({
+        "playerID": [str(20000 + i) for i in range(n)],
+        "playerName": names,
+        "team": np.asarray(TEAMS, dtype=object)[team],
+        "position": position,
+    })
+    for pos, stats in USAGE.items():
+        mask = (players["position"] == pos).to_numpy()
+        for stat, (lo, hi) in stats.items():
+            col = players.get(f"mu_{stat}", pd.Series(0.0, index=players.index)).to_numpy(copy=True)
+            col[mask] = rng.uniform(lo, hi, mask.sum())
+            players[f"mu_{stat}"] = col
+    for rate, (mean, sd) in EFFICIENCY.items():
+        players[rate] = np.clip(rng.normal(mean, sd, n), mean / 4, None)
+    return players
+
+
+# ---------- Weekly stats ----------
+def _week_rows(rng, players, opp_team, ease, week_num, season):
+    """One week's stat rows for the players who played."""
+    n = len(players)
+    played = rng.random(n) < PLAY_RATE
+    p = players[played]
+    pos = p["position"].to_numpy()
+    mult = ease[opp_team[p["_team"].to_numpy()], p["_pos"].to_numpy()]
+
+    def count(stat):
+        return rng.poisson(p[f"mu_{stat}"].to_numpy() * mult).astype(np.float64)
+
+    def yards(n_, per):
+        return np.round(n_ * per * mult * rng.lognormal(-0.08, 0.4, len(n_)))
+
+    out = {c: np.full(len(p), np.nan) for c in STAT_COLUMNS}
+    tgt = count("rec_tgt")
+    rec = rng.binomial(tgt.astype(np.int64), p["catch_rate"].clip(0, 1)).astype(np.float64)
+    rush = count("rush_att")
+    att = count("pass_att")
+    cmp_ = rng.binomial(att.astype(np.int64), p["cmp_rate"].clip(0, 1)).astype(np.float64)
+
+    catches = pos != "QB"
+    out["rec_tgt"][catches], out["rec"][catches] = tgt[catches], rec[catches]
+    out["rec_yd"][catches] = yards(rec, p["yds_per_rec"].to_numpy())[catches]
+    out["rec_td"][catches] = rng.binomial(rec.astype(np.int64), p["rec_td_rate"].clip(0, 1))[catches]
+    runs = np.isin(pos, ["RB", "QB"])
+    out["rush_att"][runs] = rush[runs]
+    out["rush_yd"][runs] = yards(rush, p["ypc"].to_numpy())[runs]
+    out["rush_td"][runs] = rng.binomial(rush.astype(np.int64), p["rush_td_rate"].clip(0, 1))[runs]
+    qb = pos == "QB"
+    out["pass_att"][qb], out["pass_cmp"][qb] = att[qb], cmp_[qb]
+    out["pass_yd"][qb] = np.round(att * p["ypa"].to_numpy() * mult * rng.lognormal(-0.02, 0.2, len(p)))[qb]
+    out["pass_td"][qb] = rng.binomial(att.astype(np.int64), p["pass_td_rate"].clip(0, 1))[qb]
+    out["pass_int"][qb] = rng.binomial(att.astype(np.int64), p["int_rate"].clip(0, 1))[qb]
+    out["off_snp"] = np.round(p["mu_off_snp"].to_numpy() * rng.uniform(0.75, 1.15, len(p)))
+
+    f = {c: np.nan_to_num(v) for c, v in out.items()}
+    std = (0.04 * f["pass_yd"] + 4 * f["pass_td"] - f["pass_int"]
+           + 0.1 * (f["rush_yd"] + f["rec_yd"]) + 6 * (f["rush_td"] + f["rec_td"]))
+    out["pts_std"] = np.round(std, 2)
+    out["pts_ppr"] = np.round(std + f["rec"], 2)
+    out["pts_half_ppr"] = np.round(std + 0.5 * f["rec"], 2)
+
+    rows = p[["playerID", "playerName", "team", "position"]].reset_index(drop=True)
+    for c in STAT_COLUMNS:
+        rows[c] = out[c]
+    rows["opponent"] = np.asarray(TEAMS, dtype=object)[opp_team[p["_team"].to_numpy()]]
+    rows["week_num"] = week_num
+    rows["season"] = season
+    rows["ease_factor"] = np.round(mult, 3)
+    return rows
+
+
+def generate(seasons=SEASONS, players=PLAYERS, seed=SEED):
+    """{table: frame} for a synthetic league; identical for identical arguments."""
+    rng = np.random.default_rng([seed, seasons, players])
+    roster = make_players(rng, players)
+    roster["_team"] = roster["team"].map({t: i for i, t in enumerate(TEAMS)})
+    roster["_pos"] = roster["position"].map({p: i for i, p in enumerate(POSITION_SHARE)})
+
+    # ease[defense, position]: > 1 gives up more than average, mean 1 per position
+    ease = rng.lognormal(0, 0.12, (len(TEAMS), len(POSITION_SHARE)))
+    ease /= ease.mean(axis=0)
+
+    frames, current_schedule = [], None
+    for season, weeks in _season_layout(seasons):
+        n_sched = SCHEDULE_WEEKS if season == CURRENT_SEASON else len(weeks)
+        sched = _schedule(rng, n_sched)
+        if season == CURRENT_SEASON:
+            current_schedule = sched
+        for i, week_num in enumerate(weeks):
+            frames.append(_week_rows(rng, roster, sched[i], ease, week_num, season))
+    joined = pd.concat(frames, ignore_index=True)
+    all_weeks = joined.drop(columns="ease_factor")
+
+    # nfl_matchups: the current season's full schedule
+    matchups = pd.DataFrame({
+        "week": np.repeat(np.arange(1, SCHEDULE_WEEKS + 1), len(TEAMS)),
+        "team": np.tile(TEAMS, SCHEDULE_WEEKS),
+        "opponent": np.asarray(TEAMS, dtype=object)[current_schedule.ravel()],
+    })
+
+    tables = {
+        "all_weeks": all_weeks,
+        "all_weeks_joined": joined,
+        "week11_inputs": week11_inputs(joined, matchups),
+        "nfl_matchups": matchups,
+        "players": roster[["playerID", "playerName", "position", "team"]].assign(
+            row_hash=lambda d: [row_hash(r) for r in d.itertuples(index=False, name=None)]),
+    }
+    tables.update(residuals(joined))
+    return tables
+
+
+# ---------- Derived tables ----------
+def week11_inputs(joined, matchups, window=3):
+    """Latest rolling-window usage per current-season player + the week-11 opponent."""
+    cur = joined[joined["week_num"].between(1, CURRENT_WEEKS)].sort_values(["playerID", "week_num"])
+    g = cur.groupby("playerID", sort=False)
+    last = g.tail(window).groupby("playerID", sort=False)
+    base = last[["rec_tgt", "rush_att", "off_snp", "ease_factor"]].mean().round(1)
+    ids = g[["playerName", "team", "position"]].last()
+    out = ids.join(base).reset_index()
+    opp = matchups[matchups["week"] == PRED_WEEK].set_index("team")["opponent"]
+    out["opponent"] = out["team"].map(opp)
+    out["last_week"] = g["week_num"].max().to_numpy()
+    out = out.rename(columns={"rec_tgt": "rec_tgt_base", "rush_att": "rush_att_base",
+                              "off_snp": "off_snp_base", "ease_factor": "ease_base"})
+    return out[["playerID", "playerName", "team", "position", "opponent", "last_week",
+                "rec_tgt_base", "rush_att_base", "off_snp_base", "ease_base"]]
+
+
+def residuals(joined):
+    """<pos>_residuals: current-season pts_ppr minus the player's mean (a stand-in for model residuals)."""
+    cur = joined[joined["week_num"].between(1, CURRENT_WEEKS)]
+    resid = cur["pts_ppr"] - cur.groupby("playerID")["pts_ppr"].transform("mean")
+    out = cur[["playerID", "week_num", "position"]].assign(resid=resid)
+    return {f"{p.lower()}_residuals": out.loc[out["position"] == p, ["playerID", "week_num", "resid"]]
+            .reset_index(drop=True) for p in POSITION_SHARE}
+
+
+def sleeper_payloads(joined):
+    """(season, week, {playerID: {stat: value}}) like the Sleeper stats endpoint, for offline ingest."""
+    for (season, week), g in joined.groupby(["season", "week_num"], sort=True):
+        stats = g[STAT_COLUMNS].to_dict("records")
+        yield int(season), int(week), {pid: {k: v for k, v in s.items() if v == v}
+                                       for pid, s in zip(g["playerID"], stats)}
+
+
+def write(db_path, seasons=SEASONS, players=PLAYERS, seed=SEED):
+    tables = generate(seasons, players, seed)
+    conn = db.connect(db_path)
+    db.write_tables(tables, conn)
+    conn.close()
+    return tables
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic league to SQLite.")
+    parser.add_argument("--db", required=True, help="target database (tables are replaced)")
+    parser.add_argument("--seasons", type=int, default=SEASONS)
+    parser.add_argument("--players", type=int, default=PLAYERS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    tables = write(args.db, args.seasons, args.players, args.seed)
+    for name, df in tables.items():
+        print(f"✅ {name}: {len(df)} rows")
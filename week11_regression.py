@@ -1,9 +1,10 @@
-import sqlite3
-import pandas as pd
-import numpy as np
-import statsmodels.api as sm
+import db
+import feature_store
+import ols_stats
+import predictor
+import profiling
 
-DB_PATH = "fantasy.db"
+DB_PATH = db.DB_PATH
 TABLE = "all_weeks_joined"
 
 TRAIN_START = 1
@@ -11,40 +12,27 @@ TRAIN_END = 9     # use weeks 1–9 for training
 PRED_WEEK = 11    # predict week 11 using season averages
 
 TARGET = "pts_ppr"
+MODEL_KEY = "season_avg"   # ols_stats model name
 
 print("\n=== Loading Data ===")
-conn = sqlite3.connect(DB_PATH)
-df_all = pd.read_sql(f"SELECT * FROM {TABLE}", conn)
+conn = db.connect(DB_PATH)
+profiling.section("load")
+# all_weeks_joined + team totals / shares / ypa / cmp_pct from the feature store
+df_all = feature_store.load(conn=conn)
 print(df_all.head())
 print(f"Loaded {len(df_all)} rows\n")
 
-# -----------------------------
-# 1. CLEAN + REBUILD TEAM TOTALS
-# -----------------------------
-
-team_totals = df_all.groupby(["team", "week_num"]).agg(
-    team_pass_att=("pass_att", "sum"),
-    team_rush_att=("rush_att", "sum"),
-    team_rec_tgt=("rec_tgt", "sum"),
-).reset_index()
-
-df_all = df_all.merge(team_totals, on=["team", "week_num"], how="left")
-
-# safety: avoid divide-by-zero
-def safe_div(a, b):
-    return np.where(b == 0, 0, a / b)
+profiling.section("features")
 
 # -----------------------------
-# 2. BASIC USAGE STATS
+# 1-2. TEAM TOTALS + USAGE STATS
 # -----------------------------
+# team_pass_att / team_rush_att / team_rec_tgt, target_share, carry_share,
+# ypa and cmp_pct come precomputed from feature_store.
 
-df_all["snap_share"] = safe_div(df_all["off_snp"], df_all["off_snp"])  # placeholder; WR/RB won't use this
-df_all["target_share"] = safe_div(df_all["rec_tgt"], df_all["team_rec_tgt"])
-df_all["carry_share"] = safe_div(df_all["rush_att"], df_all["team_rush_att"])
+safe_div = feature_store.safe_div
 
-# QB efficiency
-df_all["ypa"] = safe_div(df_all["pass_yd"], df_all["pass_att"])
-df_all["cmp_pct"] = safe_div(df_all["pass_cmp"], df_all["pass_att"])
+df_all["snap_share"] = safe_div(df_all["off_snp"], df_all["off_snp"])  # placeholder; WR/RB won't use this
 
 # -----------------------------
 # 3. WR-SPECIFIC FIXES
@@ -143,6 +131,7 @@ features_by_pos = {
 # -----------------------------
 
 print("\n=== Training Models ===")
+profiling.section("train")
 models = {}
 
 df_train = df_all[
@@ -157,30 +146,22 @@ for pos, feats in features_by_pos.items():
         print(f"Skipping {pos}: no rows")
         continue
 
-    X = sm.add_constant(df_pos[feats])
-    y = df_pos[TARGET]
-
-    model = sm.OLS(y, X).fit()
+    # per-week sufficient statistics; only weeks whose rows changed are recomputed
+    ols_stats.sync(conn, MODEL_KEY, pos, df_pos, feats, target=TARGET)
+    model = ols_stats.fit(conn, MODEL_KEY, pos, weeks=range(TRAIN_START, TRAIN_END + 1))
     models[pos] = model
 
-    print(f"{pos}: n={len(df_pos)}, R²={model.rsquared:.3f}")
+    print(f"{pos}: n={model.n}, R²={model.r2:.3f}")
 
 # -----------------------------
 # 8. APPLY MODELS TO df_pred_avg
 # -----------------------------
 
 print("\n=== Running Predictions ===")
+profiling.section("predict")
 
-def predict_row(row):
-    pos = row["position"]
-    if pos not in models:
-        return None
-
-    feats = features_by_pos[pos]
-    X = [1.0] + [row[f] for f in feats]
-    return float(np.dot(models[pos].params.values, X))
-
-df_pred_avg["proj"] = df_pred_avg.apply(predict_row, axis=1)
+# one matmul per position over the season-average features
+df_pred_avg["proj"] = predictor.score(df_pred_avg, models)
 
 # Drop rows with no projection
 df_pred_avg = df_pred_avg.dropna(subset=["proj"])
@@ -190,16 +171,12 @@ df_pred_avg = df_pred_avg.dropna(subset=["proj"])
 # -----------------------------
 
 df_pred_avg["rank"] = df_pred_avg["proj"].rank(ascending=False)
+profiling.section("save")
 
-df_pred_avg.to_sql(
-    "week11_projections",
-    conn,
-    if_exists="replace",
-    index=False
-)
+db.write_table(df_pred_avg, "week11_projections", conn)
 
-conn.commit()
 conn.close()
+profiling.end_section()
 
 print("\nSaved table week11_projections to fantasy.db")
 
@@ -1,11 +1,11 @@
 import requests
 import pandas as pd
-import sqlite3
+
+import db
 
 # ---- CONFIG ----
 SEASON = 2024
 WEEK = 1
-db_path = r"C:\Users\Collin Anderson\fantasy\fantasy.db"
 # ----------------
 
 print(f"📡 Fetching NFL Week {WEEK} schedule for {SEASON}...")
@@ -38,8 +38,8 @@ away_side = schedule.rename(columns={"away": "team", "home": "opponent"})
 matchups = pd.concat([home_side, away_side], ignore_index=True)[["week", "team", "opponent"]]
 
 # Write ONLY this week to a new table
-conn = sqlite3.connect(db_path)
-matchups.to_sql("nfl_matchups_week1", conn, if_exists="replace", index=False)
+conn = db.connect()
+db.write_table(matchups, "nfl_matchups_week1", conn)
 conn.close()
 
 print("✅ nfl_matchups_week1 table created successfully in fantasy.db")